@@ -1,7 +1,12 @@
 from fastapi import FastAPI
+from dependencies.db import lifespan
+from dependencies.deadline import install_deadline
+from dependencies.metrics import router as metrics_router
 from routers import admin_reply
 
-app = FastAPI(title="Admin Reply Service")
+app = FastAPI(title="Admin Reply Service", lifespan=lifespan)
+install_deadline(app)
+app.include_router(metrics_router)
 app.include_router(admin_reply.router)
 
 @app.get("/")
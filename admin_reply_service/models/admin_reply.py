@@ -1,4 +1,10 @@
-from microserviceFullStack.dependencies.db import db
+from pymongo import ASCENDING, IndexModel
+from dependencies.db import get_db, register_indexes
+from dependencies.deadline import bounded_collection
+
+register_indexes("adminreplies", [
+    IndexModel([("ticketId", ASCENDING)], name="ticketId"),
+], queries=[{"ticketId": "ticket-id"}])
 
 def get_admin_reply_collection():
-    return db["adminreplies"]
+    return bounded_collection(get_db()["adminreplies"])
@@ -1,7 +1,12 @@
 from fastapi import FastAPI
+from dependencies.db import lifespan
+from dependencies.deadline import install_deadline
+from dependencies.metrics import router as metrics_router
 from routers import announcement_email
 
-app = FastAPI(title="Announcement Email Service")
+app = FastAPI(title="Announcement Email Service", lifespan=lifespan)
+install_deadline(app)
+app.include_router(metrics_router)
 app.include_router(announcement_email.router)
 
 @app.get("/")
@@ -1,4 +1,12 @@
-from microserviceFullStack.dependencies.db import db
+from pymongo import ASCENDING, DESCENDING, IndexModel
+from dependencies.db import get_db, register_indexes
+from dependencies.deadline import bounded_collection
+
+register_indexes("announcementEmails", [
+    IndexModel([("email", ASCENDING)], unique=True, name="email_unique"),
+    # The subscriber list is paged newest first by (createdAt, _id)
+    IndexModel([("createdAt", DESCENDING), ("_id", DESCENDING)], name="createdAt_id"),
+], queries=[{"email": "user@example.com"}])
 
 def get_announcement_email_collection():
-    return db["announcementEmails"]
+    return bounded_collection(get_db()["announcementEmails"])
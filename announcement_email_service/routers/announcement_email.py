@@ -1,12 +1,14 @@
 
 import logging
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query
 from ..services.announcement_email import (
     add_email_to_announcement_list,
     delete_email_from_announcement_list,
     get_emails_from_announcement_list
 )
 from ..schemas.announcement_email import AnnouncementEmailIn, AnnouncementEmailOut
+from dependencies.pagination import PageParams
+from dependencies.serialization import json_response
 
 logger = logging.getLogger(__name__)
 
@@ -38,12 +40,12 @@ async def delete_email(email: str):
         raise
 
 @router.get("/")
-async def get_emails():
+async def get_emails(page: PageParams = Depends()):
     logger.debug("[get_emails] Called")
     try:
-        result = await get_emails_from_announcement_list()
-        logger.info(f"[get_emails] Fetched {len(result) if result else 0} emails")
-        return result
+        result = await get_emails_from_announcement_list(page)
+        logger.info(f"[get_emails] Fetched {len(result['emails'])} emails")
+        return json_response(result)
     except Exception as e:
         logger.error(f"[get_emails] Failed to fetch emails: {e}")
         raise
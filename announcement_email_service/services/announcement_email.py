@@ -4,6 +4,8 @@ from fastapi import HTTPException
 from datetime import datetime
 from pymongo.errors import DuplicateKeyError
 import httpx
+from dependencies.deadline import outgoing_headers, timeout
+from dependencies.pagination import PageParams, paginate
 import os
 
 from typing import Optional
@@ -25,13 +27,13 @@ async def add_email_to_announcement_list(email: str, user_id: Optional[str] = No
         # Send mail via mail microservice
         MAIL_SERVICE_URL = os.getenv("MAIL_SERVICE_URL", "http://localhost:8001/send-mail/")
         FRONTEND_URL = os.getenv("FRONTEND_URL", "http://localhost:3000")
-        async with httpx.AsyncClient() as client:
+        async with httpx.AsyncClient(timeout=timeout(20.0)) as client:
             payload = {
                 "to": email,
                 "subject": "Subscribed to PDIT Announcements",
                 "text": f"You have successfully subscribed to PDIT Announcements. If you want to unsubscribe, please click this link: {FRONTEND_URL}/unsubscribe/{email}"
             }
-            await client.post(MAIL_SERVICE_URL, json=payload)
+            await client.post(MAIL_SERVICE_URL, json=payload, headers=outgoing_headers())
     except DuplicateKeyError:
         raise HTTPException(status_code=409, detail="Email already exists")
     return {"message": "Email added to announcement list"}
@@ -43,16 +45,18 @@ async def delete_email_from_announcement_list(email: str):
         raise HTTPException(status_code=404, detail="Email not found")
     return {"message": "Unsubscribed from PDIT"}
 
-async def get_emails_from_announcement_list():
+def serialize_email(doc):
+    return {
+        "email": doc.get("email"),
+        "user_id": str(doc.get("userId")) if doc.get("userId") else None,
+        "subscribed": doc.get("subscribed", False),
+        "created_at": doc.get("createdAt"),
+        "updated_at": doc.get("updatedAt"),
+        "id": str(doc.get("_id")),
+    }
+
+async def get_emails_from_announcement_list(page: PageParams):
     collection = get_announcement_email_collection()
-    emails = []
-    async for doc in collection.find({}):
-        emails.append({
-            "email": doc.get("email"),
-            "user_id": str(doc.get("userId")) if doc.get("userId") else None,
-            "subscribed": doc.get("subscribed", False),
-            "created_at": doc.get("createdAt"),
-            "updated_at": doc.get("updatedAt"),
-            "id": str(doc.get("_id")),
-        })
-    return {"emails": emails}
+    result = await paginate(collection, {}, page, sort_key="createdAt")
+    result.map(serialize_email)
+    return {"emails": result.items, "next_cursor": result.next_cursor}
@@ -1,7 +1,12 @@
 from fastapi import FastAPI
+from dependencies.db import lifespan
+from dependencies.deadline import install_deadline
+from dependencies.metrics import router as metrics_router
 from routers import announcement
 
-app = FastAPI(title="Announcement Service")
+app = FastAPI(title="Announcement Service", lifespan=lifespan)
+install_deadline(app)
+app.include_router(metrics_router)
 app.include_router(announcement.router)
 
 @app.get("/")
@@ -1,4 +1,11 @@
-from microserviceFullStack.dependencies.db import db
+from pymongo import DESCENDING, IndexModel
+from dependencies.db import get_db, register_indexes
+from dependencies.deadline import bounded_collection
+
+# Announcements are paged newest first by (created_at, _id)
+register_indexes("announcements", [
+    IndexModel([("created_at", DESCENDING), ("_id", DESCENDING)], name="created_at_id"),
+])
 
 def get_announcement_collection():
-    return db["announcements"]
+    return bounded_collection(get_db()["announcements"])
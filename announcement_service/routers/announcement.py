@@ -1,7 +1,7 @@
 
 import logging
-from fastapi import APIRouter, HTTPException
-from ..schemas.announcement import AnnouncementCreate, AnnouncementOut
+from fastapi import APIRouter, Depends
+from ..schemas.announcement import AnnouncementCreate
 from ..services.announcement import (
     insert_announcement,
     get_announcements,
@@ -9,7 +9,8 @@ from ..services.announcement import (
     update_announcement,
     delete_announcement,
 )
-from typing import List
+from dependencies.pagination import PageParams
+from dependencies.serialization import json_response
 
 logger = logging.getLogger(__name__)
 
@@ -30,12 +31,12 @@ async def insert_announcement_route(announcement: AnnouncementCreate):
         raise
 
 @router.get("/", response_model=dict)
-async def get_announcements_route():
+async def get_announcements_route(page: PageParams = Depends()):
     logger.debug("[get_announcements_route] Called")
     try:
-        result = await get_announcements()
-        logger.info(f"[get_announcements_route] Fetched {len(result) if result else 0} announcements")
-        return {"message": "Announcements fetched successfully", "data": result}
+        result = await get_announcements(page)
+        logger.info(f"[get_announcements_route] Fetched {len(result.items)} announcements")
+        return json_response({"message": "Announcements fetched successfully", "data": result.items, "next_cursor": result.next_cursor})
     except Exception as e:
         logger.error(f"[get_announcements_route] Failed to fetch announcements: {e}")
         raise
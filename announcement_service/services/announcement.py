@@ -3,6 +3,8 @@ from ..schemas.announcement import AnnouncementCreate, AnnouncementOut
 from bson import ObjectId
 from fastapi import HTTPException
 from datetime import datetime
+from dependencies.pagination import PageParams, paginate
+from dependencies.serialization import serialize_many
 
 async def insert_announcement(announcement: AnnouncementCreate):
     announcements = get_announcement_collection()
@@ -13,12 +15,10 @@ async def insert_announcement(announcement: AnnouncementCreate):
     ann_dict["_id"] = result.inserted_id
     return AnnouncementOut(**ann_dict)
 
-async def get_announcements():
+async def get_announcements(page: PageParams):
     announcements = get_announcement_collection()
-    result = []
-    async for ann in announcements.find({}).sort("created_at", -1):
-        ann["id"] = str(ann["_id"])
-        result.append(AnnouncementOut(**ann))
+    result = await paginate(announcements, {}, page, sort_key="created_at")
+    result.items = serialize_many(result.items, AnnouncementOut)
     return result
 
 async def get_announcement_by_id(id: str):
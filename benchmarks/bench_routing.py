@@ -0,0 +1,53 @@
+"""
+Micro-benchmark for the gateway route lookup.
+
+Compares the precompiled segment trie with the linear startswith scan the
+gateway used before.
+
+    python -m benchmarks.bench_routing
+"""
+import timeit
+
+from gateway_core.routing import RouteTable
+
+SERVICE_MAP = {
+    "/user": "http://localhost:8001",
+    "/project": "http://localhost:8002",
+    "/support_ticket": "http://localhost:8003",
+    "/admin_reply": "http://localhost:8004",
+    "/otp": "http://localhost:8005",
+    "/announcement": "http://localhost:8006",
+    "/announcement_email": "http://localhost:8007",
+    "/comparison-document": "http://localhost:8008",
+    "/translation-document": "http://localhost:8009",
+    "/service_tool": "http://localhost:8010",
+}
+
+PATHS = [
+    "user/api/user/64f1c2",
+    "project/api/user/64f1c2",
+    "announcement/api/announcement/",
+    "announcement_email/api/announcement/emails/",
+    "translation-document/api/document/project/64f1c2",
+    "service_tool/api/tools",
+    "unknown/path",
+]
+
+
+def linear_match(path):
+    for prefix, service_url in SERVICE_MAP.items():
+        if path.startswith(prefix.strip("/")):
+            return service_url
+    return None
+
+
+def main(number: int = 200_000):
+    table = RouteTable.build(SERVICE_MAP)
+    for name, fn in (("trie", table.match), ("linear", linear_match)):
+        elapsed = timeit.timeit(lambda: [fn(path) for path in PATHS], number=number)
+        per_lookup = elapsed / (number * len(PATHS)) * 1e9
+        print(f"{name:>6}: {per_lookup:8.1f} ns/lookup")
+
+
+if __name__ == "__main__":
+    main()
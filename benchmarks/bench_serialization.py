@@ -0,0 +1,121 @@
+"""
+Benchmark for turning Mongo list results into JSON responses.
+
+Compares the per-row path the services used before (stringify ids by hand,
+build one model per document, then FastAPI's jsonable_encoder and json.dumps
+for a response_model=dict route) with dependencies/serialization.py (one
+conversion pass, one TypeAdapter validation for the whole list, orjson).
+
+    python -m benchmarks.bench_serialization [--docs 10000] [--repeat 5]
+"""
+import argparse
+import json
+import time
+from datetime import datetime, timedelta
+
+from bson import ObjectId
+from fastapi.encoders import jsonable_encoder
+
+from dependencies.serialization import ORJSONResponse, serialize_many
+from project_service.schemas.project import ProjectOut
+from translation_document_service.schemas.translation_document import DocumentOut
+
+
+def make_projects(count: int) -> list:
+    now = datetime.utcnow()
+    user_id = ObjectId()
+    return [
+        {
+            "_id": ObjectId(),
+            "name": f"Project {i}",
+            "description": "Quarterly contract review " * 4,
+            "userId": user_id,
+            "serviceType": "translation",
+            "createdAt": now - timedelta(minutes=i),
+            "updatedAt": now,
+        }
+        for i in range(count)
+    ]
+
+
+def make_documents(count: int) -> list:
+    now = datetime.utcnow()
+    project_id, user_id = ObjectId(), ObjectId()
+    return [
+        {
+            "_id": ObjectId(),
+            "name": f"contract-{i}.docx",
+            "type": "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+            "isTranslated": i % 2 == 0,
+            "originalDocument": f"https://example.blob.core.windows.net/pdit/original/contract-{i}.docx",
+            "translatedDocument": f"https://example.blob.core.windows.net/pdit/translated/contract-{i}.docx",
+            "projectId": project_id,
+            "userId": user_id,
+            "sourceLanguage": "en",
+            "targetLanguage": "de",
+            "createdAt": now - timedelta(minutes=i),
+            "updatedAt": now,
+        }
+        for i in range(count)
+    ]
+
+
+def per_row_projects(docs: list) -> bytes:
+    result = []
+    for project in docs:
+        project = dict(project)
+        project["_id"] = str(project["_id"])
+        project["userId"] = str(project["userId"])
+        result.append(ProjectOut(**project))
+    return json.dumps(jsonable_encoder({"message": "ok", "data": result})).encode()
+
+
+def per_row_documents(docs: list) -> bytes:
+    result = []
+    for doc in docs:
+        doc = dict(doc)
+        doc["_id"] = str(doc["_id"])
+        doc["projectId"] = str(doc["projectId"])
+        doc["userId"] = str(doc["userId"])
+        result.append(DocumentOut(**doc))
+    return json.dumps(jsonable_encoder({"message": "ok", "data": result})).encode()
+
+
+def bulk(model):
+    def run(docs: list) -> bytes:
+        return ORJSONResponse({"message": "ok", "data": serialize_many(docs, model)}).body
+    return run
+
+
+def best_of(fn, docs: list, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn(docs)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mongo list serialization benchmark")
+    parser.add_argument("--docs", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    cases = [
+        ("projects", make_projects(args.docs), per_row_projects, bulk(ProjectOut)),
+        ("documents", make_documents(args.docs), per_row_documents, bulk(DocumentOut)),
+    ]
+    for name, docs, old, new in cases:
+        # Both paths must produce the same JSON
+        assert json.loads(old(docs[:10])) == json.loads(new(docs[:10])), name
+        old_seconds = best_of(old, docs, args.repeat)
+        new_seconds = best_of(new, docs, args.repeat)
+        print(
+            f"{name:>9} x{args.docs}: per-row {old_seconds * 1000:8.1f} ms   "
+            f"bulk {new_seconds * 1000:8.1f} ms   ({old_seconds / new_seconds:4.1f}x)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Compares request latency through the proxied topology (gateway -> service)
+with the in-process monolith. Start both first, for example:
+
+    python -m uvicorn gateway:app --port 8000      (plus the services)
+    python -m uvicorn monolith:app --port 8100
+
+then run:
+
+    python -m benchmarks.bench_topology --proxied http://localhost:8000 \\
+        --monolith http://localhost:8100 --path /announcement/api/announcement/
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+
+
+async def measure(base_url: str, paths, requests: int, concurrency: int) -> dict:
+    latencies = []
+    errors = 0
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async with httpx.AsyncClient(base_url=base_url, timeout=30.0) as client:
+        # Warm up connections so both topologies start from the same state
+        await asyncio.gather(*(client.get(path) for path in paths))
+
+        async def one(i: int):
+            nonlocal errors
+            async with semaphore:
+                started = time.perf_counter()
+                try:
+                    response = await client.get(paths[i % len(paths)])
+                    if response.status_code >= 500:
+                        errors += 1
+                except httpx.HTTPError:
+                    errors += 1
+                latencies.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(one(i) for i in range(requests)))
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "requests": requests,
+        "errors": errors,
+        "rps": requests / elapsed,
+        "mean_ms": statistics.mean(latencies) * 1000,
+        "p50_ms": latencies[len(latencies) // 2] * 1000,
+        "p99_ms": latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000,
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--proxied", default="http://localhost:8000", help="Gateway base URL")
+    parser.add_argument("--monolith", default="http://localhost:8100", help="Monolith base URL")
+    parser.add_argument("--path", action="append", dest="paths", help="Path to request (repeatable)")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    args = parser.parse_args()
+    paths = args.paths or ["/announcement/api/announcement/"]
+
+    for name, base_url in (("proxied", args.proxied), ("monolith", args.monolith)):
+        result = await measure(base_url, paths, args.requests, args.concurrency)
+        print(
+            f"{name:>8}: {result['rps']:8.1f} req/s  mean {result['mean_ms']:7.2f} ms  "
+            f"p50 {result['p50_ms']:7.2f} ms  p99 {result['p99_ms']:7.2f} ms  errors {result['errors']}"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
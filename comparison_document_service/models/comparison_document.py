@@ -1,4 +1,12 @@
-from microserviceFullStack.dependencies.db import db
+from bson import ObjectId
+from pymongo import ASCENDING, DESCENDING, IndexModel
+from dependencies.db import get_db, register_indexes
+from dependencies.deadline import bounded_collection
+
+# A project's documents are paged newest first by (createdAt, _id)
+register_indexes("comparison_documents", [
+    IndexModel([("projectId", ASCENDING), ("createdAt", DESCENDING), ("_id", DESCENDING)], name="projectId_createdAt_id"),
+], queries=[{"projectId": ObjectId()}])
 
 def get_comparison_document_collection():
-    return db["comparison_documents"]
+    return bounded_collection(get_db()["comparison_documents"])
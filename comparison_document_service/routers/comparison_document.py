@@ -1,6 +1,6 @@
 import logging
-from typing import List
-from fastapi import APIRouter, File, Form, HTTPException, status, UploadFile
+from typing import Optional
+from fastapi import APIRouter, Depends, File, Form, Query, status, UploadFile
 from comparison_document_service.schemas.comparison_document import ComparisonDocumentListOut, ComparisonDocumentOut, ComparisonDocumentUpdate
 from comparison_document_service.services.comparison_document import (
     create_comparison_document_with_files,
@@ -9,6 +9,8 @@ from comparison_document_service.services.comparison_document import (
     get_comparison_documents_by_project_id,
     update_comparison_document
 )
+from dependencies.pagination import PageParams
+from dependencies.serialization import json_response
 
 logger = logging.getLogger(__name__)
 
@@ -55,13 +57,18 @@ async def get_by_id(document_id: str):
         logger.error(f"[get_by_id] Failed to fetch document_id={document_id}: {e}")
         raise
 
-@router.get("/project/{project_id}", response_model=ComparisonDocumentListOut)
-async def get_by_project(project_id: str):
-    logger.debug(f"[get_by_project] Called with project_id={project_id}")
+# The body is written by json_response; the model only documents it
+@router.get("/project/{project_id}", responses={200: {"model": ComparisonDocumentListOut}})
+async def get_by_project(
+    project_id: str,
+    page: PageParams = Depends(),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return instead of the full summary"),
+):
+    logger.debug(f"[get_by_project] Called with project_id={project_id}, fields={fields}")
     try:
-        documents = await get_comparison_documents_by_project_id(project_id)
-        logger.info(f"[get_by_project] Found {len(documents)} documents for project ID: {project_id}")
-        return {"message": "Documents fetched successfully", "data": documents}
+        documents = await get_comparison_documents_by_project_id(project_id, page, fields)
+        logger.info(f"[get_by_project] Found {len(documents.items)} documents for project ID: {project_id}")
+        return json_response({"message": "Documents fetched successfully", "data": documents.items, "next_cursor": documents.next_cursor})
     except Exception as e:
         logger.error(f"[get_by_project] Failed for project_id={project_id}: {e}")
         raise
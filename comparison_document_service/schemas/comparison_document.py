@@ -37,6 +37,28 @@ class ComparisonDocumentOut(ComparisonDocumentBase):
         orm_mode = True
         allow_population_by_field_name = True
 
+class ComparisonDocumentSummary(BaseModel):
+    """List view: any subset of the document without comparisonData."""
+    id: str = Field(..., alias="_id")
+    name: Optional[str] = None
+    originalDocument: Optional[str] = None
+    modifiedDocument: Optional[str] = None
+    comparedDocument: Optional[str] = None
+    isCompared: Optional[bool] = None
+    model: Optional[str] = None
+    projectId: Optional[str] = None
+    type: Optional[str] = None
+    userId: Optional[str] = None
+    createdAt: Optional[datetime] = None
+    updatedAt: Optional[datetime] = None
+
+    class Config:
+        allow_population_by_field_name = True
+
+# Fields a list can return; comparisonData is only served by the single-document GET
+COMPARISON_SUMMARY_FIELDS = [name for name in ComparisonDocumentSummary.model_fields if name != "id"]
+
 class ComparisonDocumentListOut(BaseModel):
     message: str
-    data: List[ComparisonDocumentOut]
+    data: List[ComparisonDocumentSummary]
+    next_cursor: Optional[str] = None
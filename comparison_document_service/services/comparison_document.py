@@ -3,11 +3,22 @@ import os
 import httpx
 import asyncio
 from datetime import datetime
+from typing import Optional
 from bson import ObjectId
+from decouple import config
 from fastapi import UploadFile, HTTPException
-from microBackend.dependencies.azure_blob_service import upload_to_blob_storage, delete_blob_from_url
+from dependencies.azure_blob_service import upload_to_blob_storage, delete_blob_from_url
+from dependencies.deadline import check_deadline, create_background_task, timeout
+from dependencies.pagination import PageParams, paginate
+from dependencies.projection import list_projection
+from dependencies.serialization import serialize_many
 from comparison_document_service.models.comparison_document import get_comparison_document_collection
-from comparison_document_service.schemas.comparison_document import ComparisonDocumentUpdate, ComparisonDocumentOut
+from comparison_document_service.schemas.comparison_document import (
+    COMPARISON_SUMMARY_FIELDS, ComparisonDocumentOut, ComparisonDocumentSummary, ComparisonDocumentUpdate
+)
+
+# Overall budget for one background comparison (API call, uploads and DB update)
+COMPARISON_TIMEOUT = float(os.getenv("COMPARISON_TIMEOUT") or config("COMPARISON_TIMEOUT", default=600))
 
 # --- M1 MODEL WORKFLOW ---
 async def call_comparison_api_m1(document_id: str, original_file_url: str, modified_file_url: str, name: str):
@@ -19,10 +30,11 @@ async def call_comparison_api_m1(document_id: str, original_file_url: str, modif
         COMPARISON_API_URL = "http://20.55.73.107:6004/compare"
         payload = {"original_document": original_file_url, "modified_document": modified_file_url}
         
-        async with httpx.AsyncClient(timeout=600.0) as client:
+        async with httpx.AsyncClient(timeout=timeout(COMPARISON_TIMEOUT)) as client:
             response = await client.post(COMPARISON_API_URL, json=payload)
             
             if response.status_code == 200:
+                check_deadline()
                 api_response = response.json()
                 compared_url = api_response.get("output_file")
                 
@@ -91,10 +103,11 @@ async def call_and_process_m2_api(document_id: str, orig_content_bytes: bytes, o
             {"$content-type": mod_content_type, "$content": mod_b64}
         ]
 
-        async with httpx.AsyncClient(timeout=600.0) as client:
+        async with httpx.AsyncClient(timeout=timeout(COMPARISON_TIMEOUT)) as client:
             response = await client.post(M2_API_URL, json=payload)
 
         if response.status_code == 200:
+            check_deadline()
             api_response = response.json()
             
             # Decode all three PDFs from the API response
@@ -136,6 +149,7 @@ async def create_comparison_document_with_files(
     if model == "m2":
         # M2 Workflow: Create placeholder, respond, then process in background
         print("[SERVICE] M2 model selected. Creating placeholder document.")
+        # The M2 API takes both files base64-encoded in one JSON body, so they are read whole
         orig_content_bytes = await original_file.read()
         mod_content_bytes = await modified_file.read()
 
@@ -148,27 +162,26 @@ async def create_comparison_document_with_files(
         result = await documents.insert_one(doc_dict)
         
         # Trigger the full M2 workflow in the background
-        asyncio.create_task(call_and_process_m2_api(
+        create_background_task(call_and_process_m2_api(
             document_id=str(result.inserted_id),
             orig_content_bytes=orig_content_bytes,
             orig_content_type=original_file.content_type,
             mod_content_bytes=mod_content_bytes,
             mod_content_type=modified_file.content_type,
             name=name
-        ))
+        ), budget=COMPARISON_TIMEOUT)
     else:
         # M1 Workflow: Upload first, create full record, then process comparison
         print("[SERVICE] M1 model selected. Uploading initial documents.")
-        orig_content_bytes = await original_file.read()
-        mod_content_bytes = await modified_file.read()
-
+        # Both files are streamed to blob storage in blocks, side by side
         orig_ext = os.path.splitext(original_file.filename)[-1].lower()
         orig_blob_name = f"comparison/original/{name.strip().replace(' ', '_')}{orig_ext}"
-        orig_blob_url = await upload_to_blob_storage("pdit", orig_content_bytes, orig_blob_name, original_file.content_type)
-
         mod_ext = os.path.splitext(modified_file.filename)[-1].lower()
         mod_blob_name = f"comparison/modified/{name.strip().replace(' ', '_')}{mod_ext}"
-        mod_blob_url = await upload_to_blob_storage("pdit", mod_content_bytes, mod_blob_name, modified_file.content_type)
+        orig_blob_url, mod_blob_url = await asyncio.gather(
+            upload_to_blob_storage("pdit", original_file, orig_blob_name, original_file.content_type),
+            upload_to_blob_storage("pdit", modified_file, mod_blob_name, modified_file.content_type),
+        )
         
         doc_dict = {
             "name": name, "originalDocument": orig_blob_url, "modifiedDocument": mod_blob_url, "comparedDocument": None,
@@ -178,12 +191,12 @@ async def create_comparison_document_with_files(
         result = await documents.insert_one(doc_dict)
 
         # Trigger the M1 comparison in the background
-        asyncio.create_task(call_comparison_api_m1(
+        create_background_task(call_comparison_api_m1(
             document_id=str(result.inserted_id),
             original_file_url=orig_blob_url,
             modified_file_url=mod_blob_url,
             name=name
-        ))
+        ), budget=COMPARISON_TIMEOUT)
 
     # For both models, prepare and send the immediate response
     doc_dict["_id"] = str(result.inserted_id)
@@ -203,14 +216,18 @@ async def get_comparison_document_by_id(document_id: str):
     doc["userId"] = str(doc["userId"])
     return ComparisonDocumentOut(**doc)
 
-async def get_comparison_documents_by_project_id(project_id: str):
+async def get_comparison_documents_by_project_id(project_id: str, page: PageParams, fields: Optional[str] = None):
+    """
+    Lists a project's documents without their comparisonData; `fields` narrows
+    the summary to the given comma-separated fields.
+    """
     documents = get_comparison_document_collection()
-    result = []
-    async for doc in documents.find({"projectId": ObjectId(project_id)}):
-        doc["_id"] = str(doc["_id"])
-        doc["projectId"] = str(doc["projectId"])
-        doc["userId"] = str(doc["userId"])
-        result.append(ComparisonDocumentOut(**doc))
+    projection = list_projection(fields, COMPARISON_SUMMARY_FIELDS)
+    result = await paginate(
+        documents, {"projectId": ObjectId(project_id)}, page, sort_key="createdAt", projection=projection
+    )
+    # Only the selected fields go into the response
+    result.items = serialize_many(result.items, ComparisonDocumentSummary, exclude_unset=True)
     return result
 
 async def update_comparison_document(document_id: str, data: ComparisonDocumentUpdate):
@@ -1,16 +1,32 @@
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from jose import jwt, JWTError
 import os
 
 from decouple import config
+from dependencies.identity import verify_identity_headers
 JWT_SECRET = str(os.getenv("JWT_SECRET") or config("JWT_SECRET", default="your-secret-key"))
 
+# Trusted-header mode: accept the identity the gateway verified and signed
+# instead of decoding the JWT again. Only enable it when the service is
+# reachable through the gateway alone.
+GATEWAY_IDENTITY_SECRET = str(os.getenv("GATEWAY_IDENTITY_SECRET") or config("GATEWAY_IDENTITY_SECRET", default=""))
+TRUST_GATEWAY_IDENTITY = str(
+    os.getenv("AUTH_TRUST_GATEWAY_IDENTITY") or config("AUTH_TRUST_GATEWAY_IDENTITY", default="false")
+).lower() in ("1", "true", "yes")
+GATEWAY_IDENTITY_MAX_AGE = float(os.getenv("GATEWAY_IDENTITY_MAX_AGE") or config("GATEWAY_IDENTITY_MAX_AGE", default=60))
+
 auth_scheme = HTTPBearer(auto_error=False)
 
 async def get_current_user(
+    request: Request,
     credentials: HTTPAuthorizationCredentials = Depends(auth_scheme)
 ):
+    if TRUST_GATEWAY_IDENTITY:
+        identity = verify_identity_headers(GATEWAY_IDENTITY_SECRET, request.headers, GATEWAY_IDENTITY_MAX_AGE)
+        if identity is not None:
+            return identity
+        # No valid gateway signature (e.g. a direct call): verify the token here
     if credentials is None:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Missing token")
     token = credentials.credentials
@@ -1,17 +1,197 @@
 # app/services/azure_blob.py
+import asyncio
+import base64
+import math
 import os
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager, contextmanager
 from datetime import datetime
-from typing import Union, Optional
+from typing import Dict, Union, Optional
 from urllib.parse import urlparse
 
-from azure.core.exceptions import ResourceExistsError
-from azure.storage.blob import ContentSettings
-from azure.storage.blob.aio import BlobServiceClient
+import aiohttp
+from azure.core.exceptions import ResourceExistsError, ResourceNotFoundError
+from azure.core.pipeline.transport import AioHttpTransport
+from azure.storage.blob import BlobBlock, ContentSettings
+from azure.storage.blob.aio import BlobClient, BlobServiceClient, ContainerClient
 from decouple import config
 from fastapi import UploadFile
 
-AZURE_CONTAINER = str(os.getenv("AZURE_BLOB_CONTAINER") or config("AZURE_BLOB_CONTAINER", default="pdit"))
-blob_service_client = BlobServiceClient.from_connection_string(str(os.getenv("AZURE_STORAGE_CONNECTION_STRING") or config("AZURE_STORAGE_CONNECTION_STRING")))
+from dependencies.db import lifespan as db_lifespan
+from dependencies.deadline import bounded, timeout
+from dependencies.monitoring import LatencyHistogram
+
+
+def _setting(name: str, default):
+    return os.getenv(name) or config(name, default=default)
+
+
+AZURE_CONTAINER = str(_setting("AZURE_BLOB_CONTAINER", "pdit"))
+
+# Uploaded files are streamed to blob storage in blocks of this size, with up
+# to UPLOAD_CONCURRENCY blocks in flight (and in memory) at a time
+UPLOAD_BLOCK_SIZE = int(_setting("AZURE_UPLOAD_BLOCK_SIZE", 8 * 1024 * 1024))
+UPLOAD_CONCURRENCY = int(_setting("AZURE_UPLOAD_CONCURRENCY", 4))
+
+
+class BlobMetrics:
+    """Latency, failures and bytes per blob operation. Only updated from the event loop."""
+
+    def __init__(self):
+        self._latency: Dict[str, LatencyHistogram] = {}
+        self._bytes: Dict[str, int] = {}
+
+    def record(self, operation: str, ms: float, size: int, failed: bool):
+        histogram = self._latency.get(operation)
+        if histogram is None:
+            histogram = self._latency[operation] = LatencyHistogram()
+        histogram.observe(ms, failed)
+        self._bytes[operation] = self._bytes.get(operation, 0) + size
+
+    def stats(self) -> dict:
+        return {
+            operation: {"bytes": self._bytes.get(operation, 0), **histogram.as_dict()}
+            for operation, histogram in self._latency.items()
+        }
+
+
+class _Operation:
+    def __init__(self):
+        self.bytes = 0
+
+
+class BlobClientManager:
+    """
+    The service's Blob Storage clients. The service client and its aiohttp
+    session are created on first use, inside the event loop, with a tunable
+    connection pool and timeouts. Container clients are kept, and so are the
+    most recently used blob clients. Containers known to exist are
+    remembered, so uploads no longer try to create the container every time.
+    """
+
+    def __init__(self, connection_string: str, pool_size: int = 100, connect_timeout: float = 20,
+                 read_timeout: float = 60, blob_clients: int = 256):
+        self.connection_string = connection_string
+        self.pool_size = pool_size
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.max_blob_clients = blob_clients
+        self.metrics = BlobMetrics()
+        self._service: Optional[BlobServiceClient] = None
+        self._containers: Dict[str, ContainerClient] = {}
+        self._blobs: "OrderedDict[tuple, BlobClient]" = OrderedDict()
+        self._existing = set()
+
+    @property
+    def service(self) -> BlobServiceClient:
+        if self._service is None:
+            session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.pool_size, limit_per_host=self.pool_size),
+                cookie_jar=aiohttp.DummyCookieJar(),
+                auto_decompress=False,
+                trust_env=True,
+            )
+            transport = AioHttpTransport(
+                session=session, session_owner=True,
+                connection_timeout=self.connect_timeout, read_timeout=self.read_timeout,
+            )
+            # The SDK's own chunking of bytes uploads uses the same block size as upload_file_in_blocks
+            self._service = BlobServiceClient.from_connection_string(
+                self.connection_string, transport=transport,
+                max_block_size=UPLOAD_BLOCK_SIZE, max_single_put_size=UPLOAD_BLOCK_SIZE,
+            )
+            print(f"[AZURE] Blob client started (pool={self.pool_size}, connect={self.connect_timeout}s, read={self.read_timeout}s)")
+        return self._service
+
+    @property
+    def account_name(self) -> str:
+        return self.service.account_name
+
+    def container(self, name: str) -> ContainerClient:
+        client = self._containers.get(name)
+        if client is None:
+            client = self._containers[name] = self.service.get_container_client(name)
+        return client
+
+    def blob(self, container_name: str, blob_name: str) -> BlobClient:
+        key = (container_name, blob_name)
+        client = self._blobs.get(key)
+        if client is None:
+            client = self._blobs[key] = self.container(container_name).get_blob_client(blob_name)
+            if len(self._blobs) > self.max_blob_clients:
+                self._blobs.popitem(last=False)
+        else:
+            self._blobs.move_to_end(key)
+        return client
+
+    async def ensure_container(self, name: str) -> ContainerClient:
+        """Creates the container the first time it is used by this process."""
+        client = self.container(name)
+        if name not in self._existing:
+            try:
+                await bounded(client.create_container())
+                print(f"[AZURE] Created container: {name}")
+            except ResourceExistsError:
+                pass
+            self._existing.add(name)
+        return client
+
+    def forget_container(self, name: str):
+        """Called when a container turns out to be gone, so the next upload creates it again."""
+        self._existing.discard(name)
+
+    @contextmanager
+    def measure(self, operation: str):
+        """Times the block as one `operation`; set `.bytes` on the yielded object to count its size."""
+        measured = _Operation()
+        started = time.perf_counter()
+        failed = True
+        try:
+            yield measured
+            failed = False
+        finally:
+            self.metrics.record(operation, (time.perf_counter() - started) * 1000, measured.bytes, failed)
+
+    def stats(self) -> dict:
+        return {
+            "pool_size": self.pool_size,
+            "known_containers": sorted(self._existing),
+            "blob_clients": len(self._blobs),
+            "operations": self.metrics.stats(),
+        }
+
+    async def close(self):
+        if self._service is not None:
+            await self._service.close()
+            self._service = None
+            self._containers.clear()
+            self._blobs.clear()
+            print("[AZURE] Blob client closed")
+
+
+blob_manager = BlobClientManager(
+    str(os.getenv("AZURE_STORAGE_CONNECTION_STRING") or config("AZURE_STORAGE_CONNECTION_STRING")),
+    pool_size=int(_setting("AZURE_BLOB_POOL_SIZE", 100)),
+    connect_timeout=float(_setting("AZURE_BLOB_CONNECT_TIMEOUT", 20)),
+    read_timeout=float(_setting("AZURE_BLOB_READ_TIMEOUT", 60)),
+)
+
+
+@asynccontextmanager
+async def blob_lifespan(app):
+    """Lifespan for services that use Blob Storage: the Mongo lifespan, plus closing the blob clients."""
+    async with db_lifespan(app):
+        try:
+            yield
+        finally:
+            await blob_manager.close()
+
+
+def _server_timeout() -> Optional[int]:
+    """Server-side timeout in whole seconds for a blob call, from the time left."""
+    left = timeout()
+    return None if left is None else max(1, math.ceil(left))
 
 
 def generate_blob_name(folder: str, original_filename: str, custom_name: str = None) -> str:
@@ -24,6 +204,63 @@ def generate_blob_name(folder: str, original_filename: str, custom_name: str = N
     return f"{folder.strip('/')}/{safe_name}{ext}".replace(" ", "_")
 
 
+def _block_id(index: int) -> str:
+    # Every block id of a blob must have the same length
+    return base64.b64encode(f"{index:08d}".encode()).decode()
+
+
+async def upload_file_in_blocks(blob_client, file: UploadFile, content_settings: ContentSettings) -> int:
+    """
+    Streams an UploadFile to a block blob: reads it in UPLOAD_BLOCK_SIZE chunks,
+    stages up to UPLOAD_CONCURRENCY blocks in parallel and commits the block
+    list at the end. A chunk is only read once a staging slot is free, so an
+    upload never holds more than UPLOAD_CONCURRENCY blocks in memory. Files
+    that fit in one block are uploaded in a single request. Returns the size.
+    """
+    await file.seek(0)
+    slots = asyncio.Semaphore(max(1, UPLOAD_CONCURRENCY))
+    staging = []
+    size = 0
+
+    async def stage(block_id: str, chunk: bytes):
+        try:
+            await bounded(blob_client.stage_block(block_id, chunk, length=len(chunk), timeout=_server_timeout()))
+        finally:
+            slots.release()
+
+    try:
+        while True:
+            await slots.acquire()
+            chunk = await file.read(UPLOAD_BLOCK_SIZE)
+            if not staging and len(chunk) < UPLOAD_BLOCK_SIZE:
+                slots.release()
+                await bounded(blob_client.upload_blob(
+                    chunk, overwrite=True, content_settings=content_settings, timeout=_server_timeout()
+                ))
+                return len(chunk)
+            if not chunk:
+                slots.release()
+                break
+            size += len(chunk)
+            staging.append(asyncio.ensure_future(stage(_block_id(len(staging)), chunk)))
+            # Stop reading as soon as a block has failed
+            for task in staging:
+                if task.done() and task.exception() is not None:
+                    raise task.exception()
+        await asyncio.gather(*staging)
+    except BaseException:
+        for task in staging:
+            task.cancel()
+        raise
+
+    # Uncommitted blocks are discarded by the service, so a failed upload leaves the old blob intact
+    block_list = [BlobBlock(block_id=_block_id(index)) for index in range(len(staging))]
+    await bounded(blob_client.commit_block_list(
+        block_list, content_settings=content_settings, timeout=_server_timeout()
+    ))
+    return size
+
+
 # --- MODIFIED FUNCTION ---
 async def upload_to_blob_storage(
     container_name: str,
@@ -33,18 +270,15 @@ async def upload_to_blob_storage(
 ) -> str:
     """
     Uploads a file to Azure Blob Storage.
-    Can handle a FastAPI UploadFile object or raw bytes.
+    Can handle a FastAPI UploadFile object or raw bytes. UploadFiles are
+    streamed in blocks (see upload_file_in_blocks) instead of read whole.
     """
-    container_client = blob_service_client.get_container_client(container_name)
-    try:
-        await container_client.create_container()
-    except ResourceExistsError:
-        pass
+    await blob_manager.ensure_container(container_name)
 
     # --- New logic to handle both UploadFile and bytes ---
     if isinstance(file_data, UploadFile):
         # Existing workflow: get data and type from UploadFile object
-        upload_data = file_data.file
+        upload_data = file_data
         mime_type = file_data.content_type or 'application/octet-stream'
     elif isinstance(file_data, bytes):
         # New M2 workflow: use the provided bytes and content_type
@@ -57,7 +291,7 @@ async def upload_to_blob_storage(
     # --- End of new logic ---
 
     blob_name = custom_name.replace(" ", "_")
-    blob_client = container_client.get_blob_client(blob_name)
+    blob_client = blob_manager.blob(container_name, blob_name)
     
     # Use the determined mime_type
     content_settings = ContentSettings(
@@ -65,31 +299,50 @@ async def upload_to_blob_storage(
         content_disposition='inline'
     )
     
-    # Upload the determined data
-    await blob_client.upload_blob(upload_data, overwrite=True, content_settings=content_settings)
+    # Upload the determined data, bounded by the request deadline
+    with blob_manager.measure("upload") as upload:
+        try:
+            upload.bytes = await _upload(blob_client, upload_data, content_settings)
+        except ResourceNotFoundError:
+            # The container was deleted since this process created it
+            blob_manager.forget_container(container_name)
+            await blob_manager.ensure_container(container_name)
+            upload.bytes = await _upload(blob_client, upload_data, content_settings)
 
-    return f"https://{blob_service_client.account_name}.blob.core.windows.net/{container_name}/{blob_name}"
+    return f"https://{blob_manager.account_name}.blob.core.windows.net/{container_name}/{blob_name}"
 
 
-async def delete_blob_from_url(blob_url: str):
-    """
-    Deletes a blob using its public URL.
-    """
+async def _upload(blob_client, upload_data: Union[UploadFile, bytes], content_settings: ContentSettings) -> int:
+    if isinstance(upload_data, bytes):
+        await bounded(blob_client.upload_blob(
+            upload_data, overwrite=True, content_settings=content_settings,
+            max_concurrency=UPLOAD_CONCURRENCY, timeout=_server_timeout()
+        ))
+        return len(upload_data)
+    return await upload_file_in_blocks(blob_client, upload_data, content_settings)
+
+
+def _blob_path(blob_url: str) -> tuple:
+    """(container, blob path) of one of our blob URLs."""
     parsed_url = urlparse(blob_url)
     path_parts = parsed_url.path.lstrip("/").split("/", 1)
 
     if len(path_parts) != 2 or path_parts[0] != AZURE_CONTAINER:
         raise ValueError("Invalid blob URL: container not found or incorrect path.")
+    return path_parts[0], path_parts[1]
 
-    container_name = path_parts[0]
-    blob_path = path_parts[1]
 
-    container_client = blob_service_client.get_container_client(container_name)
-    blob_client = container_client.get_blob_client(blob_path)
+async def delete_blob_from_url(blob_url: str):
+    """
+    Deletes a blob using its public URL.
+    """
+    container_name, blob_path = _blob_path(blob_url)
+    blob_client = blob_manager.blob(container_name, blob_path)
 
     try:
-        await blob_client.delete_blob()
+        with blob_manager.measure("delete"):
+            await bounded(blob_client.delete_blob(timeout=_server_timeout()))
         print(f"[AZURE] Deleted blob: {blob_path}")
     except Exception as e:
         print(f"[AZURE] Failed to delete blob: {blob_path}, Error: {e}")
-        raise e
\ No newline at end of file
+        raise e
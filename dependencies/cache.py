@@ -0,0 +1,203 @@
+# cache.py
+# Read-through cache for entities that are read far more often than written
+# (users, projects).
+#
+# get_or_load() serves an entity from the cache or loads it once, however
+# many requests ask for it at the same time. Services call put() after an
+# update (write-through) and invalidate() after a delete. Values are the
+# serialised entities; callers must treat them as read-only, since the local
+# backend hands out the stored object itself.
+#
+# The local backend is a bounded LRU in this process, so other instances of a
+# service only see a change once the entry's TTL has run out. Deployments
+# running several instances can plug in a shared backend with
+# ENTITY_CACHE_BACKEND ("package.module:ClassName").
+
+import asyncio
+import importlib
+import os
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from decouple import config
+
+
+def _setting(name: str, default):
+    return os.getenv(name) or config(name, default=default)
+
+
+class CacheBackend(ABC):
+    """Storage for cached entities. `get` returns None for a miss."""
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[Any]:
+        """The stored value, or None when it is missing or expired."""
+
+    @abstractmethod
+    async def set(self, key: str, value: Any, ttl: float):
+        """Stores `value` for `ttl` seconds."""
+
+    @abstractmethod
+    async def delete(self, key: str):
+        """Removes the value, if any."""
+
+    def stats(self) -> dict:
+        return {}
+
+
+class LocalCacheBackend(CacheBackend):
+    """In-process LRU with a per-entry expiry. Only used from the event loop, so it needs no lock."""
+
+    def __init__(self, max_entries: int = 10000):
+        self.max_entries = max(1, max_entries)
+        # key -> (expires at, value), least recently used first
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self.evictions = 0
+
+    async def get(self, key: str) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry[0] <= time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return entry[1]
+
+    async def set(self, key: str, value: Any, ttl: float):
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    async def delete(self, key: str):
+        self._entries.pop(key, None)
+
+    def stats(self) -> dict:
+        return {"backend": "local", "entries": len(self._entries), "max_entries": self.max_entries, "evictions": self.evictions}
+
+
+def load_backend(spec: str) -> CacheBackend:
+    if spec in ("", "local"):
+        return LocalCacheBackend(max_entries=int(_setting("ENTITY_CACHE_MAX_ENTRIES", 10000)))
+    module_name, _, class_name = spec.partition(":")
+    return getattr(importlib.import_module(module_name), class_name)()
+
+
+class EntityCache:
+    """
+    Cache for one kind of entity. Concurrent misses for the same key share a
+    single load (stampede protection), and a load that was overtaken by put()
+    or invalidate() is not stored. Backend errors are logged and the entity
+    is loaded from the database instead.
+    """
+
+    def __init__(self, name: str, ttl: float, backend: Optional[CacheBackend] = None, enabled: bool = True):
+        self.name = name
+        self.ttl = ttl
+        self.enabled = enabled
+        self.backend = backend or load_backend(str(_setting("ENTITY_CACHE_BACKEND", "local")))
+        self._loading: Dict[str, asyncio.Task] = {}
+        self.hits = 0
+        self.misses = 0
+        self.loads = 0
+        self.coalesced = 0
+        self.invalidations = 0
+        self.errors = 0
+
+    def _key(self, key: str) -> str:
+        return f"{self.name}:{key}"
+
+    async def get_or_load(self, key: str, loader: Callable[[], Awaitable[Any]]) -> Any:
+        if not self.enabled:
+            return await loader()
+        try:
+            value = await self.backend.get(self._key(key))
+        except Exception as e:
+            self.errors += 1
+            print(f"[CACHE] {self.name} backend get failed: {e}")
+            value = None
+        if value is not None:
+            self.hits += 1
+            return value
+
+        self.misses += 1
+        task = self._loading.get(key)
+        if task is not None:
+            self.coalesced += 1
+        else:
+            task = asyncio.ensure_future(self._load(key, loader))
+            self._loading[key] = task
+        # A caller that gives up must not cancel the load for the others
+        return await asyncio.shield(task)
+
+    async def _load(self, key: str, loader: Callable[[], Awaitable[Any]]) -> Any:
+        this = asyncio.current_task()
+        try:
+            self.loads += 1
+            value = await loader()
+            if value is not None and self._loading.get(key) is this:
+                await self._store(key, value)
+            return value
+        finally:
+            if self._loading.get(key) is this:
+                del self._loading[key]
+
+    async def _store(self, key: str, value: Any):
+        try:
+            await self.backend.set(self._key(key), value, self.ttl)
+        except Exception as e:
+            self.errors += 1
+            print(f"[CACHE] {self.name} backend set failed: {e}")
+
+    async def put(self, key: str, value: Any):
+        """Write-through after an update."""
+        self._loading.pop(key, None)
+        if self.enabled:
+            await self._store(key, value)
+
+    async def invalidate(self, key: str):
+        self._loading.pop(key, None)
+        self.invalidations += 1
+        if not self.enabled:
+            return
+        try:
+            await self.backend.delete(self._key(key))
+        except Exception as e:
+            self.errors += 1
+            print(f"[CACHE] {self.name} backend delete failed: {e}")
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "loads": self.loads,
+            "coalesced": self.coalesced,
+            "invalidations": self.invalidations,
+            "errors": self.errors,
+            **self.backend.stats(),
+        }
+
+
+_caches: Dict[str, EntityCache] = {}
+
+
+def entity_cache(name: str, default_ttl: float = 60) -> EntityCache:
+    """The cache for entity `name`; its TTL is read from <NAME>_CACHE_TTL."""
+    cache = _caches.get(name)
+    if cache is None:
+        enabled = str(_setting("ENTITY_CACHE", "true")).lower() in ("1", "true", "yes")
+        ttl = float(_setting(f"{name.upper()}_CACHE_TTL", default_ttl))
+        cache = _caches[name] = EntityCache(name, ttl, enabled=enabled)
+    return cache
+
+
+def cache_stats() -> dict:
+    return {name: cache.stats() for name, cache in _caches.items()}
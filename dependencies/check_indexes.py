@@ -0,0 +1,85 @@
+"""
+Reports Mongo query shapes that still run as collection scans.
+
+    python -m dependencies.check_indexes [--ensure] [--profile]
+
+Explains every query shape registered with register_indexes() in the
+models and lists the ones whose winning plan contains a COLLSCAN. With
+--ensure the registered indexes are created first. With --profile, slow
+queries recorded by the database profiler (db.setProfilingLevel(1)) that
+used a COLLSCAN are listed too, grouped by collection and filter keys.
+Exits with status 1 when any collection scan is found.
+"""
+import argparse
+import asyncio
+import importlib
+import sys
+
+from dependencies.db import QUERY_SHAPES, close_client, ensure_indexes, get_db
+from dependencies.monitoring import plan_stages, winning_plan
+
+MODEL_MODULES = [
+    "admin_reply_service.models.admin_reply",
+    "announcement_email_service.models.announcement_email",
+    "announcement_service.models.announcement",
+    "comparison_document_service.models.comparison_document",
+    "otp_service.models.otp",
+    "project_service.models.project",
+    "service_tool_service.models.service_tool",
+    "support_ticket_service.models.support_ticket",
+    "translation_document_service.models.translation_document",
+    "user_service.models.user",
+]
+
+
+def shape_of(query: dict) -> str:
+    return "{" + ", ".join(sorted(query)) + "}"
+
+
+async def explain_registered_shapes() -> list:
+    scans = []
+    for collection_name, queries in QUERY_SHAPES.items():
+        for query in queries:
+            explain = await get_db()[collection_name].find(query).explain()
+            stages = list(plan_stages(winning_plan(explain)))
+            status = "COLLSCAN" if "COLLSCAN" in stages else "ok"
+            print(f"{status:>8}  {collection_name} {shape_of(query)}  [{' <- '.join(stages)}]")
+            if status == "COLLSCAN":
+                scans.append((collection_name, shape_of(query)))
+    return scans
+
+
+async def profiled_collection_scans() -> list:
+    shapes = {}
+    async for entry in get_db()["system.profile"].find({"planSummary": "COLLSCAN"}):
+        command = entry.get("command", {})
+        query = command.get("filter", command.get("query", {})) or {}
+        key = (entry.get("ns", "?"), shape_of(query))
+        shapes[key] = shapes.get(key, 0) + 1
+    for (namespace, shape), count in sorted(shapes.items(), key=lambda item: -item[1]):
+        print(f"COLLSCAN  {namespace} {shape}  ({count} profiled)")
+    return list(shapes)
+
+
+async def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--ensure", action="store_true", help="Create the registered indexes first")
+    parser.add_argument("--profile", action="store_true", help="Also report COLLSCANs from system.profile")
+    args = parser.parse_args()
+
+    for module in MODEL_MODULES:
+        importlib.import_module(module)
+    try:
+        if args.ensure:
+            await ensure_indexes()
+        scans = await explain_registered_shapes()
+        if args.profile:
+            scans += await profiled_collection_scans()
+    finally:
+        close_client()
+    print(f"\n{len(scans)} query shape(s) doing a collection scan")
+    return 1 if scans else 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
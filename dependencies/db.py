@@ -1,13 +1,220 @@
 # db.py for user_service dependencies
+#
+# One Mongo client per process. Services start and close it from their
+# lifespan; models reach it through get_db(), which also creates it on first
+# use for scripts that run without a lifespan.
+import asyncio
+import os
+import threading
+import time
+from contextlib import asynccontextmanager
+from typing import Dict, Iterable, List, Optional
+
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import IndexModel, monitoring
+from pymongo.errors import PyMongoError
 from decouple import config
-import os
 
-MONGO_URL = str(os.getenv('MONGODB_URL') or config('MONGODB_URL', default='mongodb://localhost:27017/PDIT'))
+from dependencies.monitoring import command_metrics
+
+
+def _setting(name: str, default):
+    return os.getenv(name) or config(name, default=default)
+
+
+class MongoSettings:
+    """Client and connection pool settings. Every value can be overridden through the environment."""
+
+    def __init__(self):
+        self.url = str(_setting('MONGODB_URL', 'mongodb://localhost:27017/PDIT'))
+        self.db_name = self.url.rsplit("/", 1)[-1].split("?", 1)[0]
+        self.max_pool_size = int(_setting('MONGODB_MAX_POOL_SIZE', 100))
+        self.min_pool_size = int(_setting('MONGODB_MIN_POOL_SIZE', 0))
+        self.max_idle_time_ms = int(_setting('MONGODB_MAX_IDLE_TIME_MS', 60000))
+        # How long a request waits for a free pooled connection before failing
+        self.wait_queue_timeout_ms = int(_setting('MONGODB_WAIT_QUEUE_TIMEOUT_MS', 5000))
+        self.server_selection_timeout_ms = int(_setting('MONGODB_SERVER_SELECTION_TIMEOUT_MS', 10000))
+        # Wire compression, e.g. "zstd,snappy" (needs zstandard / python-snappy installed)
+        self.compressors = str(_setting('MONGODB_COMPRESSORS', ''))
+        self.read_preference = str(_setting('MONGODB_READ_PREFERENCE', 'primary'))
+        self.app_name = str(_setting('MONGODB_APP_NAME', 'microBackend'))
+
+    def client_options(self) -> dict:
+        options = {
+            "maxPoolSize": self.max_pool_size,
+            "minPoolSize": self.min_pool_size,
+            "maxIdleTimeMS": self.max_idle_time_ms,
+            "waitQueueTimeoutMS": self.wait_queue_timeout_ms,
+            "serverSelectionTimeoutMS": self.server_selection_timeout_ms,
+            "readPreference": self.read_preference,
+            "appname": self.app_name,
+        }
+        if self.compressors:
+            options["compressors"] = self.compressors
+        return options
+
+
+class PoolMetrics(monitoring.ConnectionPoolListener):
+    """
+    Connection pool counters and checkout wait times from pymongo's pool
+    events. Motor runs driver calls on worker threads and a checkout starts
+    and ends on the same thread, so the wait is timed per thread.
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self.connections_created = 0
+        self.connections_closed = 0
+        self.checked_out = 0
+        self.checkouts = 0
+        self.checkout_failures = 0
+        self.pool_clears = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    def pool_created(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        with self._lock:
+            self.pool_clears += 1
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_created(self, event):
+        with self._lock:
+            self.connections_created += 1
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        with self._lock:
+            self.connections_closed += 1
+
+    def connection_check_out_started(self, event):
+        self._local.started = time.perf_counter()
+
+    def connection_check_out_failed(self, event):
+        waited = self._waited()
+        with self._lock:
+            self.checkout_failures += 1
+            self._record_wait(waited)
+
+    def connection_checked_out(self, event):
+        waited = self._waited()
+        with self._lock:
+            self.checkouts += 1
+            self.checked_out += 1
+            self._record_wait(waited)
+
+    def connection_checked_in(self, event):
+        with self._lock:
+            self.checked_out -= 1
+
+    def _waited(self) -> Optional[float]:
+        started = getattr(self._local, "started", None)
+        self._local.started = None
+        return None if started is None else time.perf_counter() - started
+
+    def _record_wait(self, waited: Optional[float]):
+        if waited is None:
+            return
+        self.wait_seconds_total += waited
+        self.wait_seconds_max = max(self.wait_seconds_max, waited)
+
+    def stats(self) -> dict:
+        with self._lock:
+            waits = self.checkouts + self.checkout_failures
+            return {
+                "open_connections": self.connections_created - self.connections_closed,
+                "checked_out": self.checked_out,
+                "checkouts": self.checkouts,
+                "checkout_failures": self.checkout_failures,
+                "pool_clears": self.pool_clears,
+                "avg_wait_ms": round(self.wait_seconds_total / waits * 1000, 3) if waits else 0.0,
+                "max_wait_ms": round(self.wait_seconds_max * 1000, 3),
+            }
+
+
+settings = MongoSettings()
+pool_metrics = PoolMetrics()
+ENSURE_INDEXES = str(_setting('MONGODB_ENSURE_INDEXES', 'true')).lower() in ('1', 'true', 'yes')
+
+_client: Optional[AsyncIOMotorClient] = None
+
+
+def start_client() -> AsyncIOMotorClient:
+    """Creates the shared client if it does not exist yet."""
+    global _client
+    if _client is None:
+        _client = AsyncIOMotorClient(
+            settings.url, event_listeners=[pool_metrics, command_metrics], **settings.client_options()
+        )
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+        # Slow commands are explained on the service's event loop
+        command_metrics.attach(loop, get_db)
+        print(f"[DB] Mongo client started for '{settings.db_name}' (maxPoolSize={settings.max_pool_size})")
+    return _client
+
+
+def close_client():
+    global _client
+    if _client is not None:
+        _client.close()
+        _client = None
+        print("[DB] Mongo client closed")
+
+
+def get_client() -> AsyncIOMotorClient:
+    return start_client()
+
+
+def get_db():
+    return get_client()[settings.db_name]
+
+
+# Index registry: each models/*.py declares the indexes its collection needs
+# (and the query shapes they serve) with register_indexes(). Every service
+# creates the indexes of the models it imports when it starts.
+INDEXES: Dict[str, List[IndexModel]] = {}
+QUERY_SHAPES: Dict[str, List[dict]] = {}
+
+
+def register_indexes(collection_name: str, indexes: Iterable[IndexModel], queries: Iterable[dict] = ()):
+    """
+    Declares indexes for a collection. `queries` are example filters for the
+    query shapes the indexes should serve; `python -m dependencies.check_indexes`
+    explains them to catch collection scans.
+    """
+    INDEXES.setdefault(collection_name, []).extend(indexes)
+    QUERY_SHAPES.setdefault(collection_name, []).extend(queries)
+
+
+async def ensure_indexes(database=None):
+    """Creates every registered index. Existing indexes are left untouched."""
+    database = database if database is not None else get_db()
+    for collection_name, indexes in INDEXES.items():
+        try:
+            names = await database[collection_name].create_indexes(indexes)
+            print(f"[DB] Indexes ready on {collection_name}: {', '.join(names)}")
+        except PyMongoError as e:
+            # e.g. duplicate emails blocking a unique index; keep the service up
+            print(f"[DB] Failed to create indexes on {collection_name}: {e}")
 
-# Add this line to check
-print(f"Attempting to connect with URL: {MONGO_URL}") 
 
-client = AsyncIOMotorClient(MONGO_URL)
-db_name = MONGO_URL.rsplit("/", 1)[-1].split("?", 1)[0]
-db = client[db_name]
\ No newline at end of file
+@asynccontextmanager
+async def lifespan(app):
+    """Service lifespan: starts the shared Mongo client and prepares the registered indexes."""
+    start_client()
+    try:
+        if ENSURE_INDEXES:
+            await ensure_indexes()
+        yield
+    finally:
+        close_client()
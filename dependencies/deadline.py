@@ -0,0 +1,207 @@
+# deadline.py
+# Request deadlines shared by every service.
+#
+# The gateway sends X-Request-Deadline (absolute Unix time in seconds). The
+# middleware installed by install_deadline() stores it in a context variable
+# for the duration of the request, and the helpers below bound Mongo, Blob and
+# outgoing HTTP calls by the time that is left, so work stops once the caller
+# has given up. Background work started with create_background_task() runs
+# detached from the request deadline, under its own budget.
+
+import asyncio
+import contextvars
+import time
+from typing import Any, Awaitable, Coroutine, Optional
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+DEADLINE_HEADER = "X-Request-Deadline"
+
+# Monotonic time by which the current request must finish, if any
+_deadline: contextvars.ContextVar[Optional[float]] = contextvars.ContextVar("request_deadline", default=None)
+
+
+class DeadlineExceeded(Exception):
+    """Raised when the current request has no time left for more work."""
+
+
+def format_deadline(epoch_seconds: float) -> str:
+    return f"{epoch_seconds:.3f}"
+
+
+def parse_deadline(value: Optional[str]) -> Optional[float]:
+    """Converts an X-Request-Deadline value into a monotonic deadline."""
+    if not value:
+        return None
+    try:
+        epoch_seconds = float(value)
+    except ValueError:
+        return None
+    return time.monotonic() + (epoch_seconds - time.time())
+
+
+def remaining() -> Optional[float]:
+    """Seconds left for the current request, or None when it has no deadline."""
+    deadline = _deadline.get()
+    if deadline is None:
+        return None
+    return deadline - time.monotonic()
+
+
+def check_deadline():
+    """Stops work early once the deadline has passed."""
+    left = remaining()
+    if left is not None and left <= 0:
+        raise DeadlineExceeded("Request deadline exceeded")
+
+
+def timeout(cap: Optional[float] = None) -> Optional[float]:
+    """The smaller of `cap` and the time left, for httpx/SMTP timeouts."""
+    check_deadline()
+    left = remaining()
+    if left is None:
+        return cap
+    return left if cap is None else min(cap, left)
+
+
+def max_time_ms(cap_ms: Optional[int] = None) -> Optional[int]:
+    """The time left in whole milliseconds, for Mongo's maxTimeMS."""
+    left = timeout(None if cap_ms is None else cap_ms / 1000)
+    if left is None:
+        return None
+    return max(1, int(left * 1000))
+
+
+def outgoing_headers() -> dict:
+    """Headers that pass the current deadline on to another service."""
+    left = remaining()
+    if left is None:
+        return {}
+    return {DEADLINE_HEADER: format_deadline(time.time() + left)}
+
+
+async def bounded(awaitable: Awaitable[Any], cap: Optional[float] = None) -> Any:
+    """Awaits `awaitable`, giving up with DeadlineExceeded when the time runs out."""
+    try:
+        limit = timeout(cap)
+    except DeadlineExceeded:
+        # Never awaited, so close it rather than leave it pending
+        if asyncio.iscoroutine(awaitable):
+            awaitable.close()
+        raise
+    return await _within(awaitable, limit)
+
+
+async def _within(awaitable: Awaitable[Any], limit: Optional[float]) -> Any:
+    if limit is None:
+        return await awaitable
+    try:
+        return await asyncio.wait_for(awaitable, timeout=limit)
+    except asyncio.TimeoutError:
+        raise DeadlineExceeded("Request deadline exceeded")
+
+
+def create_background_task(coro: Coroutine, budget: Optional[float] = None) -> asyncio.Task:
+    """
+    Starts `coro` detached from the current request's deadline, so it is not
+    cut short when the response is sent. `budget` gives it a deadline of its own.
+    """
+    context = contextvars.copy_context()
+    context.run(_deadline.set, None if budget is None else time.monotonic() + budget)
+    return asyncio.get_running_loop().create_task(coro, context=context)
+
+
+# Mongo operations that accept maxTimeMS, and the keyword each one takes
+_MAX_TIME_KWARG = {
+    "find": "max_time_ms",
+    "find_one": "max_time_ms",
+    "aggregate": "maxTimeMS",
+    "count_documents": "maxTimeMS",
+    "distinct": "maxTimeMS",
+    "find_one_and_update": "maxTimeMS",
+    "find_one_and_replace": "maxTimeMS",
+    "find_one_and_delete": "maxTimeMS",
+}
+
+# Writes have no maxTimeMS on this driver, so the wait for them is bounded instead
+_BOUNDED_WRITES = {
+    "insert_one", "insert_many", "update_one", "update_many",
+    "replace_one", "delete_one", "delete_many", "bulk_write",
+}
+
+
+class DeadlineCollection:
+    """
+    Wraps a Motor collection so reads carry maxTimeMS and writes are awaited
+    no longer than the request deadline allows. Everything else passes through.
+    """
+
+    def __init__(self, collection):
+        self._collection = collection
+
+    def __getattr__(self, name: str):
+        attribute = getattr(self._collection, name)
+        if name in _MAX_TIME_KWARG:
+            kwarg = _MAX_TIME_KWARG[name]
+
+            def with_max_time(*args, **kwargs):
+                limit = max_time_ms()
+                if limit is not None and kwarg not in kwargs:
+                    kwargs[kwarg] = limit
+                return attribute(*args, **kwargs)
+
+            return with_max_time
+        if name in _BOUNDED_WRITES:
+            def with_deadline(*args, **kwargs):
+                # Checked before the call: Motor may start the write as soon
+                # as it is called, whether or not the result is awaited.
+                limit = timeout()
+                return _within(attribute(*args, **kwargs), limit)
+
+            return with_deadline
+        return attribute
+
+    def __getitem__(self, name: str):
+        return DeadlineCollection(self._collection[name])
+
+
+def bounded_collection(collection) -> DeadlineCollection:
+    return DeadlineCollection(collection)
+
+
+class DeadlineMiddleware:
+    """Reads X-Request-Deadline into the request context (pure ASGI, keeps contextvars intact)."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        value = None
+        for name, raw in scope.get("headers", []):
+            if name == b"x-request-deadline":
+                value = raw.decode("latin-1")
+                break
+        token = _deadline.set(parse_deadline(value))
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _deadline.reset(token)
+
+
+async def deadline_exceeded_handler(request: Request, exc: Exception):
+    return JSONResponse(status_code=504, content={"detail": "Request deadline exceeded"})
+
+
+def install_deadline(app: FastAPI):
+    """Adds deadline handling to a service app."""
+    app.add_middleware(DeadlineMiddleware)
+    app.add_exception_handler(DeadlineExceeded, deadline_exceeded_handler)
+    # Imported here so the gateway can use this module without the Mongo driver
+    from pymongo.errors import ExecutionTimeout
+
+    # Mongo stopped a query that ran past its maxTimeMS
+    app.add_exception_handler(ExecutionTimeout, deadline_exceeded_handler)
@@ -0,0 +1,54 @@
+# identity.py
+# Signed identity headers the gateway forwards after verifying a JWT.
+# The gateway signs them with GATEWAY_IDENTITY_SECRET; services configured to
+# trust the gateway check the signature instead of decoding the token again.
+
+import hashlib
+import hmac
+import time
+from typing import Mapping, Optional
+
+USER_ID_HEADER = "x-user-id"
+ROLE_HEADER = "x-role"
+ISSUED_AT_HEADER = "x-identity-issued-at"
+SIGNATURE_HEADER = "x-identity-signature"
+
+# Headers a client must never be able to set on its own
+IDENTITY_HEADERS = frozenset({USER_ID_HEADER, ROLE_HEADER, ISSUED_AT_HEADER, SIGNATURE_HEADER})
+
+
+def sign_identity(secret: str, user_id: str, role: str, issued_at: int) -> str:
+    message = f"{user_id}\n{role}\n{issued_at}".encode()
+    return hmac.new(secret.encode(), message, hashlib.sha256).hexdigest()
+
+
+def identity_headers(secret: str, user_id: Optional[str], role: str) -> dict:
+    issued_at = int(time.time())
+    user_id = user_id or ""
+    return {
+        USER_ID_HEADER: user_id,
+        ROLE_HEADER: role,
+        ISSUED_AT_HEADER: str(issued_at),
+        SIGNATURE_HEADER: sign_identity(secret, user_id, role, issued_at),
+    }
+
+
+def verify_identity_headers(secret: str, headers: Mapping[str, str], max_age: float) -> Optional[dict]:
+    """
+    Returns {"user_id", "role"} if the headers carry a valid, recent gateway
+    signature, otherwise None.
+    """
+    signature = headers.get(SIGNATURE_HEADER)
+    role = headers.get(ROLE_HEADER)
+    if not secret or not signature or not role:
+        return None
+    user_id = headers.get(USER_ID_HEADER, "")
+    try:
+        issued_at = int(headers.get(ISSUED_AT_HEADER, ""))
+    except ValueError:
+        return None
+    if abs(time.time() - issued_at) > max_age:
+        return None
+    if not hmac.compare_digest(signature, sign_identity(secret, user_id, role, issued_at)):
+        return None
+    return {"user_id": user_id or None, "role": role}
@@ -4,6 +4,8 @@ import os
 from decouple import config
 from typing import Optional
 
+from dependencies.deadline import DeadlineExceeded, timeout
+
 async def send_mail(
     to: str,
     subject: str,
@@ -38,9 +40,11 @@ async def send_mail(
             username=EMAIL_USER,
             password=EMAIL_PASSWORD,
             use_tls=True,
-            timeout=20
+            timeout=timeout(20)
         )
         return {"success": True, "message": "Email sent successfully"}
+    except DeadlineExceeded:
+        raise
     except aiosmtplib.SMTPException as e:
         return {"success": False, "error": f"SMTP error: {str(e)}"}
     except Exception as e:
@@ -0,0 +1,30 @@
+# metrics.py
+# GET /_metrics for every service: Mongo pool and command statistics, recent
+# slow queries with their plans, the entity caches and, in services that use
+# Blob Storage, the blob operations.
+
+import sys
+
+from fastapi import APIRouter
+
+from dependencies.cache import cache_stats
+from dependencies.db import pool_metrics
+from dependencies.monitoring import command_metrics
+
+router = APIRouter(tags=["Metrics"])
+
+
+@router.get("/_metrics")
+async def service_metrics():
+    metrics = {
+        "mongo": {
+            "pool": pool_metrics.stats(),
+            **command_metrics.stats(),
+        },
+        "entity_cache": cache_stats(),
+    }
+    # Only reported where the service imported it; the Azure SDK is not installed everywhere
+    blob_service = sys.modules.get("dependencies.azure_blob_service")
+    if blob_service is not None:
+        metrics["blob"] = blob_service.blob_manager.stats()
+    return metrics
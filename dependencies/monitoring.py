@@ -0,0 +1,271 @@
+# monitoring.py
+# Mongo command monitoring for every service.
+#
+# CommandMetrics is a pymongo CommandListener registered on the shared client
+# in dependencies/db.py. It keeps a latency histogram per (collection,
+# command) and per normalised query shape, where every literal value is
+# replaced by "?" so {"email": "a@b.c"} and {"email": "x@y.z"} count as one
+# shape. Commands slower than MONGODB_SLOW_QUERY_MS are logged and, at most
+# once a minute per shape, explained, so collection scans show up in the log
+# and in the service's /_metrics endpoint.
+
+import asyncio
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from decouple import config
+from pymongo import monitoring
+
+# Upper bounds of the latency buckets in milliseconds; the last one is open-ended
+BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, float("inf"))
+
+# Handshake, auth and session housekeeping, plus our own explains
+IGNORED_COMMANDS = {
+    "hello", "ismaster", "isMaster", "ping", "buildinfo", "buildInfo", "saslStart", "saslContinue",
+    "endSessions", "killCursors", "explain", "getLastError",
+}
+
+# Commands explain() accepts, for the slow-query plan
+EXPLAINABLE_COMMANDS = {"find", "aggregate", "count", "distinct", "update", "delete", "findAndModify"}
+
+# Command fields that belong to the session or the wire protocol, not the query
+_SESSION_FIELDS = {"lsid", "txnNumber", "autocommit", "startTransaction", "readConcern", "writeConcern"}
+
+MAX_SHAPES = 500
+
+
+def plan_stages(plan: dict):
+    """Yields every stage name in an explain() plan tree."""
+    if not isinstance(plan, dict):
+        return
+    if "stage" in plan:
+        yield plan["stage"]
+    for key in ("inputStage", "queryPlan"):
+        if key in plan:
+            yield from plan_stages(plan[key])
+    for child in plan.get("inputStages", []):
+        yield from plan_stages(child)
+
+
+def winning_plan(explain: dict) -> dict:
+    """The winning plan of a find or aggregate explain() result."""
+    if "queryPlanner" in explain:
+        return explain["queryPlanner"].get("winningPlan", {})
+    # Aggregations that could not be pushed down wrap the plan in a $cursor stage
+    for stage in explain.get("stages", []):
+        if "$cursor" in stage:
+            return stage["$cursor"].get("queryPlanner", {}).get("winningPlan", {})
+    return {}
+
+
+def normalize(value: Any) -> Any:
+    """Replaces literal values with "?" while keeping field names and operators."""
+    if isinstance(value, dict):
+        return {key: normalize(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        # {"$in": [...]} and {"$or": [...]} alike: lists of literals collapse to one "?"
+        items = [normalize(item) for item in value]
+        if all(item == "?" for item in items):
+            return "?"
+        return items
+    return "?"
+
+
+def _shape_text(value: Any) -> str:
+    if isinstance(value, dict):
+        return "{" + ", ".join(f"{key}: {_shape_text(item)}" for key, item in value.items()) + "}"
+    if isinstance(value, list):
+        return "[" + ", ".join(_shape_text(item) for item in value) + "]"
+    return str(value)
+
+
+def query_shape(command_name: str, command: dict) -> str:
+    """A short, value-free description of what a command asks for."""
+    if command_name == "find":
+        shape = _shape_text(normalize(command.get("filter", {})))
+        if command.get("sort"):
+            shape += " sort " + _shape_text({key: direction for key, direction in command["sort"].items()})
+        return shape
+    if command_name == "aggregate":
+        stages = []
+        for stage in command.get("pipeline", []):
+            name = next(iter(stage), "?")
+            stages.append(f"{name} {_shape_text(normalize(stage[name]))}" if name == "$match" else name)
+        return " | ".join(stages)
+    if command_name in ("count", "distinct"):
+        return _shape_text(normalize(command.get("query", {})))
+    if command_name in ("update", "delete"):
+        statements = command.get("updates" if command_name == "update" else "deletes") or [{}]
+        return _shape_text(normalize(statements[0].get("q", {})))
+    if command_name == "findAndModify":
+        return _shape_text(normalize(command.get("query", {})))
+    return ""
+
+
+class LatencyHistogram:
+    def __init__(self):
+        self.counts = [0] * len(BUCKETS_MS)
+        self.total = 0
+        self.sum_ms = 0.0
+        self.max_ms = 0.0
+        self.failures = 0
+
+    def observe(self, ms: float, failed: bool = False):
+        for index, bound in enumerate(BUCKETS_MS):
+            if ms <= bound:
+                self.counts[index] += 1
+                break
+        self.total += 1
+        self.sum_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+        if failed:
+            self.failures += 1
+
+    def percentile(self, fraction: float) -> float:
+        """Upper bound of the bucket holding the given fraction of observations."""
+        wanted = fraction * self.total
+        seen = 0
+        for bound, count in zip(BUCKETS_MS, self.counts):
+            seen += count
+            if seen >= wanted and count:
+                return bound if bound != float("inf") else round(self.max_ms, 3)
+        return 0.0
+
+    def as_dict(self) -> dict:
+        return {
+            "count": self.total,
+            "failures": self.failures,
+            "avg_ms": round(self.sum_ms / self.total, 3) if self.total else 0.0,
+            "max_ms": round(self.max_ms, 3),
+            "p50_ms": self.percentile(0.5),
+            "p95_ms": self.percentile(0.95),
+            "p99_ms": self.percentile(0.99),
+            "buckets": {("inf" if bound == float("inf") else str(bound)): count for bound, count in zip(BUCKETS_MS, self.counts)},
+        }
+
+
+class CommandMetrics(monitoring.CommandListener):
+    """
+    Command latencies by collection, command and query shape, plus a log of
+    recent slow commands with their plans. Motor runs driver calls on worker
+    threads, so every update takes a lock.
+    """
+
+    def __init__(self, slow_ms: float = 100.0, explain_interval: float = 60.0, recent: int = 50):
+        self.slow_ms = slow_ms
+        self.explain_interval = explain_interval
+        self._lock = threading.Lock()
+        # (connection, request id) -> (collection, command name, shape, command to explain, database)
+        self._pending: Dict[Tuple[Any, int], tuple] = {}
+        self._commands: Dict[Tuple[str, str], LatencyHistogram] = {}
+        self._shapes: Dict[Tuple[str, str, str], LatencyHistogram] = {}
+        self._explained: Dict[Tuple[str, str, str], float] = {}
+        self.slow_queries = deque(maxlen=recent)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._get_db: Optional[Callable[[], Any]] = None
+
+    def attach(self, loop: Optional[asyncio.AbstractEventLoop], get_db: Callable[[], Any]):
+        """Lets slow commands be explained on `loop` through `get_db()`."""
+        self._loop = loop
+        self._get_db = get_db
+
+    def started(self, event):
+        name = event.command_name
+        if name in IGNORED_COMMANDS:
+            return
+        command = event.command
+        collection = command.get("collection") if name == "getMore" else command.get(name)
+        if not isinstance(collection, str):
+            collection = "-"
+        shape = query_shape(name, command)
+        kept = command if name in EXPLAINABLE_COMMANDS else None
+        with self._lock:
+            self._pending[(event.connection_id, event.request_id)] = (collection, name, shape, kept, event.database_name)
+
+    def succeeded(self, event):
+        self._finish(event, failed=False)
+
+    def failed(self, event):
+        self._finish(event, failed=True)
+
+    def _finish(self, event, failed: bool):
+        with self._lock:
+            pending = self._pending.pop((event.connection_id, event.request_id), None)
+            if pending is None:
+                return
+            collection, name, shape, command, database = pending
+            ms = event.duration_micros / 1000
+            self._histogram(self._commands, (collection, name)).observe(ms, failed)
+            shape_key = (collection, name, shape)
+            if shape_key in self._shapes or len(self._shapes) < MAX_SHAPES:
+                self._histogram(self._shapes, shape_key).observe(ms, failed)
+            if ms < self.slow_ms:
+                return
+            now = time.monotonic()
+            explain = command is not None and now - self._explained.get(shape_key, -self.explain_interval) >= self.explain_interval
+            if explain:
+                self._explained[shape_key] = now
+            entry = {
+                "collection": collection,
+                "command": name,
+                "shape": shape,
+                "duration_ms": round(ms, 3),
+                "failed": failed,
+                "at": time.time(),
+                "plan": None,
+            }
+            self.slow_queries.append(entry)
+        print(f"[DB] Slow {name} on {collection} {shape}: {ms:.1f} ms")
+        if explain:
+            self._schedule_explain(entry, command, database)
+
+    @staticmethod
+    def _histogram(table: dict, key) -> LatencyHistogram:
+        histogram = table.get(key)
+        if histogram is None:
+            histogram = table[key] = LatencyHistogram()
+        return histogram
+
+    def _schedule_explain(self, entry: dict, command: dict, database: str):
+        loop = self._loop
+        if loop is None or self._get_db is None or loop.is_closed():
+            return
+        explained = {key: value for key, value in command.items() if not key.startswith("$") and key not in _SESSION_FIELDS}
+        try:
+            asyncio.run_coroutine_threadsafe(self._explain(entry, explained, database), loop)
+        except RuntimeError:
+            pass
+
+    async def _explain(self, entry: dict, command: dict, database: str):
+        try:
+            db = self._get_db()
+            if db.name != database:
+                db = db.client[database]
+            result = await db.command({"explain": command, "verbosity": "queryPlanner"})
+        except Exception as e:
+            print(f"[DB] Explain failed for {entry['command']} on {entry['collection']}: {e}")
+            return
+        stages = list(plan_stages(winning_plan(result)))
+        entry["plan"] = " <- ".join(stages)
+        marker = "  COLLSCAN!" if "COLLSCAN" in stages else ""
+        print(f"[DB] Plan for slow {entry['command']} on {entry['collection']} {entry['shape']}: {entry['plan']}{marker}")
+
+    def stats(self) -> dict:
+        with self._lock:
+            commands = {f"{collection}.{name}": histogram.as_dict() for (collection, name), histogram in self._commands.items()}
+            shapes = [
+                {"collection": collection, "command": name, "shape": shape, **histogram.as_dict()}
+                for (collection, name, shape), histogram in self._shapes.items()
+            ]
+            slow = list(self.slow_queries)
+        shapes.sort(key=lambda item: -item["count"] * item["avg_ms"])
+        return {"slow_ms": self.slow_ms, "commands": commands, "shapes": shapes, "slow_queries": slow}
+
+
+command_metrics = CommandMetrics(
+    slow_ms=float(os.getenv("MONGODB_SLOW_QUERY_MS") or config("MONGODB_SLOW_QUERY_MS", default=100)),
+    explain_interval=float(os.getenv("MONGODB_EXPLAIN_INTERVAL") or config("MONGODB_EXPLAIN_INTERVAL", default=60)),
+)
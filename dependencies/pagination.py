@@ -0,0 +1,110 @@
+# pagination.py
+# Keyset (cursor) pagination shared by every list endpoint.
+#
+# Pages are read in (sort key, _id) order and continue strictly after the last
+# document of the previous page, so every page costs one index range scan no
+# matter how deep the client has paged, unlike skip/limit. The position is
+# handed to clients as an opaque `next_cursor` and sent back as `after`.
+
+import base64
+import os
+from typing import Any, Callable, List, Optional
+
+from bson import json_util
+from decouple import config
+from fastapi import HTTPException, Query
+from pymongo import DESCENDING
+
+DEFAULT_LIMIT = int(os.getenv("PAGE_DEFAULT_LIMIT") or config("PAGE_DEFAULT_LIMIT", default=50))
+MAX_LIMIT = int(os.getenv("PAGE_MAX_LIMIT") or config("PAGE_MAX_LIMIT", default=200))
+
+
+class PageParams:
+    """The `limit` and `after` query parameters of a list route."""
+
+    def __init__(
+        self,
+        limit: int = Query(DEFAULT_LIMIT, ge=1, le=MAX_LIMIT, description="Maximum number of items to return"),
+        after: Optional[str] = Query(None, description="`next_cursor` of the previous page"),
+    ):
+        self.limit = limit
+        self.after = after
+
+
+class Page:
+    def __init__(self, items: List[Any], next_cursor: Optional[str]):
+        self.items = items
+        self.next_cursor = next_cursor
+
+    def map(self, convert: Callable[[dict], Any]) -> "Page":
+        self.items = [convert(item) for item in self.items]
+        return self
+
+
+def encode_cursor(sort_key: str, document: dict) -> str:
+    position = {"k": sort_key, "v": document.get(sort_key), "id": document["_id"]}
+    return base64.urlsafe_b64encode(json_util.dumps(position).encode()).decode().rstrip("=")
+
+
+def decode_cursor(sort_key: str, cursor: str) -> tuple:
+    """Returns the (sort value, _id) a cursor points at; 400 for anything that is not our cursor."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        position = json_util.loads(base64.urlsafe_b64decode(padded.encode()))
+        if position["k"] != sort_key:
+            raise ValueError("cursor belongs to another listing")
+        return position["v"], position["id"]
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def after_filter(sort_key: str, direction: int, value: Any, last_id: Any) -> dict:
+    """Matches the documents that come after (value, last_id) in (sort_key, _id) order."""
+    op = "$lt" if direction == DESCENDING else "$gt"
+    if sort_key == "_id":
+        return {"_id": {op: last_id}}
+    tie = {sort_key: value, "_id": {op: last_id}}
+    # Documents without the sort key sort below every value
+    if value is None:
+        return tie if direction == DESCENDING else {"$or": [tie, {sort_key: {"$ne": None}}]}
+    beyond = {sort_key: {op: value}}
+    if direction == DESCENDING:
+        return {"$or": [beyond, tie, {sort_key: None}]}
+    return {"$or": [beyond, tie]}
+
+
+async def paginate(
+    collection,
+    query: dict,
+    params: PageParams,
+    sort_key: str = "_id",
+    direction: int = DESCENDING,
+    projection: Optional[dict] = None,
+) -> Page:
+    """
+    Reads one page of `query` ordered by (sort_key, _id). Needs an index on
+    the equality fields of `query` followed by (sort_key, _id) in the same direction.
+    """
+    if params.after:
+        value, last_id = decode_cursor(sort_key, params.after)
+        query = {"$and": [query, after_filter(sort_key, direction, value, last_id)]}
+    added_sort_key = False
+    if projection and any(projection.values()) and sort_key not in projection:
+        # Inclusion projections must keep the field the cursor is built from
+        projection = {**projection, sort_key: 1}
+        added_sort_key = True
+
+    sort = [(sort_key, direction)] if sort_key == "_id" else [(sort_key, direction), ("_id", direction)]
+    # One extra document tells whether there is a next page
+    cursor = collection.find(query, projection).sort(sort).limit(params.limit + 1)
+    items = await cursor.to_list(length=params.limit + 1)
+
+    next_cursor = None
+    if len(items) > params.limit:
+        items = items[:params.limit]
+        next_cursor = encode_cursor(sort_key, items[-1])
+    if added_sort_key:
+        for item in items:
+            item.pop(sort_key, None)
+    return Page(items, next_cursor)
+
@@ -0,0 +1,30 @@
+# projection.py
+# Field selection for list endpoints.
+#
+# Lists return a summary of each document by default: only the fields named by
+# the service, fetched with a Mongo projection so heavy fields never leave the
+# database. `fields=name,isCompared` narrows that further. Heavy fields are
+# only served by the single-document GET.
+
+from typing import Iterable, Optional
+
+from fastapi import HTTPException
+
+
+def list_projection(fields: Optional[str], summary_fields: Iterable[str]) -> dict:
+    """
+    Builds the Mongo projection for a list request. `fields` must be a subset
+    of `summary_fields`; anything else is a 400 so clients notice typos.
+    """
+    summary_fields = list(summary_fields)
+    if not fields:
+        selected = summary_fields
+    else:
+        selected = [field.strip() for field in fields.split(",") if field.strip()]
+        unknown = sorted(set(selected) - set(summary_fields))
+        if unknown:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Unknown or unavailable fields: {', '.join(unknown)}. Allowed: {', '.join(summary_fields)}",
+            )
+    return {field: 1 for field in selected}
@@ -0,0 +1,74 @@
+# serialization.py
+# Mongo documents to JSON responses in as few passes as possible.
+#
+# convert_bson() turns BSON-only types into JSON-friendly ones in a single
+# walk over a document. serialize_many() then validates a whole result list
+# with one cached TypeAdapter instead of building and re-encoding a model per
+# row, and json_response() writes the result with orjson. Returning the
+# response object directly also skips FastAPI's second jsonable_encoder pass.
+
+from functools import lru_cache
+from typing import Any, Iterable, List, Type
+
+import orjson
+from bson import Decimal128, ObjectId
+from pydantic import BaseModel, TypeAdapter
+from starlette.responses import JSONResponse
+
+
+class ORJSONResponse(JSONResponse):
+    """JSON response rendered by orjson (datetimes are written natively)."""
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+
+
+def convert_bson(value: Any) -> Any:
+    """ObjectId -> str and Decimal128 -> str, recursively. Datetimes are kept; orjson writes them natively."""
+    if isinstance(value, dict):
+        return {key: convert_bson(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [convert_bson(item) for item in value]
+    if isinstance(value, ObjectId):
+        return str(value)
+    if isinstance(value, Decimal128):
+        return str(value.to_decimal())
+    return value
+
+
+def _convert_top_level(doc: dict) -> dict:
+    # Most documents are flat; only descend into nested values when there are any
+    converted = {}
+    for key, value in doc.items():
+        if isinstance(value, ObjectId):
+            converted[key] = str(value)
+        elif isinstance(value, (dict, list, Decimal128)):
+            converted[key] = convert_bson(value)
+        else:
+            converted[key] = value
+    return converted
+
+
+@lru_cache(maxsize=None)
+def list_adapter(model: Type[BaseModel]) -> TypeAdapter:
+    return TypeAdapter(List[model])
+
+
+def serialize_many(docs: Iterable[dict], model: Type[BaseModel], **dump_options) -> List[dict]:
+    """
+    Validates `docs` against `model` in one call and returns JSON-ready dicts
+    keyed by alias (the stored field names), like FastAPI's own encoder.
+    """
+    adapter = list_adapter(model)
+    items = adapter.validate_python([_convert_top_level(doc) for doc in docs])
+    dump_options.setdefault("by_alias", True)
+    return adapter.dump_python(items, mode="json", **dump_options)
+
+
+def serialize_one(doc: dict, model: Type[BaseModel], **dump_options) -> dict:
+    return serialize_many([doc], model, **dump_options)[0]
+
+
+def json_response(content: Any, status_code: int = 200) -> ORJSONResponse:
+    return ORJSONResponse(content=content, status_code=status_code)
+
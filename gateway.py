@@ -1,15 +1,38 @@
 # FastAPI API Gateway for microBackend
 # This gateway proxies requests to the appropriate microservice based on the route prefix
 
-from fastapi import FastAPI, Request, Response
+import asyncio
+import hashlib
+import hmac
+import time
+from contextlib import asynccontextmanager
+from typing import List, Optional, Tuple
+from fastapi import Body, FastAPI, Header, HTTPException, Request, Response
+from fastapi.responses import StreamingResponse
 import httpx
 import os
 from decouple import config
 from fastapi.middleware.cors import CORSMiddleware
+from dependencies.deadline import format_deadline
+from gateway_core.balancer import HealthChecker, UpstreamPool, parse_instance_urls
+from gateway_core.batch import BatchItem, BatchItemResult, run_batch
+from gateway_core.cache import ResponseCache
+from gateway_core.compression import Compressor
+from gateway_core.identity import IdentityVerifier
+from gateway_core.lanes import AUTH, BULK, LaneClassifier, default_lanes
+from gateway_core.proxy import (
+    buffer_streaming, clone_response, has_request_body, send_buffered, send_streaming, upstream_request_headers
+)
+from gateway_core.ratelimit import RateLimiter, add_rate_limit_headers, rate_limited_response
+from gateway_core.resilience import UpstreamGuards, UpstreamRejected
+from gateway_core.retry import IDEMPOTENT_METHODS, RETRYABLE_STATUSES, Retrier
+from gateway_core.routing import Route, RouteTable
+from gateway_core.settings import setting
+from gateway_core.singleflight import Exclusive, SingleFlight
+from gateway_core.upstream import UpstreamClients
 
-app = FastAPI(title="microBackend API Gateway")
-
-# Service route mapping (prefix: service_url)
+# Service route mapping (prefix: service_url). A value may list several
+# comma-separated instance URLs to load-balance across them.
 SERVICE_MAP = {
     "/user": os.getenv("USER_SERVICE_URL") or config("USER_SERVICE_URL", default="http://localhost:8001"),
     "/project": os.getenv("PROJECT_SERVICE_URL") or config("PROJECT_SERVICE_URL", default="http://localhost:8002"),
@@ -23,6 +46,116 @@ SERVICE_MAP = {
     "/service_tool": os.getenv("SERVICE_TOOL_SERVICE_URL") or config("SERVICE_TOOL_SERVICE_URL", default="http://localhost:8010"),
 }
 
+# Per-route proxy options (timeout, streaming, cacheable, cache_ttl, cache_vary_auth,
+# coalesce, max_in_flight, max_queue, retries, hedge). On streamed routes,
+# identical concurrent GETs share one upstream response only while its body is
+# at most GATEWAY_COALESCE_MAX_BYTES; larger bodies are fetched per request.
+ROUTE_OPTIONS = {
+    "/translation-document": {"timeout": 120.0, "streaming": True, "max_in_flight": 20, "max_queue": 10},
+    "/comparison-document": {"timeout": 120.0, "streaming": True, "max_in_flight": 20, "max_queue": 10},
+    "/announcement": {"cacheable": True, "cache_ttl": 30.0},
+    "/service_tool": {"cacheable": True, "cache_ttl": 300.0},
+    "/project": {"cacheable": True, "cache_ttl": 10.0},
+}
+
+# Token-bucket limits per caller (user id, or client IP without a valid token),
+# keyed by path prefix; the most specific prefix wins. Keys: rate, per (seconds),
+# burst, methods.
+RATE_LIMITS = {
+    "/otp": {"rate": 5, "per": 60.0, "methods": ["POST"]},
+    "/user/api/resend-otp": {"rate": 3, "per": 60.0},
+    "/user/api/signup-email": {"rate": 5, "per": 60.0},
+    "/user/api/forgot-password": {"rate": 3, "per": 60.0},
+    "/translation-document/api/document/upload": {"rate": 10, "per": 60.0, "burst": 5},
+    "/comparison-document/api/document": {"rate": 10, "per": 60.0, "burst": 5, "methods": ["POST"]},
+}
+
+# Priority lanes: each lane gets its own upstream connection pool and
+# concurrency budget so long uploads cannot starve interactive reads. Requests
+# matching no rule here go to "bulk" when they carry a multipart or large body,
+# otherwise to "interactive".
+LANE_RULES = {
+    "/translation-document/api/document/upload": {"lane": BULK, "methods": ["POST"]},
+    "/comparison-document/api/document": {"lane": BULK, "methods": ["POST"]},
+    "/user/api/user/login": {"lane": AUTH},
+    "/user/api/admin/login": {"lane": AUTH},
+    "/user/api/userLoginWithGoogle": {"lane": AUTH},
+    "/user/api/verify-otp": {"lane": AUTH},
+    "/user/api/resend-otp": {"lane": AUTH},
+    "/user/api/signup-email": {"lane": AUTH},
+    "/otp": {"lane": AUTH},
+}
+lanes = default_lanes()
+lane_classifier = LaneClassifier(LANE_RULES)
+
+# Longest-prefix routing table, built once at startup
+routes = RouteTable.build(SERVICE_MAP, ROUTE_OPTIONS)
+
+# Stream request and response bodies through the gateway instead of buffering them
+STREAMING_ENABLED = setting("GATEWAY_STREAMING", default=True, cast=bool)
+
+# In-process LRU cache for read-mostly GET routes
+response_cache = ResponseCache()
+
+# Shares one upstream call between identical concurrent GETs
+inflight_gets = SingleFlight()
+
+# Largest streamed response body buffered so that coalesced GETs can share it
+COALESCE_MAX_BYTES = setting("GATEWAY_COALESCE_MAX_BYTES", default=1024 * 1024, cast=int)
+
+# Negotiated gzip/br/zstd compression; streamed bodies are compressed as they
+# pass through, and cached bodies keep their compressed variants so each is
+# compressed once per encoding.
+compressor = Compressor()
+
+# Verifies bearer tokens once and forwards signed X-User-Id / X-Role headers
+identity = IdentityVerifier()
+
+rate_limiter = RateLimiter(RATE_LIMITS, identify=identity.identify)
+
+# One pooled, long-lived client per upstream service
+upstreams = UpstreamClients(routes.routes, lanes=lanes)
+
+# Upstream instances per route, balanced by outstanding requests
+LB_STRATEGY = setting("GATEWAY_LB_STRATEGY", default="p2c")
+pools = {
+    "/" + prefix.strip("/"): UpstreamPool(prefix, parse_instance_urls(urls), strategy=LB_STRATEGY)
+    for prefix, urls in SERVICE_MAP.items()
+}
+health_checker = HealthChecker(pools, upstreams.get)
+
+# Retries with jittered backoff for GET/HEAD requests, and optional hedging for buffered ones
+retrier = Retrier()
+
+# Limits for POST /batch
+BATCH_MAX_REQUESTS = setting("GATEWAY_BATCH_MAX_REQUESTS", default=20, cast=int)
+BATCH_CONCURRENCY = setting("GATEWAY_BATCH_CONCURRENCY", default=5, cast=int)
+
+# Token required by the runtime upstream administration endpoints
+GATEWAY_ADMIN_TOKEN = setting("GATEWAY_ADMIN_TOKEN", default="")
+
+# Concurrency limit, wait queue and circuit breaker per upstream service
+guards = UpstreamGuards()
+for route in routes.routes.values():
+    guards.add(
+        route.upstream,
+        max_in_flight=route.options.max_in_flight,
+        max_queue=route.options.max_queue,
+        lanes=lanes,
+    )
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await upstreams.start()
+    health_checker.start()
+    try:
+        yield
+    finally:
+        await health_checker.stop()
+        await upstreams.close()
+
+app = FastAPI(title="microBackend API Gateway", lifespan=lifespan)
+
 # CORS configuration
 origins = [
     "http://localhost:3000",
@@ -38,31 +171,307 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-@app.api_route("/{full_path:path}", methods=["GET", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"])
-async def proxy(full_path: str, request: Request):
-    # Determine which service to proxy to based on the first path segment
-    for prefix, service_url in SERVICE_MAP.items():
-        if full_path.startswith(prefix.strip("/")):
-            target_url = f"{service_url}/{full_path}"
-            break
-    else:
-        return Response("Not found", status_code=404)
+@app.get("/_gateway/metrics")
+async def gateway_metrics():
+    return {
+        "upstreams": upstreams.stats(),
+        "cache": response_cache.stats(),
+        "coalescing": inflight_gets.stats(),
+        "compression": compressor.stats(),
+        "identity": identity.stats(),
+        "rate_limits": rate_limiter.stats(),
+        "retries": retrier.stats(),
+    }
+
+@app.get("/_gateway/status")
+async def gateway_status():
+    upstream_status = guards.stats()
+    healthy = all(status["breaker"]["state"] == "closed" for status in upstream_status.values())
+    return {"status": "ok" if healthy else "degraded", "upstreams": upstream_status}
+
+def require_gateway_admin(token: Optional[str]):
+    if not GATEWAY_ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Gateway admin API is disabled")
+    if not token or not hmac.compare_digest(token, GATEWAY_ADMIN_TOKEN):
+        raise HTTPException(status_code=401, detail="Invalid gateway admin token")
+
+def get_pool(name: str) -> UpstreamPool:
+    pool = pools.get("/" + name.strip("/"))
+    if pool is None:
+        raise HTTPException(status_code=404, detail=f"Unknown upstream '{name}'")
+    return pool
+
+@app.get("/_gateway/upstreams")
+async def list_upstream_instances():
+    return {name: pool.stats() for name, pool in pools.items()}
+
+@app.post("/_gateway/upstreams/{name}/instances")
+async def add_upstream_instance(
+    name: str,
+    url: str = Body(..., embed=True),
+    x_gateway_admin_token: Optional[str] = Header(None),
+):
+    require_gateway_admin(x_gateway_admin_token)
+    pool = get_pool(name)
+    pool.add(url)
+    return {"message": "Instance added", "data": pool.stats()}
+
+@app.delete("/_gateway/upstreams/{name}/instances")
+async def remove_upstream_instance(
+    name: str,
+    url: str,
+    x_gateway_admin_token: Optional[str] = Header(None),
+):
+    require_gateway_admin(x_gateway_admin_token)
+    pool = get_pool(name)
+    if not pool.remove(url):
+        raise HTTPException(status_code=404, detail=f"Instance '{url}' not found")
+    return {"message": "Instance removed", "data": pool.stats()}
+
+MUTATING_METHODS = {"POST", "PUT", "PATCH", "DELETE"}
+
+def uses_streaming(route: Route, streaming: Optional[bool] = None) -> bool:
+    """Whether a request is streamed: the caller's choice, else the route's, else the gateway default."""
+    if streaming is not None:
+        return streaming
+    return STREAMING_ENABLED if route.options.streaming is None else route.options.streaming
+
+async def forward(route: Route, full_path: str, request: Request, streaming: Optional[bool] = None) -> Response:
+    """
+    Sends a request to the route's upstream, streamed or buffered. GET/HEAD
+    requests may be retried across instances; buffered ones may also be hedged.
+    """
+    upstream = route.upstream
+    options = route.options
+    streaming = uses_streaming(route, streaming)
+    timeout = upstreams.settings.timeout(read=options.timeout) if options.timeout is not None else None
 
     # Prepare the proxied request
     method = request.method
-    headers = dict(request.headers)
-    body = await request.body()
-
-    async with httpx.AsyncClient() as client:
-        resp = await client.request(
-            method,
-            target_url,
-            headers=headers,
-            content=body,
-            params=request.query_params,
-            timeout=60.0
-        )
-    return Response(content=resp.content, status_code=resp.status_code, headers=resp.headers)
+    deadline = request_deadline(request, options.timeout or upstreams.settings.read_timeout)
+    headers = identity.apply(request, upstream_request_headers(request))
+    headers = [(name, value) for name, value in headers if name.lower() != b"x-request-deadline"]
+    headers.append((b"x-request-deadline", format_deadline(deadline).encode()))
+    params = request.query_params
+    lane = lane_classifier.classify(full_path, request)
+
+    async def attempt(tried: list) -> Tuple[Response, bool]:
+        """One upstream attempt; returns the response and whether it may be retried."""
+        if time.time() >= deadline:
+            return Response("Request deadline exceeded", status_code=504), False
+        guard = guards.get(upstream, lane)
+        try:
+            await guard.enter()
+        except UpstreamRejected as e:
+            return Response(e.reason, status_code=503, headers={"Retry-After": e.retry_after_header}), False
+
+        pool = pools[upstream]
+        # Prefer an instance this request has not tried yet
+        instance = pool.pick(exclude=tried) or pool.pick()
+        if instance is None:
+            guard.breaker.call_abandoned()
+            guard.release()
+            return Response("No upstream instance available", status_code=503, headers={"Retry-After": "1"}), False
+        tried.append(instance)
+        pool.acquire(instance)
+        target_url = instance.target_url(full_path)
+
+        def finish(failed: bool = False):
+            upstreams.request_finished(upstream, failed=failed)
+            pool.release(instance)
+            guard.release()
+
+        client = upstreams.get(upstream, lane)
+        upstreams.request_started(upstream)
+        started = time.monotonic()
+        try:
+            if streaming:
+                response = await send_streaming(
+                    client, method, target_url, headers, params, request,
+                    timeout=timeout,
+                    on_complete=finish,
+                )
+            else:
+                body = await request.body()
+                response = await send_buffered(client, method, target_url, headers, params, body or None, timeout=timeout)
+        except httpx.TimeoutException:
+            guard.breaker.record(False, time.monotonic() - started)
+            finish(failed=True)
+            return Response("Upstream timed out", status_code=504), True
+        except httpx.HTTPError:
+            guard.breaker.record(False, time.monotonic() - started)
+            finish(failed=True)
+            return Response("Bad gateway", status_code=502), True
+        except asyncio.CancelledError:
+            # Cancelled by the client or by a winning hedge: not the upstream's fault
+            guard.breaker.call_abandoned()
+            finish()
+            raise
+        except BaseException:
+            guard.breaker.call_abandoned()
+            finish(failed=True)
+            raise
+        guard.breaker.record(response.status_code < 500, time.monotonic() - started)
+        if streaming:
+            # Once its headers arrive a streamed response is final: its body
+            # is still open and may already be on its way to the client.
+            return response, False
+        finish()
+        return response, response.status_code in RETRYABLE_STATUSES
+
+    # A streamed request body can only be sent once
+    if method not in IDEMPOTENT_METHODS or (streaming and has_request_body(request)):
+        response, _ = await attempt([])
+        return response
+    # Hedging only helps when there is another instance to send the copy to.
+    # Streamed requests are not hedged, so no losing stream is left open.
+    hedge = options.hedge if not streaming and len(pools[upstream].instances) > 1 else False
+    return await retrier.run(upstream, attempt, retries=options.retries, hedge=hedge)
+
+def request_deadline(request: Request, budget: float) -> float:
+    """
+    The absolute time by which the upstream must answer, sent as
+    X-Request-Deadline: the route's budget, or the client's own deadline if
+    that is sooner.
+    """
+    deadline = time.time() + budget
+    try:
+        return min(deadline, float(request.headers.get("x-request-deadline") or deadline))
+    except ValueError:
+        return deadline
+
+def request_identity_key(route: Route, full_path: str, request: Request) -> tuple:
+    authorization = request.headers.get("authorization") or ""
+    return (route.upstream, full_path, request.url.query, hashlib.sha256(authorization.encode()).hexdigest())
+
+async def coalesced_get(route: Route, full_path: str, request: Request, fetch) -> Response:
+    """
+    Runs fetch() once for identical concurrent GETs (same path, query and
+    Authorization) and hands every waiter its own copy of the response.
+    """
+    if not route.options.coalesce:
+        return await fetch()
+    response = await inflight_gets.do(request_identity_key(route, full_path, request), fetch)
+    return clone_response(response)
+
+async def coalesced_stream_get(route: Route, full_path: str, request: Request) -> Response:
+    """
+    Coalesces GETs on a streamed route. The shared upstream response is read
+    into memory when its body is at most COALESCE_MAX_BYTES and every waiter
+    gets a copy. A larger body keeps streaming to one waiter; the others
+    send their own request.
+    """
+    async def fetch():
+        response = await forward(route, full_path, request, streaming=True)
+        if not isinstance(response, StreamingResponse):
+            return response
+        try:
+            response = await buffer_streaming(response, COALESCE_MAX_BYTES)
+        except httpx.HTTPError:
+            return Response("Bad gateway", status_code=502)
+        if isinstance(response, StreamingResponse):
+            return Exclusive(response, close_stream)
+        return response
+
+    result = await inflight_gets.do(request_identity_key(route, full_path, request), fetch)
+    if isinstance(result, Exclusive):
+        response = result.claim()
+        return response if response is not None else await forward(route, full_path, request, streaming=True)
+    return clone_response(result)
+
+async def close_stream(response: StreamingResponse):
+    """Closes the upstream behind a streamed response nobody will send."""
+    if response.background is not None:
+        await response.background()
+
+async def cached_get(route: Route, full_path: str, request: Request) -> Response:
+    """Serves a GET from the response cache, filling it from the upstream on a miss."""
+    options = route.options
+    key = ResponseCache.key(
+        route.upstream, full_path, request.url.query,
+        request.headers.get("authorization"), vary_auth=options.cache_vary_auth,
+    )
+    if_none_match = request.headers.get("if-none-match")
+    accept_encoding = request.headers.get("accept-encoding")
+    bypass = "no-cache" in request.headers.get("cache-control", "").lower()
+    entry = None if bypass else response_cache.get(key)
+    if entry is not None:
+        response = response_cache.respond(entry, if_none_match)
+        return await compressor.compress_cached(route.upstream, response_cache, entry, response, accept_encoding)
+
+    async def fetch():
+        # A write to the route while this fetch runs makes its response unsafe to store
+        generation = response_cache.generation(route.upstream)
+        response = await forward(route, full_path, request, streaming=False)
+        entry = response_cache.store(key, response, options.cache_ttl, generation=generation)
+        return response if entry is None else entry
+
+    if options.coalesce:
+        result = await inflight_gets.do(request_identity_key(route, full_path, request), fetch)
+    else:
+        result = await fetch()
+    if isinstance(result, Response):
+        return clone_response(result)
+    response = response_cache.respond(result, if_none_match, hit=False)
+    return await compressor.compress_cached(route.upstream, response_cache, result, response, accept_encoding)
+
+async def dispatch(full_path: str, request: Request, streaming: Optional[bool] = None) -> Response:
+    # Determine which service to proxy to by longest matching path prefix
+    route = routes.match(full_path)
+    if route is None:
+        return Response("Not found", status_code=404)
+
+    decision = await rate_limiter.check(full_path, request)
+    if decision is not None and not decision.allowed:
+        return rate_limited_response(decision)
+    response = await dispatch_route(route, full_path, request, streaming)
+    if decision is not None:
+        add_rate_limit_headers(response, decision)
+    return response
+
+async def dispatch_route(route: Route, full_path: str, request: Request, streaming: Optional[bool] = None) -> Response:
+    if route.options.cacheable:
+        if request.method == "GET":
+            return await cached_get(route, full_path, request)
+        if request.method in MUTATING_METHODS:
+            # Drop cached reads before and after the write. Both bump the
+            # route's cache generation, so a GET whose upstream read started
+            # before the write finished is not stored when it completes.
+            response_cache.invalidate_route(route.upstream)
+            response = await forward(route, full_path, request, streaming=streaming)
+            response_cache.invalidate_route(route.upstream)
+            return response
+
+    if request.method == "GET" and route.options.coalesce:
+        if uses_streaming(route, streaming):
+            return await coalesced_stream_get(route, full_path, request)
+        return await coalesced_get(route, full_path, request, lambda: forward(route, full_path, request, streaming=False))
+
+    return await forward(route, full_path, request, streaming=streaming)
+
+@app.post("/batch", response_model=List[BatchItemResult])
+async def batch(request: Request, items: List[BatchItem] = Body(...)):
+    """
+    Runs several sub-requests through the gateway in one round-trip and
+    returns one result per item, in order, each with its own status.
+    """
+    if len(items) > BATCH_MAX_REQUESTS:
+        raise HTTPException(status_code=413, detail=f"A batch may contain at most {BATCH_MAX_REQUESTS} requests")
+    return await run_batch(
+        request, items,
+        lambda path, sub_request: dispatch(path, sub_request, streaming=False),
+        concurrency=BATCH_CONCURRENCY,
+    )
+
+@app.api_route("/{full_path:path}", methods=["GET", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"])
+async def proxy(full_path: str, request: Request):
+    response = await dispatch(full_path, request)
+    route = routes.match(full_path)
+    name = route.upstream if route is not None else "unmatched"
+    accept_encoding = request.headers.get("accept-encoding")
+    if isinstance(response, StreamingResponse):
+        return compressor.compress_stream(name, response, accept_encoding)
+    return await compressor.compress_response(name, response, accept_encoding)
 
 if __name__ == "__main__":
     import uvicorn
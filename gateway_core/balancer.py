@@ -0,0 +1,173 @@
+import asyncio
+import logging
+import random
+from typing import Callable, Dict, Iterable, List, Optional, Union
+
+import httpx
+
+from gateway_core.settings import setting
+
+logger = logging.getLogger(__name__)
+
+LEAST_OUTSTANDING = "least_outstanding"
+POWER_OF_TWO = "p2c"
+
+
+def parse_instance_urls(value: Union[str, Iterable[str]]) -> List[str]:
+    """Accepts a single URL, a comma-separated list of URLs, or a list."""
+    if isinstance(value, str):
+        value = value.split(",")
+    return [url.strip().rstrip("/") for url in value if url and url.strip()]
+
+
+class Instance:
+    def __init__(self, url: str):
+        self.url = url.rstrip("/")
+        self.outstanding = 0
+        self.healthy = True
+        self.consecutive_failures = 0
+        self.consecutive_successes = 0
+        self.requests = 0
+        self.ejections = 0
+
+    def target_url(self, path: str) -> str:
+        return f"{self.url}/{path.lstrip('/')}"
+
+    def stats(self) -> dict:
+        return {
+            "url": self.url,
+            "healthy": self.healthy,
+            "outstanding": self.outstanding,
+            "requests": self.requests,
+            "ejections": self.ejections,
+        }
+
+
+class UpstreamPool:
+    """
+    The instances behind one route prefix. Requests go to the healthy
+    instance with the fewest outstanding requests, either by scanning all of
+    them or by comparing two random picks (power of two choices).
+    """
+
+    def __init__(self, name: str, urls: Iterable[str], strategy: str = POWER_OF_TWO):
+        self.name = name
+        self.strategy = strategy
+        self.instances: List[Instance] = [Instance(url) for url in urls]
+
+    def pick(self, exclude: Iterable[Instance] = ()) -> Optional[Instance]:
+        excluded = set(id(instance) for instance in exclude)
+        candidates = [instance for instance in self.instances if instance.healthy and id(instance) not in excluded]
+        if not candidates:
+            # Every instance is ejected: keep serving rather than failing all traffic
+            candidates = [instance for instance in self.instances if id(instance) not in excluded]
+        if not candidates:
+            return None
+        if len(candidates) == 1:
+            return candidates[0]
+        if self.strategy == LEAST_OUTSTANDING:
+            fewest = min(instance.outstanding for instance in candidates)
+            return random.choice([instance for instance in candidates if instance.outstanding == fewest])
+        first, second = random.sample(candidates, 2)
+        return first if first.outstanding <= second.outstanding else second
+
+    def acquire(self, instance: Instance):
+        instance.outstanding += 1
+        instance.requests += 1
+
+    def release(self, instance: Instance):
+        instance.outstanding -= 1
+
+    def add(self, url: str) -> Instance:
+        url = url.rstrip("/")
+        for instance in self.instances:
+            if instance.url == url:
+                return instance
+        instance = Instance(url)
+        # Copy-on-write so an in-progress pick or health check keeps a stable list
+        self.instances = self.instances + [instance]
+        logger.info(f"[UpstreamPool] Added instance {url} to {self.name}")
+        return instance
+
+    def remove(self, url: str) -> bool:
+        url = url.rstrip("/")
+        remaining = [instance for instance in self.instances if instance.url != url]
+        if len(remaining) == len(self.instances):
+            return False
+        self.instances = remaining
+        logger.info(f"[UpstreamPool] Removed instance {url} from {self.name}")
+        return True
+
+    def stats(self) -> dict:
+        return {
+            "strategy": self.strategy,
+            "healthy": sum(1 for instance in self.instances if instance.healthy),
+            "instances": [instance.stats() for instance in self.instances],
+        }
+
+
+class HealthChecker:
+    """
+    Polls every instance on an interval. An instance is ejected after
+    `unhealthy_threshold` failed checks in a row and readmitted after
+    `healthy_threshold` successful ones.
+    """
+
+    def __init__(self, pools: Dict[str, UpstreamPool], client_for: Callable[[str], httpx.AsyncClient]):
+        self.pools = pools
+        self.client_for = client_for
+        self.path = setting("GATEWAY_HEALTH_CHECK_PATH", default="/")
+        self.interval = setting("GATEWAY_HEALTH_CHECK_INTERVAL", default=10.0, cast=float)
+        self.timeout = setting("GATEWAY_HEALTH_CHECK_TIMEOUT", default=2.0, cast=float)
+        self.unhealthy_threshold = setting("GATEWAY_UNHEALTHY_THRESHOLD", default=3, cast=int)
+        self.healthy_threshold = setting("GATEWAY_HEALTHY_THRESHOLD", default=2, cast=int)
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        if self.interval > 0 and self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        while True:
+            await self.check_all()
+            await asyncio.sleep(self.interval)
+
+    async def check_all(self):
+        checks = [
+            self._check(name, instance)
+            for name, pool in self.pools.items()
+            for instance in pool.instances
+        ]
+        await asyncio.gather(*checks, return_exceptions=True)
+
+    async def _check(self, name: str, instance: Instance):
+        try:
+            response = await self.client_for(name).get(instance.target_url(self.path), timeout=self.timeout)
+            ok = response.status_code < 500
+        except httpx.HTTPError:
+            ok = False
+        self._record(name, instance, ok)
+
+    def _record(self, name: str, instance: Instance, ok: bool):
+        if ok:
+            instance.consecutive_failures = 0
+            instance.consecutive_successes += 1
+            if not instance.healthy and instance.consecutive_successes >= self.healthy_threshold:
+                instance.healthy = True
+                logger.info(f"[HealthChecker] Readmitted {instance.url} to {name}")
+        else:
+            instance.consecutive_successes = 0
+            instance.consecutive_failures += 1
+            if instance.healthy and instance.consecutive_failures >= self.unhealthy_threshold:
+                instance.healthy = False
+                instance.ejections += 1
+                logger.warning(f"[HealthChecker] Ejected {instance.url} from {name}")
@@ -0,0 +1,132 @@
+import asyncio
+import json
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+from urllib.parse import urlsplit
+
+from fastapi import Request, Response
+from pydantic import BaseModel, Field
+
+BATCH_METHODS = {"GET", "POST", "PUT", "PATCH", "DELETE"}
+
+# Parent headers that describe the batch body itself, not the sub-requests
+_PARENT_ONLY_HEADERS = {"content-length", "content-type", "transfer-encoding", "accept-encoding"}
+
+
+class BatchItem(BaseModel):
+    id: Optional[str] = None
+    method: str = "GET"
+    path: str
+    headers: Dict[str, str] = Field(default_factory=dict)
+    body: Optional[Any] = None
+
+
+class BatchItemResult(BaseModel):
+    id: Optional[str] = None
+    status: int
+    headers: Dict[str, str] = Field(default_factory=dict)
+    body: Optional[Any] = None
+
+
+def build_sub_request(parent: Request, item: BatchItem) -> Request:
+    """
+    Builds an ASGI request for one batch item. It inherits the parent's
+    headers (so Authorization applies to every item) and can override them.
+    """
+    split = urlsplit(item.path)
+    path = "/" + split.path.lstrip("/")
+    headers = {
+        name.decode("latin-1").lower(): value.decode("latin-1")
+        for name, value in parent.headers.raw
+        if name.decode("latin-1").lower() not in _PARENT_ONLY_HEADERS
+    }
+    headers.update({name.lower(): value for name, value in item.headers.items()})
+
+    body = b""
+    if item.body is not None:
+        if isinstance(item.body, str):
+            body = item.body.encode()
+            headers.setdefault("content-type", "text/plain; charset=utf-8")
+        else:
+            body = json.dumps(item.body).encode()
+            headers.setdefault("content-type", "application/json")
+    headers["content-length"] = str(len(body))
+
+    scope = {
+        "type": "http",
+        "asgi": parent.scope.get("asgi", {"version": "3.0"}),
+        "http_version": parent.scope.get("http_version", "1.1"),
+        "method": item.method.upper(),
+        "scheme": parent.scope.get("scheme", "http"),
+        "server": parent.scope.get("server"),
+        "client": parent.scope.get("client"),
+        "root_path": "",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": split.query.encode(),
+        "headers": [(name.encode("latin-1"), value.encode("latin-1")) for name, value in headers.items()],
+        "app": parent.scope.get("app"),
+    }
+    sent = False
+
+    async def receive():
+        nonlocal sent
+        if sent:
+            return {"type": "http.disconnect"}
+        sent = True
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    return Request(scope, receive)
+
+
+async def read_body(response: Response) -> bytes:
+    if hasattr(response, "body_iterator"):
+        chunks = []
+        async for chunk in response.body_iterator:
+            chunks.append(chunk if isinstance(chunk, bytes) else chunk.encode())
+        if response.background is not None:
+            await response.background()
+        return b"".join(chunks)
+    return response.body
+
+
+async def to_result(item: BatchItem, response: Response) -> BatchItemResult:
+    body = await read_body(response)
+    headers = {
+        name.decode("latin-1"): value.decode("latin-1")
+        for name, value in response.raw_headers
+        if name.lower() not in (b"content-length", b"transfer-encoding")
+    }
+    content = None
+    if body:
+        text = body.decode("utf-8", errors="replace")
+        try:
+            content = json.loads(text) if "json" in headers.get("content-type", "") else text
+        except ValueError:
+            content = text
+    return BatchItemResult(id=item.id, status=response.status_code, headers=headers, body=content)
+
+
+async def run_batch(
+    parent: Request,
+    items: List[BatchItem],
+    dispatch: Callable[[str, Request], Awaitable[Response]],
+    concurrency: int,
+) -> List[BatchItemResult]:
+    """
+    Runs the sub-requests concurrently, at most `concurrency` at a time, and
+    returns their results in the order they were given.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def run(item: BatchItem) -> BatchItemResult:
+        if item.method.upper() not in BATCH_METHODS:
+            return BatchItemResult(id=item.id, status=405, body={"detail": f"Method {item.method} is not allowed in a batch"})
+        async with semaphore:
+            sub_request = build_sub_request(parent, item)
+            try:
+                response = await dispatch(sub_request.url.path.lstrip("/"), sub_request)
+                return await to_result(item, response)
+            except Exception as e:
+                return BatchItemResult(id=item.id, status=500, body={"detail": f"Sub-request failed: {e}"})
+
+    return await asyncio.gather(*(run(item) for item in items))
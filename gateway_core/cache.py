@@ -0,0 +1,210 @@
+import hashlib
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Set, Tuple
+
+from fastapi import Response
+
+from gateway_core.proxy import RawHeaders
+from gateway_core.settings import setting
+
+CacheKey = Tuple[str, str, str, str]
+
+# Headers that must not be replayed from a cached response
+_UNCACHED_HEADERS = {b"set-cookie", b"date", b"age", b"x-cache"}
+
+
+class CachedResponse:
+    def __init__(self, key: CacheKey, status_code: int, raw_headers: RawHeaders, body: bytes, etag: str, ttl: float):
+        self.key = key
+        self.route = key[0]
+        self.status_code = status_code
+        self.raw_headers = raw_headers
+        self.body = body
+        self.etag = etag
+        # Compressed copies of the body, keyed by content-encoding
+        self.variants: Dict[str, bytes] = {}
+        self.stored_at = time.monotonic()
+        self.expires_at = self.stored_at + ttl
+
+    @property
+    def size(self) -> int:
+        return len(self.body) + sum(len(variant) for variant in self.variants.values())
+
+    def is_fresh(self, now: Optional[float] = None) -> bool:
+        return (now or time.monotonic()) < self.expires_at
+
+    def to_response(self, if_none_match: Optional[str] = None, cache_status: bytes = b"HIT") -> Response:
+        age = str(int(time.monotonic() - self.stored_at)).encode()
+        if if_none_match and etag_matches(if_none_match, self.etag):
+            response = Response(status_code=304)
+            response.raw_headers = [(b"etag", self.etag.encode()), (b"age", age), (b"x-cache", cache_status)]
+            return response
+        response = Response(content=self.body, status_code=self.status_code)
+        response.raw_headers = self.raw_headers + [(b"age", age), (b"x-cache", cache_status)]
+        return response
+
+
+class ResponseCache:
+    """
+    In-process LRU cache for GET responses of read-mostly routes. Entries
+    expire after the route's TTL, can vary by Authorization header, carry an
+    ETag for If-None-Match revalidation and are dropped whenever a mutating
+    request is proxied to the same route. Each invalidation also bumps the
+    route's generation, so a response fetched before it is not stored after it.
+    """
+
+    def __init__(self, max_entries: Optional[int] = None, max_bytes: Optional[int] = None, max_entry_bytes: Optional[int] = None):
+        self.max_entries = max_entries or setting("GATEWAY_CACHE_MAX_ENTRIES", default=1000, cast=int)
+        self.max_bytes = max_bytes or setting("GATEWAY_CACHE_MAX_BYTES", default=64 * 1024 * 1024, cast=int)
+        self.max_entry_bytes = max_entry_bytes or setting("GATEWAY_CACHE_MAX_ENTRY_BYTES", default=1024 * 1024, cast=int)
+        self._entries: "OrderedDict[CacheKey, CachedResponse]" = OrderedDict()
+        self._by_route: Dict[str, Set[CacheKey]] = {}
+        self._generations: Dict[str, int] = {}
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.revalidated = 0
+        self.stores = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self.stale_stores = 0
+
+    @staticmethod
+    def key(route: str, path: str, query: str, authorization: Optional[str], vary_auth: bool = True) -> CacheKey:
+        auth_key = ""
+        if vary_auth and authorization:
+            auth_key = hashlib.sha256(authorization.encode()).hexdigest()
+        return (route, path, query, auth_key)
+
+    def get(self, key: CacheKey) -> Optional[CachedResponse]:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        if not entry.is_fresh():
+            self._remove(key)
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    def generation(self, route: str) -> int:
+        """Read before fetching a response and passed to store()."""
+        return self._generations.get(route, 0)
+
+    def store(self, key: CacheKey, response: Response, ttl: float, generation: Optional[int] = None) -> Optional[CachedResponse]:
+        """
+        Caches a buffered upstream response if it is cacheable and returns the
+        entry, or None when the response was not stored. Responses whose
+        fetch started before the route's last invalidation (`generation` is
+        older) are not stored, as they may predate the write.
+        """
+        if generation is not None and generation != self.generation(key[0]):
+            self.stale_stores += 1
+            return None
+        if ttl <= 0 or not is_cacheable(response) or len(response.body) > self.max_entry_bytes:
+            return None
+        raw_headers = [(name, value) for name, value in response.raw_headers if name.lower() not in _UNCACHED_HEADERS]
+        etag = _header(raw_headers, b"etag") or make_etag(response.body)
+        if _header(raw_headers, b"etag") is None:
+            raw_headers.append((b"etag", etag.encode()))
+        if key in self._entries:
+            self._remove(key)
+        entry = CachedResponse(key, response.status_code, raw_headers, response.body, etag, ttl)
+        self._entries[key] = entry
+        self._by_route.setdefault(entry.route, set()).add(key)
+        self._bytes += entry.size
+        self.stores += 1
+        self._evict()
+        return entry
+
+    def respond(self, entry: CachedResponse, if_none_match: Optional[str], hit: bool = True) -> Response:
+        response = entry.to_response(if_none_match, cache_status=b"HIT" if hit else b"MISS")
+        if response.status_code == 304:
+            self.revalidated += 1
+        return response
+
+    def add_variant(self, entry: CachedResponse, encoding: str, body: bytes):
+        """Stores a compressed copy of a cached body, counted against the cache size."""
+        if self._entries.get(entry.key) is not entry or encoding in entry.variants:
+            return
+        entry.variants[encoding] = body
+        self._bytes += len(body)
+        self._evict()
+
+    def invalidate_route(self, route: str) -> int:
+        self._generations[route] = self.generation(route) + 1
+        keys = self._by_route.pop(route, set())
+        for key in keys:
+            entry = self._entries.pop(key, None)
+            if entry is not None:
+                self._bytes -= entry.size
+        if keys:
+            self.invalidations += 1
+        return len(keys)
+
+    def _remove(self, key: CacheKey):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        self._bytes -= entry.size
+        route_keys = self._by_route.get(entry.route)
+        if route_keys is not None:
+            route_keys.discard(key)
+
+    def _evict(self):
+        while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+            key = next(iter(self._entries))
+            self._remove(key)
+            self.evictions += 1
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "revalidated": self.revalidated,
+            "stores": self.stores,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+            "stale_stores": self.stale_stores,
+        }
+
+
+def is_cacheable(response: Response) -> bool:
+    if response.status_code != 200:
+        return False
+    if _header(response.raw_headers, b"set-cookie") is not None:
+        return False
+    cache_control = (_header(response.raw_headers, b"cache-control") or "").lower()
+    return "no-store" not in cache_control and "private" not in cache_control
+
+
+def make_etag(body: bytes) -> str:
+    return '"' + hashlib.sha1(body).hexdigest() + '"'
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    if if_none_match.strip() == "*":
+        return True
+    candidates = [candidate.strip() for candidate in if_none_match.split(",")]
+    # Weak comparison, as required for If-None-Match
+    return _strip_weak(etag) in {_strip_weak(candidate) for candidate in candidates}
+
+
+def _strip_weak(etag: str) -> str:
+    return etag[2:] if etag.startswith("W/") else etag
+
+
+def _header(raw_headers: RawHeaders, name: bytes) -> Optional[str]:
+    for key, value in raw_headers:
+        if key.lower() == name:
+            return value.decode("latin-1")
+    return None
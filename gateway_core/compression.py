@@ -0,0 +1,271 @@
+import asyncio
+import gzip
+import time
+import zlib
+from typing import Callable, Dict, Optional, Tuple
+
+from fastapi import Response
+from starlette.responses import StreamingResponse
+
+from gateway_core.cache import CachedResponse, ResponseCache
+from gateway_core.settings import setting
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Content types worth compressing; everything else (images, PDFs, archives)
+# is already compressed or binary.
+COMPRESSIBLE_TYPES = ("text/", "application/json", "application/javascript", "application/xml", "+json", "+xml")
+
+
+class CompressionStats:
+    def __init__(self):
+        self.responses = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.cpu_seconds = 0.0
+        self.variant_hits = 0
+
+    def as_dict(self) -> dict:
+        return {
+            "responses": self.responses,
+            "bytes_in": self.bytes_in,
+            "bytes_out": self.bytes_out,
+            "ratio": round(self.bytes_out / self.bytes_in, 4) if self.bytes_in else 0.0,
+            "cpu_seconds": round(self.cpu_seconds, 6),
+            "cached_variant_hits": self.variant_hits,
+        }
+
+
+class Compressor:
+    """
+    Negotiates gzip, brotli or zstd from Accept-Encoding and compresses
+    buffered responses above a minimum size. Large bodies are compressed in a
+    worker thread so the event loop keeps serving other requests. Streamed
+    bodies are compressed incrementally as they pass through.
+    """
+
+    def __init__(self):
+        self.enabled = setting("GATEWAY_COMPRESSION", default=True, cast=bool)
+        self.min_size = setting("GATEWAY_COMPRESSION_MIN_SIZE", default=1024, cast=int)
+        self.offload_size = setting("GATEWAY_COMPRESSION_OFFLOAD_SIZE", default=64 * 1024, cast=int)
+        gzip_level = setting("GATEWAY_GZIP_LEVEL", default=6, cast=int)
+        brotli_quality = setting("GATEWAY_BROTLI_QUALITY", default=4, cast=int)
+        zstd_level = setting("GATEWAY_ZSTD_LEVEL", default=3, cast=int)
+
+        # Server preference order, used to break ties between equal q-values
+        self.codecs: Dict[str, Callable[[bytes], bytes]] = {}
+        if zstandard is not None:
+            self.codecs["zstd"] = lambda body: zstandard.ZstdCompressor(level=zstd_level).compress(body)
+        if brotli is not None:
+            self.codecs["br"] = lambda body: brotli.compress(body, quality=brotli_quality)
+        self.codecs["gzip"] = lambda body: gzip.compress(body, compresslevel=gzip_level, mtime=0)
+        # Incremental compressors for streamed bodies, one per response
+        self.stream_codecs: Dict[str, Callable[[], object]] = {}
+        if zstandard is not None:
+            self.stream_codecs["zstd"] = lambda: zstandard.ZstdCompressor(level=zstd_level).compressobj()
+        if brotli is not None:
+            self.stream_codecs["br"] = lambda: _BrotliStream(brotli_quality)
+        self.stream_codecs["gzip"] = lambda: zlib.compressobj(gzip_level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+        self._stats: Dict[str, CompressionStats] = {}
+
+    def negotiate(self, accept_encoding: Optional[str]) -> Optional[str]:
+        if not self.enabled or not accept_encoding:
+            return None
+        offered = parse_accept_encoding(accept_encoding)
+        best, best_q = None, 0.0
+        for encoding in self.codecs:
+            q = offered.get(encoding, offered.get("*", 0.0))
+            if q > best_q:
+                best, best_q = encoding, q
+        return best
+
+    def should_compress(self, status_code: int, raw_headers, size: Optional[int]) -> bool:
+        """`size` is None for a streamed body of unknown length."""
+        if status_code < 200 or status_code in (204, 206, 304) or (size is not None and size < self.min_size):
+            return False
+        content_encoding = _header(raw_headers, b"content-encoding")
+        if content_encoding and content_encoding.lower() != "identity":
+            return False
+        content_type = (_header(raw_headers, b"content-type") or "").lower()
+        return any(kind in content_type for kind in COMPRESSIBLE_TYPES)
+
+    async def compress(self, route: str, encoding: str, body: bytes) -> bytes:
+        codec = self.codecs[encoding]
+
+        def run() -> Tuple[bytes, float]:
+            started = time.thread_time()
+            compressed = codec(body)
+            return compressed, time.thread_time() - started
+
+        if len(body) >= self.offload_size:
+            compressed, cpu = await asyncio.to_thread(run)
+        else:
+            compressed, cpu = run()
+        stats = self._stats.setdefault(route, CompressionStats())
+        stats.responses += 1
+        stats.bytes_in += len(body)
+        stats.bytes_out += len(compressed)
+        stats.cpu_seconds += cpu
+        return compressed
+
+    async def compress_response(self, route: str, response: Response, accept_encoding: Optional[str]) -> Response:
+        """Returns the response compressed with the negotiated encoding, if worthwhile."""
+        if not self.should_compress(response.status_code, response.raw_headers, len(response.body)):
+            return response
+        encoding = self.negotiate(accept_encoding)
+        if encoding is None:
+            return _with_vary(response)
+        body = await self.compress(route, encoding, response.body)
+        return encoded_response(response, encoding, body)
+
+    def compress_stream(self, route: str, response: StreamingResponse, accept_encoding: Optional[str]) -> StreamingResponse:
+        """
+        Compresses a streamed body chunk by chunk as it is sent, so it is
+        never held in memory. The length of the result is unknown, so it goes
+        out without Content-Length.
+        """
+        declared = _header(response.raw_headers, b"content-length")
+        size = int(declared) if declared and declared.isdigit() else None
+        if not self.should_compress(response.status_code, response.raw_headers, size):
+            return response
+        encoding = self.negotiate(accept_encoding)
+        if encoding is None:
+            return _with_vary(response)
+        stats = self._stats.setdefault(route, CompressionStats())
+        body = response.body_iterator
+        compressor = self.stream_codecs[encoding]()
+
+        async def compressed():
+            stats.responses += 1
+            async for chunk in body:
+                if isinstance(chunk, str):
+                    chunk = chunk.encode("utf-8")
+                started = time.thread_time()
+                out = compressor.compress(chunk)
+                stats.cpu_seconds += time.thread_time() - started
+                stats.bytes_in += len(chunk)
+                stats.bytes_out += len(out)
+                if out:
+                    yield out
+            out = compressor.flush()
+            stats.bytes_out += len(out)
+            if out:
+                yield out
+
+        encoded = StreamingResponse(compressed(), status_code=response.status_code, background=response.background)
+        encoded.raw_headers = encoded_headers(response.raw_headers, encoding)
+        return encoded
+
+    async def compress_cached(
+        self, route: str, cache: ResponseCache, entry: CachedResponse, response: Response, accept_encoding: Optional[str]
+    ) -> Response:
+        """
+        Like compress_response, but reuses the compressed variant stored on the
+        cache entry so a cached body is compressed at most once per encoding.
+        """
+        if response.status_code != 200 or not self.should_compress(entry.status_code, entry.raw_headers, len(entry.body)):
+            return response
+        encoding = self.negotiate(accept_encoding)
+        if encoding is None:
+            return _with_vary(response)
+        body = entry.variants.get(encoding)
+        if body is None:
+            body = await self.compress(route, encoding, entry.body)
+            cache.add_variant(entry, encoding, body)
+        else:
+            self._stats.setdefault(route, CompressionStats()).variant_hits += 1
+        return encoded_response(response, encoding, body)
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "encodings": list(self.codecs),
+            "min_size": self.min_size,
+            "routes": {route: stats.as_dict() for route, stats in self._stats.items()},
+        }
+
+
+def parse_accept_encoding(header: str) -> Dict[str, float]:
+    offered = {}
+    for part in header.split(","):
+        name, _, params = part.strip().partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        offered[name] = q
+    return offered
+
+
+def encoded_response(response: Response, encoding: str, body: bytes) -> Response:
+    encoded = Response(content=body, status_code=response.status_code)
+    encoded.raw_headers = encoded_headers(response.raw_headers, encoding, len(body))
+    return encoded
+
+
+def encoded_headers(raw_headers, encoding: str, length: Optional[int] = None) -> list:
+    """The original headers for a body encoded with `encoding`; without a length there is no Content-Length."""
+    headers = []
+    for name, value in raw_headers:
+        lowered = name.lower()
+        if lowered in (b"content-length", b"content-encoding", b"vary"):
+            continue
+        if lowered == b"etag" and not value.startswith(b"W/"):
+            # The encoded body is no longer byte-identical to the original
+            value = b"W/" + value
+        headers.append((name, value))
+    headers.append((b"content-encoding", encoding.encode()))
+    if length is not None:
+        headers.append((b"content-length", str(length).encode()))
+    headers.append((b"vary", _vary_value(raw_headers)))
+    return headers
+
+
+class _BrotliStream:
+    """brotli.Compressor with the compress/flush interface of zlib and zstandard."""
+
+    def __init__(self, quality: int):
+        self._compressor = brotli.Compressor(quality=quality)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.process(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.finish()
+
+
+def _with_vary(response: Response) -> Response:
+    headers = [(name, value) for name, value in response.raw_headers if name.lower() != b"vary"]
+    headers.append((b"vary", _vary_value(response.raw_headers)))
+    response.raw_headers = headers
+    return response
+
+
+def _vary_value(raw_headers) -> bytes:
+    existing = _header(raw_headers, b"vary")
+    if not existing:
+        return b"Accept-Encoding"
+    if "accept-encoding" in existing.lower():
+        return existing.encode("latin-1")
+    return f"{existing}, Accept-Encoding".encode("latin-1")
+
+
+def _header(raw_headers, name: bytes) -> Optional[str]:
+    for key, value in raw_headers:
+        if key.lower() == name:
+            return value.decode("latin-1")
+    return None
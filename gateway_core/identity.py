@@ -0,0 +1,94 @@
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+from fastapi import Request
+from jose import JWTError, jwt
+
+from dependencies.identity import IDENTITY_HEADERS, identity_headers
+from gateway_core.proxy import RawHeaders
+from gateway_core.settings import setting
+
+_IDENTITY_HEADER_NAMES = {name.encode() for name in IDENTITY_HEADERS}
+
+
+class IdentityVerifier:
+    """
+    Verifies each bearer token once at the gateway and forwards the caller's
+    identity as signed X-User-Id / X-Role headers. Verified claims are kept in
+    a bounded LRU keyed by token until the token expires, so repeat requests
+    skip JWT decoding entirely.
+
+    Client-supplied identity headers are always stripped; a request with a
+    missing or invalid token is forwarded without identity and the service
+    decides whether to reject it.
+    """
+
+    def __init__(self):
+        self.jwt_secret = setting("JWT_SECRET", default="your-secret-key")
+        self.signing_secret = setting("GATEWAY_IDENTITY_SECRET", default="")
+        self.enabled = setting("GATEWAY_VERIFY_JWT", default=True, cast=bool) and bool(self.signing_secret)
+        self.max_entries = setting("GATEWAY_IDENTITY_CACHE_SIZE", default=10000, cast=int)
+        # Upper bound for tokens without an exp claim
+        self.max_ttl = setting("GATEWAY_IDENTITY_CACHE_TTL", default=300.0, cast=float)
+        self._claims: "OrderedDict[str, Tuple[dict, float]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.invalid = 0
+
+    def identify(self, authorization: Optional[str]) -> Optional[dict]:
+        scheme, _, token = (authorization or "").partition(" ")
+        token = token.strip()
+        if scheme.lower() != "bearer" or not token:
+            return None
+        now = time.time()
+        cached = self._claims.get(token)
+        if cached is not None:
+            identity, expires_at = cached
+            if now < expires_at:
+                self._claims.move_to_end(token)
+                self.hits += 1
+                return identity
+            del self._claims[token]
+
+        self.misses += 1
+        try:
+            payload = jwt.decode(token, self.jwt_secret, algorithms=["HS256"])
+        except JWTError:
+            self.invalid += 1
+            return None
+        # Same acceptance rule as dependencies/auth.get_current_user
+        user_id = payload.get("user_id")
+        role = payload.get("role", "user")
+        if not user_id and role != "admin":
+            self.invalid += 1
+            return None
+
+        identity = {"user_id": str(user_id) if user_id else None, "role": str(role)}
+        expires_at = now + self.max_ttl
+        if isinstance(payload.get("exp"), (int, float)):
+            expires_at = min(expires_at, payload["exp"])
+        self._claims[token] = (identity, expires_at)
+        while len(self._claims) > self.max_entries:
+            self._claims.popitem(last=False)
+        return identity
+
+    def apply(self, request: Request, headers: RawHeaders) -> RawHeaders:
+        """Replaces any identity headers on the proxied request with signed ones."""
+        headers = [(name, value) for name, value in headers if name.lower() not in _IDENTITY_HEADER_NAMES]
+        if not self.enabled:
+            return headers
+        identity = self.identify(request.headers.get("authorization"))
+        if identity is None:
+            return headers
+        signed = identity_headers(self.signing_secret, identity["user_id"], identity["role"])
+        return headers + [(name.encode(), value.encode("latin-1")) for name, value in signed.items()]
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "cached_tokens": len(self._claims),
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalid": self.invalid,
+        }
@@ -0,0 +1,100 @@
+from typing import Dict, Optional
+
+from fastapi import Request
+
+from gateway_core.routing import Route, RouteTable
+from gateway_core.settings import setting
+
+BULK = "bulk"
+INTERACTIVE = "interactive"
+AUTH = "auth"
+
+# name: (max_connections, max_keepalive_connections, max_in_flight, max_queue, queue_timeout)
+_LANE_DEFAULTS = {
+    INTERACTIVE: (100, 20, 100, 50, 5.0),
+    AUTH: (20, 10, 20, 20, 5.0),
+    BULK: (20, 5, 10, 10, 30.0),
+}
+
+# The interactive lane carries the gateway's ordinary traffic, so it starts
+# from the gateway-wide pool and concurrency settings
+_GATEWAY_WIDE_SETTINGS = (
+    "GATEWAY_MAX_CONNECTIONS",
+    "GATEWAY_MAX_KEEPALIVE_CONNECTIONS",
+    "GATEWAY_MAX_IN_FLIGHT",
+    "GATEWAY_MAX_QUEUE",
+    "GATEWAY_QUEUE_TIMEOUT",
+)
+
+
+class Lane:
+    """
+    A class of traffic with its own upstream connection pool and concurrency
+    budget, so slow uploads cannot starve cheap reads of connections or
+    in-flight slots. Every value can be overridden with
+    GATEWAY_LANE_<NAME>_<SETTING>, e.g. GATEWAY_LANE_BULK_MAX_IN_FLIGHT. The
+    interactive lane defaults to GATEWAY_MAX_CONNECTIONS,
+    GATEWAY_MAX_KEEPALIVE_CONNECTIONS, GATEWAY_MAX_IN_FLIGHT, GATEWAY_MAX_QUEUE
+    and GATEWAY_QUEUE_TIMEOUT.
+    """
+
+    def __init__(self, name: str):
+        defaults = _LANE_DEFAULTS[name]
+        if name == INTERACTIVE:
+            defaults = tuple(
+                setting(env_name, default=default, cast=type(default))
+                for env_name, default in zip(_GATEWAY_WIDE_SETTINGS, defaults)
+            )
+        max_connections, max_keepalive, max_in_flight, max_queue, queue_timeout = defaults
+        env = f"GATEWAY_LANE_{name.upper()}_"
+        self.name = name
+        self.max_connections = setting(env + "MAX_CONNECTIONS", default=max_connections, cast=int)
+        self.max_keepalive_connections = setting(env + "MAX_KEEPALIVE_CONNECTIONS", default=max_keepalive, cast=int)
+        self.max_in_flight = setting(env + "MAX_IN_FLIGHT", default=max_in_flight, cast=int)
+        self.max_queue = setting(env + "MAX_QUEUE", default=max_queue, cast=int)
+        self.queue_timeout = setting(env + "QUEUE_TIMEOUT", default=queue_timeout, cast=float)
+
+    def __repr__(self):
+        return f"Lane({self.name!r})"
+
+
+def default_lanes() -> Dict[str, Lane]:
+    return {name: Lane(name) for name in _LANE_DEFAULTS}
+
+
+class LaneClassifier:
+    """
+    Picks the lane for a request: the most specific matching rule in
+    `rules` (prefix -> {"lane", "methods"}) first, then multipart or large
+    request bodies go to the bulk lane, and everything else is interactive.
+    """
+
+    def __init__(self, rules: Dict[str, dict]):
+        self.bulk_body_bytes = setting("GATEWAY_BULK_BODY_BYTES", default=1024 * 1024, cast=int)
+        self._table = RouteTable()
+        self._rules: Dict[str, dict] = {}
+        for prefix, rule in rules.items():
+            route = Route(prefix)
+            self._table.add(route)
+            self._rules[route.prefix] = {
+                "lane": rule["lane"],
+                "methods": {method.upper() for method in rule.get("methods", ())},
+            }
+
+    def classify(self, path: str, request: Request) -> str:
+        route: Optional[Route] = self._table.match(path)
+        if route is not None:
+            rule = self._rules[route.prefix]
+            if not rule["methods"] or request.method in rule["methods"]:
+                return rule["lane"]
+        if request.headers.get("content-type", "").startswith("multipart/"):
+            return BULK
+        if "transfer-encoding" in request.headers:
+            # Streamed body of unknown size
+            return BULK
+        try:
+            if int(request.headers.get("content-length") or 0) >= self.bulk_body_bytes:
+                return BULK
+        except ValueError:
+            pass
+        return INTERACTIVE
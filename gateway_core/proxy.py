@@ -0,0 +1,162 @@
+from typing import Iterable, List, Optional, Tuple
+
+import httpx
+from fastapi import Request, Response
+from starlette.background import BackgroundTask
+from starlette.responses import StreamingResponse
+
+# Headers that only apply to a single transport-level connection (RFC 7230 §6.1)
+HOP_BY_HOP_HEADERS = frozenset({
+    "connection",
+    "keep-alive",
+    "proxy-authenticate",
+    "proxy-authorization",
+    "proxy-connection",
+    "te",
+    "trailer",
+    "trailers",
+    "transfer-encoding",
+    "upgrade",
+})
+
+RawHeaders = List[Tuple[bytes, bytes]]
+
+
+def filter_hop_by_hop(raw_headers: Iterable[Tuple[bytes, bytes]], drop: Iterable[str] = ()) -> RawHeaders:
+    """
+    Removes hop-by-hop headers, including any extra ones named in the
+    Connection header, while keeping repeated headers such as Set-Cookie.
+    """
+    raw_headers = list(raw_headers)
+    excluded = set(HOP_BY_HOP_HEADERS) | {name.lower() for name in drop}
+    for name, value in raw_headers:
+        if name.lower() == b"connection":
+            excluded.update(token.strip().lower() for token in value.decode("latin-1").split(",") if token.strip())
+    return [(name, value) for name, value in raw_headers if name.decode("latin-1").lower() not in excluded]
+
+
+def upstream_request_headers(request: Request) -> RawHeaders:
+    # Host is set by httpx from the target URL
+    return filter_hop_by_hop(request.headers.raw, drop=("host",))
+
+
+def has_request_body(request: Request) -> bool:
+    if "transfer-encoding" in request.headers:
+        return True
+    return int(request.headers.get("content-length") or 0) > 0
+
+
+def clone_response(response: Response) -> Response:
+    """Copies a buffered response so it can be sent to more than one client."""
+    clone = Response(content=response.body, status_code=response.status_code)
+    clone.raw_headers = list(response.raw_headers)
+    return clone
+
+
+def _raw_response(content: bytes, upstream: httpx.Response) -> Response:
+    response = Response(content=content, status_code=upstream.status_code)
+    response.raw_headers = filter_hop_by_hop(upstream.headers.raw)
+    return response
+
+
+async def send_buffered(
+    client: httpx.AsyncClient,
+    method: str,
+    url: str,
+    headers: RawHeaders,
+    params,
+    content: Optional[bytes],
+    timeout=None,
+) -> Response:
+    """
+    Sends the request and reads the whole upstream body before responding.
+    The body is kept exactly as sent by the upstream, so Content-Encoding and
+    Content-Length stay valid.
+    """
+    upstream_request = client.build_request(method, url, headers=headers, params=params, content=content, **_timeout_kwargs(timeout))
+    upstream = await client.send(upstream_request, stream=True)
+    try:
+        body = b"".join([chunk async for chunk in upstream.aiter_raw()])
+    finally:
+        await upstream.aclose()
+    return _raw_response(body, upstream)
+
+
+async def send_streaming(
+    client: httpx.AsyncClient,
+    method: str,
+    url: str,
+    headers: RawHeaders,
+    params,
+    request: Request,
+    timeout=None,
+    on_complete=None,
+) -> StreamingResponse:
+    """
+    Pipes the incoming ASGI body to the upstream and streams the upstream
+    response back chunk by chunk, so neither body is held in gateway memory.
+    """
+    content = request.stream() if has_request_body(request) else None
+    upstream_request = client.build_request(method, url, headers=headers, params=params, content=content, **_timeout_kwargs(timeout))
+    upstream = await client.send(upstream_request, stream=True)
+
+    closed = False
+
+    async def close_upstream():
+        # Runs from the body generator or the background task, whichever
+        # comes first; a client disconnect can skip the background task.
+        nonlocal closed
+        if closed:
+            return
+        closed = True
+        await upstream.aclose()
+        if on_complete is not None:
+            on_complete()
+
+    async def body():
+        try:
+            async for chunk in upstream.aiter_raw():
+                yield chunk
+        finally:
+            await close_upstream()
+
+    response = StreamingResponse(
+        body(),
+        status_code=upstream.status_code,
+        background=BackgroundTask(close_upstream),
+    )
+    response.raw_headers = filter_hop_by_hop(upstream.headers.raw)
+    return response
+
+
+async def buffer_streaming(response: StreamingResponse, max_bytes: int) -> Response:
+    """
+    Reads a streamed response into memory when its body is at most
+    `max_bytes`. A larger body comes back as a StreamingResponse that replays
+    the part already read and then carries on with the rest of the stream.
+    """
+    for name, value in response.raw_headers:
+        if name.lower() == b"content-length" and value.isdigit() and int(value) > max_bytes:
+            return response
+    iterator = response.body_iterator
+    chunks, size = [], 0
+    async for chunk in iterator:
+        chunks.append(chunk)
+        size += len(chunk)
+        if size > max_bytes:
+            async def replay():
+                for read in chunks:
+                    yield read
+                async for rest in iterator:
+                    yield rest
+
+            streamed = StreamingResponse(replay(), status_code=response.status_code, background=response.background)
+            streamed.raw_headers = response.raw_headers
+            return streamed
+    buffered = Response(content=b"".join(chunks), status_code=response.status_code)
+    buffered.raw_headers = list(response.raw_headers)
+    return buffered
+
+
+def _timeout_kwargs(timeout) -> dict:
+    return {} if timeout is None else {"timeout": timeout}
@@ -0,0 +1,199 @@
+import importlib
+import logging
+import math
+import threading
+import time
+import zlib
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional
+
+from fastapi import Request, Response
+
+from gateway_core.routing import Route, RouteTable
+from gateway_core.settings import setting
+
+logger = logging.getLogger(__name__)
+
+
+class RateLimitRule:
+    """
+    A token bucket: `burst` requests may be made at once, refilled at
+    `rate` requests every `per` seconds. `methods` limits the rule to some
+    HTTP methods (all methods when empty).
+    """
+
+    def __init__(self, rate: float, per: float = 60.0, burst: Optional[int] = None, methods=()):
+        self.rate = rate
+        self.per = per
+        self.burst = burst if burst is not None else max(1, int(rate))
+        self.methods = {method.upper() for method in methods}
+        self.refill_per_second = rate / per
+
+    @property
+    def policy(self) -> str:
+        return f"{self.burst};w={int(self.burst / self.refill_per_second)}"
+
+
+class RateLimitDecision:
+    def __init__(self, allowed: bool, rule: RateLimitRule, remaining: float, retry_after: float, reset: float):
+        self.allowed = allowed
+        self.rule = rule
+        self.remaining = remaining
+        # Seconds until one more request is allowed, and until the bucket is full
+        self.retry_after = retry_after
+        self.reset = reset
+
+    def headers(self) -> Dict[str, str]:
+        headers = {
+            "RateLimit-Policy": self.rule.policy,
+            "RateLimit-Limit": str(self.rule.burst),
+            "RateLimit-Remaining": str(max(0, math.floor(self.remaining))),
+            "RateLimit-Reset": str(max(0, math.ceil(self.reset))),
+        }
+        if not self.allowed:
+            headers["Retry-After"] = str(max(1, math.ceil(self.retry_after)))
+        return headers
+
+
+class RateLimitBackend(ABC):
+    """
+    Storage for token buckets. The local backend keeps them in this process;
+    gateways running several instances can plug in a shared backend through
+    GATEWAY_RATE_LIMIT_BACKEND ("package.module:ClassName").
+    """
+
+    @abstractmethod
+    async def take(self, key: str, rule: RateLimitRule, cost: float = 1.0) -> RateLimitDecision:
+        """Takes `cost` tokens from the bucket for `key` if it has them."""
+
+    def stats(self) -> dict:
+        return {}
+
+
+class _Shard:
+    __slots__ = ("lock", "buckets")
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        # key -> [tokens, last refill time], least recently used first
+        self.buckets: "OrderedDict[str, List[float]]" = OrderedDict()
+
+
+class LocalRateLimitBackend(RateLimitBackend):
+    """
+    In-memory token buckets split across shards by key hash. Each shard has
+    its own lock and its own LRU bound, so updates for different clients do
+    not contend and evicting idle buckets stays cheap.
+    """
+
+    def __init__(self, shards: int = 16, max_keys: int = 100000):
+        self._shards = [_Shard() for _ in range(max(1, shards))]
+        self.max_keys_per_shard = max(1, max_keys // len(self._shards))
+
+    def _shard(self, key: str) -> _Shard:
+        return self._shards[zlib.crc32(key.encode()) % len(self._shards)]
+
+    async def take(self, key: str, rule: RateLimitRule, cost: float = 1.0) -> RateLimitDecision:
+        return self.take_now(key, rule, cost, time.monotonic())
+
+    def take_now(self, key: str, rule: RateLimitRule, cost: float, now: float) -> RateLimitDecision:
+        shard = self._shard(key)
+        with shard.lock:
+            bucket = shard.buckets.get(key)
+            if bucket is None:
+                bucket = [float(rule.burst), now]
+                shard.buckets[key] = bucket
+                if len(shard.buckets) > self.max_keys_per_shard:
+                    # An evicted bucket starts full again, which only ever errs
+                    # on the side of letting an idle client through.
+                    shard.buckets.popitem(last=False)
+            else:
+                shard.buckets.move_to_end(key)
+            tokens = min(float(rule.burst), bucket[0] + (now - bucket[1]) * rule.refill_per_second)
+            allowed = tokens >= cost
+            if allowed:
+                tokens -= cost
+            bucket[0], bucket[1] = tokens, now
+
+        retry_after = 0.0 if allowed else (cost - tokens) / rule.refill_per_second
+        reset = (rule.burst - tokens) / rule.refill_per_second
+        return RateLimitDecision(allowed, rule, tokens, retry_after, reset)
+
+    def stats(self) -> dict:
+        return {"backend": "local", "shards": len(self._shards), "buckets": sum(len(s.buckets) for s in self._shards)}
+
+
+def load_backend(spec: str) -> RateLimitBackend:
+    if spec in ("", "local"):
+        return LocalRateLimitBackend(
+            shards=setting("GATEWAY_RATE_LIMIT_SHARDS", default=16, cast=int),
+            max_keys=setting("GATEWAY_RATE_LIMIT_MAX_KEYS", default=100000, cast=int),
+        )
+    module_name, _, class_name = spec.partition(":")
+    return getattr(importlib.import_module(module_name), class_name)()
+
+
+class RateLimiter:
+    """
+    Applies the most specific rule for a request path to the caller, keyed by
+    user id when the request carries a valid token and by client IP otherwise.
+    If the backend fails the request is let through.
+    """
+
+    def __init__(self, rules: Dict[str, dict], identify: Callable[[Optional[str]], Optional[dict]]):
+        self.enabled = setting("GATEWAY_RATE_LIMIT", default=True, cast=bool)
+        self.trust_forwarded_for = setting("GATEWAY_TRUST_FORWARDED_FOR", default=False, cast=bool)
+        self.backend = load_backend(setting("GATEWAY_RATE_LIMIT_BACKEND", default="local"))
+        self.identify = identify
+        self.rules: Dict[str, RateLimitRule] = {}
+        # Rule prefixes may be deeper than the service prefixes, so they get
+        # their own routing table.
+        self._table = RouteTable()
+        for prefix, options in rules.items():
+            route = Route(prefix)
+            self._table.add(route)
+            self.rules[route.prefix] = RateLimitRule(**options)
+        self.limited: Dict[str, int] = {}
+
+    def client_key(self, request: Request) -> str:
+        identity = self.identify(request.headers.get("authorization"))
+        if identity is not None and identity.get("user_id"):
+            return f"user:{identity['user_id']}"
+        forwarded = request.headers.get("x-forwarded-for") if self.trust_forwarded_for else None
+        if forwarded:
+            return f"ip:{forwarded.split(',')[0].strip()}"
+        return f"ip:{request.client.host if request.client else 'unknown'}"
+
+    async def check(self, path: str, request: Request) -> Optional[RateLimitDecision]:
+        """Returns the decision for a rate-limited path, or None if no rule applies."""
+        if not self.enabled:
+            return None
+        route = self._table.match(path)
+        if route is None:
+            return None
+        rule = self.rules[route.prefix]
+        if rule.methods and request.method not in rule.methods:
+            return None
+        key = f"{route.prefix}|{self.client_key(request)}"
+        try:
+            decision = await self.backend.take(key, rule)
+        except Exception as e:
+            logger.warning(f"[RateLimiter] Backend failed, allowing request: {e}")
+            return None
+        if not decision.allowed:
+            self.limited[route.prefix] = self.limited.get(route.prefix, 0) + 1
+        return decision
+
+    def stats(self) -> dict:
+        return {"enabled": self.enabled, "limited": dict(self.limited), **self.backend.stats()}
+
+
+def rate_limited_response(decision: RateLimitDecision) -> Response:
+    return Response("Too many requests", status_code=429, headers=decision.headers())
+
+
+def add_rate_limit_headers(response: Response, decision: RateLimitDecision) -> Response:
+    for name, value in decision.headers().items():
+        response.raw_headers.append((name.lower().encode(), value.encode()))
+    return response
@@ -0,0 +1,272 @@
+import asyncio
+import math
+import time
+from collections import deque
+from typing import Dict, Optional
+
+from gateway_core.lanes import INTERACTIVE, Lane
+from gateway_core.settings import setting
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class UpstreamRejected(Exception):
+    """Raised when the gateway refuses to send a request to an upstream."""
+
+    def __init__(self, reason: str, retry_after: float):
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = retry_after
+
+    @property
+    def retry_after_header(self) -> str:
+        return str(max(1, math.ceil(self.retry_after)))
+
+
+class ResilienceSettings:
+    def __init__(self):
+        self.max_in_flight = setting("GATEWAY_MAX_IN_FLIGHT", default=100, cast=int)
+        self.max_queue = setting("GATEWAY_MAX_QUEUE", default=50, cast=int)
+        self.queue_timeout = setting("GATEWAY_QUEUE_TIMEOUT", default=5.0, cast=float)
+        self.breaker_window = setting("GATEWAY_BREAKER_WINDOW", default=50, cast=int)
+        self.breaker_min_calls = setting("GATEWAY_BREAKER_MIN_CALLS", default=20, cast=int)
+        self.breaker_failure_rate = setting("GATEWAY_BREAKER_FAILURE_RATE", default=0.5, cast=float)
+        self.breaker_slow_call_seconds = setting("GATEWAY_BREAKER_SLOW_CALL_SECONDS", default=10.0, cast=float)
+        self.breaker_open_seconds = setting("GATEWAY_BREAKER_OPEN_SECONDS", default=30.0, cast=float)
+        self.breaker_half_open_calls = setting("GATEWAY_BREAKER_HALF_OPEN_CALLS", default=3, cast=int)
+
+
+class ConcurrencyLimiter:
+    """
+    Caps the requests in flight to one upstream and lets a bounded number
+    wait for a slot. Anything beyond the queue is shed immediately.
+    """
+
+    def __init__(self, max_in_flight: int, max_queue: int, queue_timeout: float):
+        self.max_in_flight = max_in_flight
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self._semaphore = asyncio.Semaphore(max_in_flight)
+        self.in_flight = 0
+        self.waiting = 0
+        self.shed = 0
+        self.timed_out = 0
+
+    async def acquire(self):
+        # Waiters are counted before they get a slot, so this holds even for
+        # a burst that arrives before any of them has acquired the semaphore.
+        if self.in_flight + self.waiting >= self.max_in_flight + self.max_queue:
+            self.shed += 1
+            raise UpstreamRejected("Upstream is overloaded", retry_after=1.0)
+        self.waiting += 1
+        try:
+            # Not wait_for: on 3.11 it can drop a slot that was acquired just
+            # as the timeout fired. A semaphore interrupted here gives the
+            # slot back itself.
+            async with asyncio.timeout(self.queue_timeout):
+                await self._semaphore.acquire()
+        except TimeoutError:
+            self.timed_out += 1
+            raise UpstreamRejected("Timed out waiting for an upstream slot", retry_after=self.queue_timeout)
+        finally:
+            self.waiting -= 1
+        self.in_flight += 1
+
+    def release(self):
+        self.in_flight -= 1
+        self._semaphore.release()
+
+    def stats(self) -> dict:
+        return {
+            "in_flight": self.in_flight,
+            "waiting": self.waiting,
+            "max_in_flight": self.max_in_flight,
+            "max_queue": self.max_queue,
+            "shed": self.shed,
+            "queue_timeouts": self.timed_out,
+        }
+
+
+class CircuitBreaker:
+    """
+    Tracks the outcome of the last calls to an upstream. Errors and calls
+    slower than the slow-call threshold count as failures; once the failure
+    rate crosses the threshold the breaker opens and rejects calls, then lets
+    a few half-open probes through to decide whether to close again.
+    """
+
+    def __init__(self, window: int, min_calls: int, failure_rate: float, slow_call_seconds: float,
+                 open_seconds: float, half_open_calls: int):
+        self.min_calls = min_calls
+        self.failure_rate = failure_rate
+        self.slow_call_seconds = slow_call_seconds
+        self.open_seconds = open_seconds
+        self.half_open_calls = half_open_calls
+        self.state = CLOSED
+        self._outcomes = deque(maxlen=window)
+        self._opened_at = 0.0
+        self._half_opened_at = 0.0
+        self._probes = 0
+        self._probe_successes = 0
+        self.times_opened = 0
+        self.rejected = 0
+
+    def before_call(self):
+        if self.state == OPEN:
+            remaining = self._opened_at + self.open_seconds - time.monotonic()
+            if remaining > 0:
+                self.rejected += 1
+                raise UpstreamRejected("Circuit breaker is open", retry_after=remaining)
+            self._half_open()
+        if self.state == HALF_OPEN:
+            if self._probes >= self.half_open_calls and time.monotonic() - self._half_opened_at > self.open_seconds:
+                # Probes that never reported back (e.g. cancelled requests)
+                # must not keep the breaker half-open forever.
+                self._half_open()
+            if self._probes >= self.half_open_calls:
+                self.rejected += 1
+                raise UpstreamRejected("Circuit breaker is half-open", retry_after=1.0)
+            self._probes += 1
+
+    def call_abandoned(self):
+        """Frees a half-open probe slot for a call that never reached the upstream."""
+        if self.state == HALF_OPEN and self._probes > 0:
+            self._probes -= 1
+
+    def record(self, success: bool, latency: float):
+        failed = not success or latency >= self.slow_call_seconds
+        if self.state == HALF_OPEN:
+            if failed:
+                self._open()
+                return
+            self._probe_successes += 1
+            if self._probe_successes >= self.half_open_calls:
+                self.state = CLOSED
+                self._outcomes.clear()
+            return
+        if self.state == OPEN:
+            return
+        self._outcomes.append(failed)
+        if len(self._outcomes) >= self.min_calls and self.current_failure_rate() >= self.failure_rate:
+            self._open()
+
+    def current_failure_rate(self) -> float:
+        if not self._outcomes:
+            return 0.0
+        return sum(self._outcomes) / len(self._outcomes)
+
+    def _half_open(self):
+        self.state = HALF_OPEN
+        self._half_opened_at = time.monotonic()
+        self._probes = 0
+        self._probe_successes = 0
+
+    def _open(self):
+        self.state = OPEN
+        self._opened_at = time.monotonic()
+        self.times_opened += 1
+        self._outcomes.clear()
+
+    def stats(self) -> dict:
+        result = {
+            "state": self.state,
+            "failure_rate": round(self.current_failure_rate(), 4),
+            "calls_in_window": len(self._outcomes),
+            "times_opened": self.times_opened,
+            "rejected": self.rejected,
+        }
+        if self.state == OPEN:
+            result["retry_after"] = round(max(0.0, self._opened_at + self.open_seconds - time.monotonic()), 2)
+        return result
+
+
+class UpstreamGuard:
+    def __init__(self, limiter: ConcurrencyLimiter, breaker: CircuitBreaker):
+        self.limiter = limiter
+        self.breaker = breaker
+
+    async def enter(self):
+        """Raises UpstreamRejected when the breaker is open or the queue is full."""
+        self.breaker.before_call()
+        try:
+            await self.limiter.acquire()
+        except BaseException:
+            self.breaker.call_abandoned()
+            raise
+
+    def release(self):
+        self.limiter.release()
+
+    def stats(self) -> dict:
+        return {"breaker": self.breaker.stats(), "concurrency": self.limiter.stats()}
+
+
+class UpstreamGuards:
+    """
+    One circuit breaker per upstream service, shared by all of its lanes,
+    and one concurrency limiter per (upstream, lane).
+    """
+
+    def __init__(self, settings: Optional[ResilienceSettings] = None):
+        self.settings = settings or ResilienceSettings()
+        self._guards: Dict[str, Dict[str, UpstreamGuard]] = {}
+
+    def add(
+        self,
+        name: str,
+        max_in_flight: Optional[int] = None,
+        max_queue: Optional[int] = None,
+        lanes: Optional[Dict[str, Lane]] = None,
+    ):
+        """
+        Route-level max_in_flight / max_queue override the interactive lane's
+        budget; the other lanes use their own. Without lanes the interactive
+        budget comes from GATEWAY_MAX_IN_FLIGHT / GATEWAY_MAX_QUEUE /
+        GATEWAY_QUEUE_TIMEOUT.
+        """
+        settings = self.settings
+        breaker = CircuitBreaker(
+            settings.breaker_window,
+            settings.breaker_min_calls,
+            settings.breaker_failure_rate,
+            settings.breaker_slow_call_seconds,
+            settings.breaker_open_seconds,
+            settings.breaker_half_open_calls,
+        )
+        lanes = lanes or {}
+        interactive = lanes.get(INTERACTIVE)
+        lane_in_flight = interactive.max_in_flight if interactive else settings.max_in_flight
+        lane_queue = interactive.max_queue if interactive else settings.max_queue
+        guards = {
+            INTERACTIVE: UpstreamGuard(
+                ConcurrencyLimiter(
+                    max_in_flight or lane_in_flight,
+                    lane_queue if max_queue is None else max_queue,
+                    interactive.queue_timeout if interactive else settings.queue_timeout,
+                ),
+                breaker,
+            )
+        }
+        for lane_name, lane in lanes.items():
+            if lane_name == INTERACTIVE:
+                continue
+            guards[lane_name] = UpstreamGuard(
+                ConcurrencyLimiter(lane.max_in_flight, lane.max_queue, lane.queue_timeout),
+                breaker,
+            )
+        self._guards[name] = guards
+
+    def get(self, name: str, lane: str = INTERACTIVE) -> UpstreamGuard:
+        guards = self._guards[name]
+        return guards.get(lane) or guards[INTERACTIVE]
+
+    def stats(self) -> dict:
+        return {
+            name: {
+                "breaker": guards[INTERACTIVE].breaker.stats(),
+                "concurrency": {lane: guard.limiter.stats() for lane, guard in guards.items()},
+            }
+            for name, guards in self._guards.items()
+        }
@@ -0,0 +1,218 @@
+import asyncio
+import random
+import time
+from collections import deque
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+from fastapi import Response
+
+from gateway_core.settings import setting
+
+# Methods that are safe to send more than once
+IDEMPOTENT_METHODS = {"GET", "HEAD"}
+
+# Upstream statuses worth trying again on another attempt
+RETRYABLE_STATUSES = {502, 503, 504}
+
+# One attempt: the response and whether it is worth retrying. The list passed
+# in collects the instances tried so far so later attempts can avoid them.
+Attempt = Callable[[List[object]], Awaitable[Tuple[Response, bool]]]
+
+
+class RetryBudget:
+    """
+    Caps retries and hedges at a fraction of recent traffic: every request
+    deposits `ratio` tokens and every extra attempt spends one. A small
+    per-second allowance keeps retries possible when traffic is low.
+    """
+
+    def __init__(self, ratio: float, min_per_second: float, max_tokens: float = 10.0):
+        self.ratio = ratio
+        self.min_per_second = min_per_second
+        self.max_tokens = max_tokens
+        self.tokens = max_tokens
+        self._updated = time.monotonic()
+
+    def deposit(self):
+        self._refill()
+        self.tokens = min(self.max_tokens, self.tokens + self.ratio)
+
+    def withdraw(self) -> bool:
+        self._refill()
+        if self.tokens < 1.0:
+            return False
+        self.tokens -= 1.0
+        return True
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.max_tokens, self.tokens + (now - self._updated) * self.min_per_second)
+        self._updated = now
+
+
+class LatencyTracker:
+    """Recent successful attempt latencies for one upstream, for the hedge delay."""
+
+    def __init__(self, samples: int):
+        self._samples = deque(maxlen=samples)
+        self._p95: Optional[float] = None
+        self._since_sorted = 0
+
+    def observe(self, seconds: float):
+        self._samples.append(seconds)
+        self._since_sorted += 1
+        if self._since_sorted >= 20:
+            self._p95 = None
+
+    def p95(self) -> Optional[float]:
+        if len(self._samples) < 20:
+            return None
+        if self._p95 is None:
+            ordered = sorted(self._samples)
+            self._p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+            self._since_sorted = 0
+        return self._p95
+
+
+class RetryStats:
+    def __init__(self):
+        self.requests = 0
+        self.attempts = 0
+        self.retries = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+        self.budget_exhausted = 0
+
+    def as_dict(self) -> dict:
+        extra = self.retries + self.hedges
+        return {
+            "requests": self.requests,
+            "attempts": self.attempts,
+            "retries": self.retries,
+            "hedges": self.hedges,
+            "hedge_wins": self.hedge_wins,
+            "budget_exhausted": self.budget_exhausted,
+            # Extra upstream load caused by retries and hedging
+            "extra_load": round(extra / self.requests, 4) if self.requests else 0.0,
+        }
+
+
+class Retrier:
+    """
+    Runs idempotent requests with retries and optional hedging.
+
+    Failed attempts (connection errors, timeouts, 502/503/504) are retried
+    after a fully jittered exponential backoff. With hedging on, a second
+    attempt goes to another instance once the first has taken longer than the
+    upstream's recent p95 latency, and whichever answers first wins. Both are
+    limited by a per-upstream retry budget.
+    """
+
+    def __init__(self):
+        self.max_retries = setting("GATEWAY_RETRIES", default=2, cast=int)
+        self.backoff = setting("GATEWAY_RETRY_BACKOFF", default=0.05, cast=float)
+        self.backoff_max = setting("GATEWAY_RETRY_BACKOFF_MAX", default=1.0, cast=float)
+        self.budget_ratio = setting("GATEWAY_RETRY_BUDGET_RATIO", default=0.1, cast=float)
+        self.budget_min_per_second = setting("GATEWAY_RETRY_BUDGET_MIN_PER_SECOND", default=5.0, cast=float)
+        self.hedge = setting("GATEWAY_HEDGE", default=False, cast=bool)
+        # Used until enough latencies have been seen to estimate the p95
+        self.hedge_delay = setting("GATEWAY_HEDGE_DELAY", default=0.5, cast=float)
+        self.hedge_min_delay = setting("GATEWAY_HEDGE_MIN_DELAY", default=0.02, cast=float)
+        self.samples = setting("GATEWAY_HEDGE_SAMPLES", default=200, cast=int)
+        self._budgets: Dict[str, RetryBudget] = {}
+        self._latencies: Dict[str, LatencyTracker] = {}
+        self._stats: Dict[str, RetryStats] = {}
+
+    def _budget(self, name: str) -> RetryBudget:
+        budget = self._budgets.get(name)
+        if budget is None:
+            budget = self._budgets[name] = RetryBudget(self.budget_ratio, self.budget_min_per_second)
+        return budget
+
+    def _tracker(self, name: str) -> LatencyTracker:
+        tracker = self._latencies.get(name)
+        if tracker is None:
+            tracker = self._latencies[name] = LatencyTracker(self.samples)
+        return tracker
+
+    def delay_for(self, name: str) -> float:
+        p95 = self._tracker(name).p95()
+        return max(self.hedge_min_delay, p95 if p95 is not None else self.hedge_delay)
+
+    async def run(
+        self, name: str, attempt: Attempt, retries: Optional[int] = None, hedge: Optional[bool] = None
+    ) -> Response:
+        retries = self.max_retries if retries is None else retries
+        hedge = self.hedge if hedge is None else hedge
+        stats = self._stats.setdefault(name, RetryStats())
+        budget = self._budget(name)
+        stats.requests += 1
+        budget.deposit()
+
+        tried: List[object] = []
+        if hedge:
+            response, retryable = await self._hedged(name, attempt, tried, stats, budget)
+        else:
+            response, retryable = await self._timed(name, attempt, tried, stats)
+        for number in range(1, retries + 1):
+            if not retryable:
+                break
+            if not budget.withdraw():
+                stats.budget_exhausted += 1
+                break
+            stats.retries += 1
+            await asyncio.sleep(random.uniform(0, min(self.backoff_max, self.backoff * 2 ** number)))
+            response, retryable = await self._timed(name, attempt, tried, stats)
+        return response
+
+    async def _timed(self, name: str, attempt: Attempt, tried: List[object], stats: RetryStats) -> Tuple[Response, bool]:
+        stats.attempts += 1
+        started = time.monotonic()
+        response, retryable = await attempt(tried)
+        if not retryable:
+            self._tracker(name).observe(time.monotonic() - started)
+        return response, retryable
+
+    async def _hedged(
+        self, name: str, attempt: Attempt, tried: List[object], stats: RetryStats, budget: RetryBudget
+    ) -> Tuple[Response, bool]:
+        first = asyncio.ensure_future(self._timed(name, attempt, tried, stats))
+        try:
+            done, _ = await asyncio.wait({first}, timeout=self.delay_for(name))
+            if done or not budget.withdraw():
+                return await first
+            stats.hedges += 1
+            second = asyncio.ensure_future(self._timed(name, attempt, tried, stats))
+        except BaseException:
+            first.cancel()
+            raise
+
+        pending = {first, second}
+        result = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    response, retryable = task.result()
+                    if not retryable:
+                        if task is second:
+                            stats.hedge_wins += 1
+                        return response, retryable
+                    result = result or (response, retryable)
+            return result
+        finally:
+            for task in pending:
+                task.cancel()
+
+    def stats(self) -> dict:
+        return {
+            "hedging": self.hedge,
+            "routes": {
+                name: {
+                    **stats.as_dict(),
+                    "hedge_delay_ms": round(self.delay_for(name) * 1000, 1),
+                    "budget_tokens": round(self._budget(name).tokens, 2),
+                }
+                for name, stats in self._stats.items()
+            },
+        }
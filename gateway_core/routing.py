@@ -0,0 +1,113 @@
+from typing import Dict, Optional
+
+
+class RouteOptions:
+    """
+    Per-route proxy behaviour. Values left as None fall back to the
+    gateway-wide defaults.
+    """
+
+    def __init__(
+        self,
+        timeout: Optional[float] = None,
+        streaming: Optional[bool] = None,
+        cacheable: bool = False,
+        cache_ttl: float = 0.0,
+        cache_vary_auth: bool = True,
+        coalesce: bool = True,
+        max_in_flight: Optional[int] = None,
+        max_queue: Optional[int] = None,
+        retries: Optional[int] = None,
+        hedge: Optional[bool] = None,
+    ):
+        self.timeout = timeout
+        self.streaming = streaming
+        self.cacheable = cacheable
+        self.cache_ttl = cache_ttl
+        self.cache_vary_auth = cache_vary_auth
+        self.coalesce = coalesce
+        self.max_in_flight = max_in_flight
+        self.max_queue = max_queue
+        # Retries and hedging for idempotent requests (None: gateway default)
+        self.retries = retries
+        self.hedge = hedge
+
+    def __repr__(self):
+        return f"RouteOptions({self.__dict__})"
+
+
+class Route:
+    """
+    A route prefix and its options. The upstream instances serving it live in
+    the gateway's upstream pool registered under the same name.
+    """
+
+    def __init__(self, prefix: str, options: Optional[RouteOptions] = None):
+        self.prefix = "/" + prefix.strip("/")
+        self.options = options or RouteOptions()
+
+    @property
+    def upstream(self) -> str:
+        return self.prefix
+
+    def __repr__(self):
+        return f"Route({self.prefix!r})"
+
+
+class _Node:
+    __slots__ = ("children", "route")
+
+    def __init__(self):
+        self.children: Dict[str, "_Node"] = {}
+        self.route: Optional[Route] = None
+
+
+class RouteTable:
+    """
+    Segment trie built once at startup. Lookups walk the request path one
+    segment at a time and return the longest matching prefix, so
+    "/announcement_email" is never captured by "/announcement" and the cost
+    depends on path depth rather than on the number of services.
+    """
+
+    def __init__(self):
+        self._root = _Node()
+        self.routes: Dict[str, Route] = {}
+
+    @classmethod
+    def build(cls, service_map: Dict[str, object], route_options: Optional[Dict[str, dict]] = None) -> "RouteTable":
+        route_options = route_options or {}
+        table = cls()
+        for prefix in service_map:
+            table.add(Route(prefix, RouteOptions(**route_options.get(prefix, {}))))
+        return table
+
+    def add(self, route: Route):
+        node = self._root
+        for segment in _segments(route.prefix):
+            node = node.children.setdefault(segment, _Node())
+        node.route = route
+        self.routes[route.prefix] = route
+
+    def match(self, path: str) -> Optional[Route]:
+        node = self._root
+        best = node.route
+        # Walk the path lazily so lookups stop at the first unknown segment
+        # instead of splitting the whole path up front.
+        start, length = 0, len(path)
+        while start < length:
+            end = path.find("/", start)
+            if end == -1:
+                end = length
+            if end > start:
+                node = node.children.get(path[start:end])
+                if node is None:
+                    break
+                if node.route is not None:
+                    best = node.route
+            start = end + 1
+        return best
+
+
+def _segments(path: str):
+    return [segment for segment in path.split("/") if segment]
@@ -0,0 +1,15 @@
+import os
+from decouple import config
+
+
+def setting(name: str, default=None, cast=str):
+    """
+    Reads a gateway setting from the environment first, then from .env,
+    the same lookup order the services use for their own configuration.
+    """
+    value = os.getenv(name) or config(name, default=default)
+    if value is None:
+        return None
+    if cast is bool and isinstance(value, str):
+        return value.strip().lower() in ("1", "true", "yes", "on")
+    return cast(value)
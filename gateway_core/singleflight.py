@@ -0,0 +1,73 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+
+class SingleFlight:
+    """
+    Collapses identical concurrent calls into one. The first caller for a key
+    starts the call; callers arriving while it is in flight wait for the same
+    result instead of issuing their own.
+
+    The call runs in its own task, so a leader whose client disconnects does
+    not cancel the result for the other waiters.
+    """
+
+    def __init__(self):
+        self._calls: Dict[Hashable, asyncio.Task] = {}
+        self.calls = 0
+        self.collapsed = 0
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        task = self._calls.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._calls[key] = task
+            task.add_done_callback(lambda done: self._finish(key, done))
+            self.calls += 1
+        else:
+            self.collapsed += 1
+        return await asyncio.shield(task)
+
+    def _finish(self, key: Hashable, task: asyncio.Task):
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        # Mark the exception as retrieved in case every waiter was cancelled
+        if not task.cancelled():
+            task.exception()
+
+    def stats(self) -> dict:
+        total = self.calls + self.collapsed
+        return {
+            "in_flight": len(self._calls),
+            "upstream_calls": self.calls,
+            "collapsed": self.collapsed,
+            "collapse_ratio": round(self.collapsed / total, 4) if total else 0.0,
+        }
+
+
+class Exclusive:
+    """
+    A single-flight result that only one waiter can use, such as an open
+    stream. The first waiter to claim it gets the value; the others get None
+    and make their own call. If nobody claims it within `claim_timeout`
+    seconds (every waiter was cancelled), `release` is called on the value.
+    """
+
+    def __init__(self, value: Any, release: Callable[[Any], Awaitable[None]], claim_timeout: float = 1.0):
+        self.value = value
+        self._release = release
+        self._claimed = False
+        self._timer = asyncio.get_running_loop().call_later(claim_timeout, self._expire)
+        self._releasing: Optional[asyncio.Future] = None
+
+    def claim(self) -> Any:
+        if self._claimed:
+            return None
+        self._claimed = True
+        self._timer.cancel()
+        return self.value
+
+    def _expire(self):
+        if not self._claimed:
+            self._claimed = True
+            self._releasing = asyncio.ensure_future(self._release(self.value))
@@ -0,0 +1,145 @@
+import logging
+from typing import Dict, Iterable, Optional, Tuple
+
+import httpx
+
+from gateway_core.lanes import INTERACTIVE, Lane
+from gateway_core.settings import setting
+
+logger = logging.getLogger(__name__)
+
+
+class UpstreamSettings:
+    """
+    Connection pool and timeout settings shared by every upstream client.
+    Each value can be overridden through the environment.
+    """
+
+    def __init__(self):
+        self.max_connections = setting("GATEWAY_MAX_CONNECTIONS", default=100, cast=int)
+        self.max_keepalive_connections = setting("GATEWAY_MAX_KEEPALIVE_CONNECTIONS", default=20, cast=int)
+        self.keepalive_expiry = setting("GATEWAY_KEEPALIVE_EXPIRY", default=30.0, cast=float)
+        self.http2 = setting("GATEWAY_HTTP2", default=False, cast=bool)
+        self.connect_timeout = setting("GATEWAY_CONNECT_TIMEOUT", default=5.0, cast=float)
+        self.read_timeout = setting("GATEWAY_READ_TIMEOUT", default=60.0, cast=float)
+        self.write_timeout = setting("GATEWAY_WRITE_TIMEOUT", default=60.0, cast=float)
+        self.pool_timeout = setting("GATEWAY_POOL_TIMEOUT", default=5.0, cast=float)
+
+    def limits(self, lane: Optional[Lane] = None) -> httpx.Limits:
+        return httpx.Limits(
+            max_connections=lane.max_connections if lane else self.max_connections,
+            max_keepalive_connections=lane.max_keepalive_connections if lane else self.max_keepalive_connections,
+            keepalive_expiry=self.keepalive_expiry,
+        )
+
+    def timeout(self, read: Optional[float] = None) -> httpx.Timeout:
+        """Builds the client timeout, optionally overriding the read/write budget for one route."""
+        return httpx.Timeout(
+            connect=self.connect_timeout,
+            read=read if read is not None else self.read_timeout,
+            write=read if read is not None else self.write_timeout,
+            pool=self.pool_timeout,
+        )
+
+
+class UpstreamStats:
+    def __init__(self):
+        self.requests = 0
+        self.in_flight = 0
+        self.errors = 0
+
+
+class UpstreamClients:
+    """
+    Holds one long-lived httpx.AsyncClient per upstream service so that
+    connections are kept alive and reused across proxied requests. With
+    priority lanes there is one client per (upstream, lane), each with the
+    lane's own connection limits, so bulk uploads never hold the
+    connections interactive requests need.
+    """
+
+    def __init__(
+        self,
+        names: Iterable[str],
+        settings: Optional[UpstreamSettings] = None,
+        lanes: Optional[Dict[str, Lane]] = None,
+    ):
+        self.names = list(names)
+        self.settings = settings or UpstreamSettings()
+        self.lanes: Dict[str, Optional[Lane]] = dict(lanes) if lanes else {INTERACTIVE: None}
+        self._clients: Dict[Tuple[str, str], httpx.AsyncClient] = {}
+        self._stats: Dict[str, UpstreamStats] = {name: UpstreamStats() for name in self.names}
+
+    async def start(self):
+        for name in self.names:
+            for lane_name, lane in self.lanes.items():
+                self._clients[(name, lane_name)] = self._create_client(lane)
+        logger.info(f"[UpstreamClients] Started {len(self._clients)} upstream clients (http2={self.settings.http2})")
+
+    async def close(self):
+        clients, self._clients = self._clients, {}
+        for (name, lane), client in clients.items():
+            try:
+                await client.aclose()
+            except Exception as e:
+                logger.error(f"[UpstreamClients] Failed to close {lane} client for {name}: {e}")
+        logger.info("[UpstreamClients] All upstream clients closed")
+
+    def _create_client(self, lane: Optional[Lane] = None) -> httpx.AsyncClient:
+        return httpx.AsyncClient(
+            limits=self.settings.limits(lane),
+            timeout=self.settings.timeout(),
+            http2=self.settings.http2,
+        )
+
+    def get(self, name: str, lane: str = INTERACTIVE) -> httpx.AsyncClient:
+        client = self._clients.get((name, lane))
+        if client is None:
+            raise RuntimeError(f"Upstream client for '{name}' ({lane}) is not started.")
+        return client
+
+    def request_started(self, name: str):
+        stats = self._stats[name]
+        stats.requests += 1
+        stats.in_flight += 1
+
+    def request_finished(self, name: str, failed: bool = False):
+        stats = self._stats[name]
+        stats.in_flight -= 1
+        if failed:
+            stats.errors += 1
+
+    def stats(self) -> dict:
+        result = {}
+        for name in self.names:
+            stats = self._stats[name]
+            result[name] = {
+                "requests": stats.requests,
+                "in_flight": stats.in_flight,
+                "errors": stats.errors,
+                "pools": {
+                    lane_name: self._pool_stats(self._clients.get((name, lane_name)), lane)
+                    for lane_name, lane in self.lanes.items()
+                },
+            }
+        return result
+
+    def _pool_stats(self, client: Optional[httpx.AsyncClient], lane: Optional[Lane] = None) -> dict:
+        limits = {
+            "max_connections": lane.max_connections if lane else self.settings.max_connections,
+            "max_keepalive_connections": lane.max_keepalive_connections if lane else self.settings.max_keepalive_connections,
+        }
+        if client is None:
+            return {"started": False, **limits}
+        # httpx does not expose pool state publicly, so read it from the
+        # underlying httpcore pool when it is available.
+        pool = getattr(getattr(client, "_transport", None), "_pool", None)
+        connections = list(getattr(pool, "connections", []) or [])
+        idle = sum(1 for conn in connections if getattr(conn, "is_idle", lambda: False)())
+        return {
+            "started": True,
+            "connections": len(connections),
+            "idle": idle,
+            "active": len(connections) - idle,
+            **limits,
+        }
@@ -0,0 +1,73 @@
+# Monolith entry point for microBackend
+# Serves every service router from a single FastAPI app, under the same URLs
+# the gateway exposes, without the gateway -> service HTTP hop.
+
+import os
+from decouple import config
+from fastapi import FastAPI
+from fastapi.middleware.cors import CORSMiddleware
+
+from dependencies.azure_blob_service import blob_lifespan
+from dependencies.deadline import install_deadline
+from dependencies.metrics import router as metrics_router
+from admin_reply_service.routers import admin_reply
+from announcement_email_service.routers import announcement_email
+from announcement_service.routers import announcement
+from comparison_document_service.routers import comparison_document
+from otp_service.routers import otp
+from project_service.routers import project
+from support_ticket_service.routers import support_ticket
+from translation_document_service.routers import translation_document
+from user_service.routers import user
+
+# Gateway route prefix for each service router (see SERVICE_MAP in gateway.py)
+SERVICE_ROUTERS = [
+    ("/user", user.router),
+    ("/project", project.router),
+    ("/support_ticket", support_ticket.router),
+    ("/admin_reply", admin_reply.router),
+    ("/otp", otp.router),
+    ("/announcement", announcement.router),
+    ("/announcement_email", announcement_email.router),
+    ("/comparison-document", comparison_document.router),
+    ("/translation-document", translation_document.router),
+]
+
+# Every router shares the one Mongo client from dependencies/db.py, and every
+# service model is imported above, so its lifespan covers all collections. The
+# blob lifespan also closes the Blob Storage clients on shutdown.
+app = FastAPI(title="microBackend Monolith", lifespan=blob_lifespan)
+install_deadline(app)
+
+# CORS configuration
+origins = [
+    "http://localhost:3000",
+    "http://localhost:8000",
+    "http://localhost:5173",
+]
+
+app.add_middleware(
+    CORSMiddleware,
+    allow_origins=origins,
+    allow_credentials=True,
+    allow_methods=["*"],
+    allow_headers=["*"],
+)
+
+for gateway_prefix, router in SERVICE_ROUTERS:
+    # The gateway forwards the full path, so routers whose own prefix does not
+    # already start with the gateway prefix are mounted underneath it.
+    if router.prefix == gateway_prefix or router.prefix.startswith(gateway_prefix + "/"):
+        app.include_router(router)
+    else:
+        app.include_router(router, prefix=gateway_prefix)
+app.include_router(metrics_router)
+
+@app.get("/")
+def root():
+    return {"message": "microBackend Monolith running"}
+
+if __name__ == "__main__":
+    import uvicorn
+    port = int(os.getenv("MONOLITH_PORT") or config("MONOLITH_PORT", default=8000))
+    uvicorn.run("monolith:app", host="0.0.0.0", port=port, reload=True)
@@ -1,7 +1,12 @@
 from fastapi import FastAPI
+from dependencies.db import lifespan
+from dependencies.deadline import install_deadline
+from dependencies.metrics import router as metrics_router
 from otp_service.routers import otp
 
-app = FastAPI(title="OTP Service")
+app = FastAPI(title="OTP Service", lifespan=lifespan)
+install_deadline(app)
+app.include_router(metrics_router)
 app.include_router(otp.router)
 
 @app.get("/")
@@ -1,9 +1,21 @@
 
-from dependencies.db import db
+from pymongo import ASCENDING, IndexModel
+from dependencies.db import get_db, register_indexes
+from dependencies.deadline import bounded_collection
+
+# Unverified sign-ups and OTPs are removed by Mongo once expiresAt has passed
+register_indexes("temp_users", [
+    IndexModel([("email", ASCENDING)], unique=True, name="email_unique"),
+    IndexModel([("expiresAt", ASCENDING)], expireAfterSeconds=0, name="expiresAt_ttl"),
+], queries=[{"email": "user@example.com"}])
+register_indexes("verifications", [
+    IndexModel([("email", ASCENDING), ("used", ASCENDING)], name="email_used"),
+    IndexModel([("expiresAt", ASCENDING)], expireAfterSeconds=0, name="expiresAt_ttl"),
+], queries=[{"email": "user@example.com", "otp": "123456", "used": False}, {"email": "user@example.com", "used": False}])
 
 def get_temp_user_collection():
-    return db["temp_users"]
+    return bounded_collection(get_db()["temp_users"])
 
 
 def get_verification_collection():
-    return db["verifications"]
+    return bounded_collection(get_db()["verifications"])
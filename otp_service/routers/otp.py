@@ -2,6 +2,8 @@
 
 import logging
 from fastapi import APIRouter, HTTPException, status, Body
+from pymongo.errors import ExecutionTimeout
+from dependencies.deadline import DeadlineExceeded
 from ..schemas.otp import OtpRequest, OtpVerify, TempUser
 from ..services.otp import create_temp_user, verify_otp_and_register, resend_otp, mail_sender_service
 
@@ -24,6 +26,9 @@ async def test_mail_route(
         logger.info(f"[test_mail_route] Mail sent successfully to {to}")
         logger.debug(f"[test_mail_route] Result: {result}")
         return {"message": "Mail sent successfully.", "result": result}
+    except (DeadlineExceeded, ExecutionTimeout):
+        # Answered with 504 by the deadline handlers
+        raise
     except Exception as e:
         logger.error(f"[test_mail_route] Mail sending failed for {to}: {e}")
         raise HTTPException(status_code=500, detail=f"Mail sending failed: {e}")
@@ -36,6 +41,9 @@ async def send_otp_route(request: TempUser):
         await create_temp_user(request.model_dump())
         logger.info(f"[send_otp_route] OTP sent to {request.email}")
         return {"message": "OTP sent to your email."}
+    except (DeadlineExceeded, ExecutionTimeout):
+        # Answered with 504 by the deadline handlers
+        raise
     except Exception as e:
         logger.error(f"[send_otp_route] Failed to send OTP to {request.email}: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to send OTP: {e}")
@@ -52,6 +60,9 @@ async def verify_otp_route(request: OtpVerify):
         return {"message": "User verified and registered successfully."}
     except HTTPException:
         raise
+    except (DeadlineExceeded, ExecutionTimeout):
+        # Answered with 504 by the deadline handlers
+        raise
     except Exception as e:
         logger.error(f"[verify_otp_route] Unexpected error for {request.email}: {e}")
         raise HTTPException(status_code=500, detail="Failed to verify OTP.")
@@ -71,6 +82,9 @@ async def resend_otp_route(request: OtpRequest):
         return {"message": "New OTP sent to your email"}
     except HTTPException:
         raise
+    except (DeadlineExceeded, ExecutionTimeout):
+        # Answered with 504 by the deadline handlers
+        raise
     except Exception as e:
         logger.error(f"[resend_otp_route] Unexpected error for {request.email}: {e}")
         raise HTTPException(status_code=500, detail="Failed to resend OTP.")
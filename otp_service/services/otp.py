@@ -5,6 +5,7 @@ import string
 from datetime import datetime, timedelta
 from fastapi import HTTPException
 from passlib.context import CryptContext
+from dependencies.deadline import DeadlineExceeded
 from otp_service.models.otp import get_temp_user_collection, get_verification_collection
 from user_service.models.user import get_user_collection
 import os
@@ -35,6 +36,8 @@ async def send_otp(email: str) -> str:
     text = f"Your OTP is: {otp}. It will expire in {OTP_EXPIRY_MINUTES} minutes."
     try:
         await mail_sender_service(to=email, subject=subject, text=text)
+    except DeadlineExceeded:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to send OTP email: {e}")
     return otp
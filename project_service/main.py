@@ -8,9 +8,14 @@ import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
 from fastapi import FastAPI
+from dependencies.db import lifespan
+from dependencies.deadline import install_deadline
+from dependencies.metrics import router as metrics_router
 from project_service.routers import project
 
-app = FastAPI(title="Project Service")
+app = FastAPI(title="Project Service", lifespan=lifespan)
+install_deadline(app)
+app.include_router(metrics_router)
 app.include_router(project.router)
 
 @app.get("/")
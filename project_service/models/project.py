@@ -1,4 +1,17 @@
-from microserviceFullStack.dependencies.db import db
+from bson import ObjectId
+from pymongo import ASCENDING, DESCENDING, IndexModel
+from dependencies.db import get_db, register_indexes
+from dependencies.deadline import bounded_collection
+
+# Project lists are paged newest first by (createdAt, _id)
+register_indexes("projects", [
+    IndexModel([("createdAt", DESCENDING), ("_id", DESCENDING)], name="createdAt_id"),
+    IndexModel([("userId", ASCENDING), ("createdAt", DESCENDING), ("_id", DESCENDING)], name="userId_createdAt_id"),
+    IndexModel(
+        [("userId", ASCENDING), ("serviceType", ASCENDING), ("createdAt", DESCENDING), ("_id", DESCENDING)],
+        name="userId_serviceType_createdAt_id",
+    ),
+], queries=[{"userId": ObjectId()}, {"userId": ObjectId(), "serviceType": "translation"}])
 
 def get_project_collection():
-    return db["projects"]
+    return bounded_collection(get_db()["projects"])
@@ -1,7 +1,7 @@
 
 import logging
-from fastapi import APIRouter
-from project_service.schemas.project import ProjectCreate, ProjectOut, ProjectUpdate
+from fastapi import APIRouter, Depends, Query
+from project_service.schemas.project import ProjectCreate, ProjectUpdate
 from project_service.services.project import (
     create_project,
     get_projects,
@@ -9,9 +9,11 @@ from project_service.services.project import (
     get_project_details_by_id,
     delete_project,
     update_project_details,
-    get_projects_by_user_id_and_service
+    get_projects_by_user_id_and_service,
+    get_project_workspace
 )
-from typing import List
+from dependencies.pagination import DEFAULT_LIMIT, MAX_LIMIT, PageParams
+from dependencies.serialization import json_response
 
 logger = logging.getLogger(__name__)
 
@@ -21,23 +23,23 @@ router = APIRouter(
 )
 
 @router.get("/user-service", response_model=dict)
-async def get_projects_by_user_and_service(user_id: str, service_type: str):
+async def get_projects_by_user_and_service(user_id: str, service_type: str, page: PageParams = Depends()):
     logger.debug(f"[get_projects_by_user_and_service] Called with user_id={user_id}, service_type={service_type}")
     try:
-        result = await get_projects_by_user_id_and_service(user_id, service_type)
-        logger.info(f"[get_projects_by_user_and_service] Retrieved {len(result) if result else 0} projects")
-        return {"message": "Projects retrieved by user and service", "data": result}
+        result = await get_projects_by_user_id_and_service(user_id, service_type, page)
+        logger.info(f"[get_projects_by_user_and_service] Retrieved {len(result.items)} projects")
+        return json_response({"message": "Projects retrieved by user and service", "data": result.items, "next_cursor": result.next_cursor})
     except Exception as e:
         logger.error(f"[get_projects_by_user_and_service] Failed: {e}")
         raise
 
 @router.get("/", response_model=dict)
-async def get_all_projects():
+async def get_all_projects(page: PageParams = Depends()):
     logger.debug("[get_all_projects] Called")
     try:
-        result = await get_projects()
-        logger.info(f"[get_all_projects] Retrieved {len(result) if result else 0} projects")
-        return {"message": "Projects retrieved successfully", "data": result}
+        result = await get_projects(page)
+        logger.info(f"[get_all_projects] Retrieved {len(result.items)} projects")
+        return json_response({"message": "Projects retrieved successfully", "data": result.items, "next_cursor": result.next_cursor})
     except Exception as e:
         logger.error(f"[get_all_projects] Failed: {e}")
         raise
@@ -79,12 +81,12 @@ async def create_annotation_project(project: ProjectCreate):
         raise
 
 @router.get("/user/{user_id}", response_model=dict)
-async def get_projects_by_user(user_id: str):
+async def get_projects_by_user(user_id: str, page: PageParams = Depends()):
     logger.debug(f"[get_projects_by_user] Called with user_id={user_id}")
     try:
-        result = await get_projects_by_user_id(user_id)
-        logger.info(f"[get_projects_by_user] Retrieved {len(result) if result else 0} projects for user {user_id}")
-        return {"message": "Projects retrieved by userID", "data": result}
+        result = await get_projects_by_user_id(user_id, page)
+        logger.info(f"[get_projects_by_user] Retrieved {len(result.items)} projects for user {user_id}")
+        return json_response({"message": "Projects retrieved by userID", "data": result.items, "next_cursor": result.next_cursor})
     except Exception as e:
         logger.error(f"[get_projects_by_user] Failed for user {user_id}: {e}")
         raise
@@ -100,6 +102,17 @@ async def get_project_by_id(project_id: str):
         logger.error(f"[get_project_by_id] Failed for id {project_id}: {e}")
         raise
 
+@router.get("/workspace/{project_id}", response_model=dict)
+async def get_workspace(project_id: str, limit: int = Query(DEFAULT_LIMIT, ge=1, le=MAX_LIMIT, description="Documents to return per list")):
+    logger.debug(f"[get_workspace] Called with project_id={project_id}, limit={limit}")
+    try:
+        result = await get_project_workspace(project_id, limit)
+        logger.info(f"[get_workspace] Workspace retrieved for id={project_id}")
+        return json_response({"message": "Project workspace retrieved", "data": result})
+    except Exception as e:
+        logger.error(f"[get_workspace] Failed for id {project_id}: {e}")
+        raise
+
 @router.put("/{project_id}", response_model=dict)
 async def update_project(project_id: str, project: ProjectUpdate):
     logger.debug(f"[update_project] Called with project_id={project_id}, project={project}")
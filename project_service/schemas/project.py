@@ -2,7 +2,7 @@ from bson import ObjectId
 from pydantic_core import core_schema
 from pydantic import GetCoreSchemaHandler
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import List, Optional
 from datetime import datetime
 
 class PyObjectId(ObjectId):
@@ -40,3 +40,45 @@ class ProjectOut(ProjectBase):
 class ProjectUpdate(BaseModel):
     name: Optional[str]
     description: Optional[str]
+
+# Workspace view of a project's documents. These mirror the list summaries of
+# the translation and comparison services without importing them, so the
+# project service can be deployed on its own.
+class WorkspaceTranslationDocument(BaseModel):
+    id: str = Field(..., alias="_id")
+    name: Optional[str] = None
+    type: Optional[str] = None
+    isTranslated: Optional[bool] = None
+    originalDocument: Optional[str] = None
+    translatedDocument: Optional[str] = None
+    projectId: Optional[str] = None
+    sourceLanguage: Optional[str] = None
+    targetLanguage: Optional[str] = None
+    userId: Optional[str] = None
+    createdAt: Optional[datetime] = None
+    updatedAt: Optional[datetime] = None
+
+    class Config:
+        populate_by_name = True
+
+class WorkspaceComparisonDocument(BaseModel):
+    """Without comparisonData, which only the comparison service's single-document GET returns."""
+    id: str = Field(..., alias="_id")
+    name: Optional[str] = None
+    type: Optional[str] = None
+    isCompared: Optional[bool] = None
+    model: Optional[str] = None
+    originalDocument: Optional[str] = None
+    modifiedDocument: Optional[str] = None
+    comparedDocument: Optional[str] = None
+    projectId: Optional[str] = None
+    userId: Optional[str] = None
+    createdAt: Optional[datetime] = None
+    updatedAt: Optional[datetime] = None
+
+    class Config:
+        populate_by_name = True
+
+# Stored fields read for each workspace list
+WORKSPACE_TRANSLATION_FIELDS: List[str] = [name for name in WorkspaceTranslationDocument.model_fields if name != "id"]
+WORKSPACE_COMPARISON_FIELDS: List[str] = [name for name in WorkspaceComparisonDocument.model_fields if name != "id"]
@@ -1,23 +1,29 @@
-
-
-def serialize_project(project):
-    project["_id"] = str(project["_id"])
-    if "userId" in project and hasattr(project["userId"], "__str__"):
-        project["userId"] = str(project["userId"])
-    from ..schemas.project import ProjectOut
-    return ProjectOut(**project)
-
 from bson import ObjectId
 from fastapi import HTTPException
 from datetime import datetime
 from project_service.models.project import get_project_collection
-from project_service.schemas.project import ProjectCreate, ProjectUpdate, ProjectOut
+from project_service.schemas.project import (
+    ProjectCreate, ProjectUpdate, ProjectOut, WORKSPACE_COMPARISON_FIELDS, WORKSPACE_TRANSLATION_FIELDS,
+    WorkspaceComparisonDocument, WorkspaceTranslationDocument
+)
+from dependencies.cache import entity_cache
+from dependencies.pagination import PageParams, encode_cursor, paginate
+from dependencies.projection import list_projection
+from dependencies.serialization import serialize_many, serialize_one
+
+def serialize_project(project):
+    return serialize_one(project, ProjectOut)
+
+def serialize_projects(projects):
+    return serialize_many(projects, ProjectOut)
 
-async def get_projects():
+# Project details are read on almost every page; updates write through, deletes invalidate
+project_cache = entity_cache("project")
+
+async def get_projects(page: PageParams):
     projects = get_project_collection()
-    result = []
-    async for project in projects.find({}):
-        result.append(serialize_project(project))
+    result = await paginate(projects, {}, page, sort_key="createdAt")
+    result.items = serialize_projects(result.items)
     return result
 
 async def create_project(project: ProjectCreate):
@@ -33,18 +39,20 @@ async def create_project(project: ProjectCreate):
     from ..schemas.project import ProjectOut
     return ProjectOut(**project_dict)
 
-async def get_projects_by_user_id(user_id: str):
+async def get_projects_by_user_id(user_id: str, page: PageParams):
     projects = get_project_collection()
-    result = []
     try:
         query = {"userId": ObjectId(user_id)}
     except Exception:
         query = {"userId": user_id}
-    async for project in projects.find(query):
-        result.append(serialize_project(project))
+    result = await paginate(projects, query, page, sort_key="createdAt")
+    result.items = serialize_projects(result.items)
     return result
 
 async def get_project_details_by_id(id: str):
+    return await project_cache.get_or_load(id, lambda: load_project(id))
+
+async def load_project(id: str):
     projects = get_project_collection()
     project = await projects.find_one({"_id": ObjectId(id)})
     if not project:
@@ -61,24 +69,95 @@ async def update_project_details(id: str, project: ProjectUpdate):
         return_document=True
     )
     if not updated:
+        await project_cache.invalidate(id)
         raise HTTPException(status_code=404, detail="Project not found")
-    return serialize_project(updated)
+    result = serialize_project(updated)
+    await project_cache.put(id, result)
+    return result
 
 async def delete_project(id: str):
     projects = get_project_collection()
     result = await projects.delete_one({"_id": ObjectId(id)})
+    await project_cache.invalidate(id)
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Project not found")
     return {"message": "Project deleted successfully"}
 
-async def get_projects_by_user_id_and_service(user_id: str, service_type: str):
+async def get_projects_by_user_id_and_service(user_id: str, service_type: str, page: PageParams):
     projects = get_project_collection()
     try:
         query = {"userId": ObjectId(user_id), "serviceType": service_type}
     except Exception:
         query = {"userId": user_id, "serviceType": service_type}
-    cursor = projects.find(query)
-    result = []
-    async for project in cursor:
-        result.append(serialize_project(project))
+    result = await paginate(projects, query, page, sort_key="createdAt")
+    result.items = serialize_projects(result.items)
     return result
+
+def documents_lookup(collection: str, project_id: ObjectId, status_field: str, fields: list, limit: int, as_field: str) -> dict:
+    """
+    $lookup stage that reads the newest `limit` documents of the project (plus
+    one, to tell whether there are more) and counts them by `status_field`.
+    The sub-pipeline is not correlated: it matches the project id as a value,
+    so it starts with the same {"projectId": ...} match and (createdAt, _id)
+    sort as the document services' own list queries.
+    """
+    return {"$lookup": {
+        "from": collection,
+        "pipeline": [
+            {"$match": {"projectId": project_id}},
+            {"$sort": {"createdAt": -1, "_id": -1}},
+            # Drop large fields such as comparisonData before $facet copies the documents
+            {"$project": list_projection(None, fields)},
+            {"$facet": {
+                "items": [{"$limit": limit + 1}],
+                "counts": [{"$group": {"_id": f"${status_field}", "count": {"$sum": 1}}}],
+            }},
+        ],
+        "as": as_field,
+    }}
+
+def documents_section(result: list, model, limit: int, status_name: str) -> dict:
+    section = result[0] if result else {"items": [], "counts": []}
+    items = section["items"]
+    next_cursor = None
+    if len(items) > limit:
+        items = items[:limit]
+        # Continues in the document service's own list endpoint
+        next_cursor = encode_cursor("createdAt", items[-1])
+    total = sum(group["count"] for group in section["counts"])
+    done = sum(group["count"] for group in section["counts"] if group["_id"] is True)
+    return {
+        "items": serialize_many(items, model, exclude_unset=True),
+        "next_cursor": next_cursor,
+        "counts": {"total": total, status_name: done, "pending": total - done},
+    }
+
+async def get_project_workspace(id: str, limit: int):
+    """
+    Returns the project with summaries of its newest translation and
+    comparison documents and their counts by status, read with one aggregation.
+    """
+    projects = get_project_collection()
+    project_id = ObjectId(id)
+    pipeline = [
+        {"$match": {"_id": project_id}},
+        documents_lookup(
+            "translation_documents", project_id, "isTranslated", WORKSPACE_TRANSLATION_FIELDS, limit, "translationDocuments"
+        ),
+        documents_lookup(
+            "comparison_documents", project_id, "isCompared", WORKSPACE_COMPARISON_FIELDS, limit, "comparisonDocuments"
+        ),
+    ]
+    workspaces = await projects.aggregate(pipeline).to_list(length=1)
+    if not workspaces:
+        raise HTTPException(status_code=404, detail="Project not found")
+    workspace = workspaces[0]
+    translation = workspace.pop("translationDocuments")
+    comparison = workspace.pop("comparisonDocuments")
+    project = serialize_project(workspace)
+    await project_cache.put(id, project)
+    return {
+        "project": project,
+        "translationDocuments": documents_section(translation, WorkspaceTranslationDocument, limit, "translated"),
+        "comparisonDocuments": documents_section(comparison, WorkspaceComparisonDocument, limit, "compared"),
+    }
@@ -1,7 +1,12 @@
 from fastapi import FastAPI
+from dependencies.db import lifespan
+from dependencies.deadline import install_deadline
+from dependencies.metrics import router as metrics_router
 # from routers import service_tool  # Uncomment and implement when router is ready
 
-app = FastAPI(title="Service Tool Service")
+app = FastAPI(title="Service Tool Service", lifespan=lifespan)
+install_deadline(app)
+app.include_router(metrics_router)
 # app.include_router(service_tool.router)
 
 @app.get("/")
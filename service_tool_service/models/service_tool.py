@@ -1,4 +1,5 @@
-from microserviceFullStack.dependencies.db import db
+from dependencies.db import get_db
+from dependencies.deadline import bounded_collection
 
 def get_service_tool_collection():
-    return db["service_tools"]
+    return bounded_collection(get_db()["service_tools"])
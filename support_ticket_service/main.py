@@ -1,7 +1,12 @@
 from fastapi import FastAPI
+from dependencies.db import lifespan
+from dependencies.deadline import install_deadline
+from dependencies.metrics import router as metrics_router
 from routers import support_ticket
 
-app = FastAPI(title="Support Ticket Service")
+app = FastAPI(title="Support Ticket Service", lifespan=lifespan)
+install_deadline(app)
+app.include_router(metrics_router)
 app.include_router(support_ticket.router)
 
 @app.get("/")
@@ -1,4 +1,12 @@
-from microserviceFullStack.dependencies.db import db
+from pymongo import ASCENDING, DESCENDING, IndexModel
+from dependencies.db import get_db, register_indexes
+from dependencies.deadline import bounded_collection
+
+# Ticket lists are paged newest first by (created_at, _id)
+register_indexes("supporttickets", [
+    IndexModel([("created_at", DESCENDING), ("_id", DESCENDING)], name="created_at_id"),
+    IndexModel([("status", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)], name="status_created_at_id"),
+], queries=[{"status": "open"}])
 
 def get_support_ticket_collection():
-    return db["supporttickets"]
+    return bounded_collection(get_db()["supporttickets"])
@@ -1,7 +1,7 @@
 
 import logging
-from fastapi import APIRouter
-from ..schemas.support_ticket import SupportTicketCreate, SupportTicketOut, SupportTicketUpdate
+from fastapi import APIRouter, Depends
+from ..schemas.support_ticket import SupportTicketCreate, SupportTicketUpdate
 from ..services.support_ticket import (
     create_support_ticket,
     get_support_tickets,
@@ -10,6 +10,8 @@ from ..services.support_ticket import (
     delete_support_ticket,
     get_tickets_by_status
 )
+from dependencies.pagination import PageParams
+from dependencies.serialization import json_response
 
 logger = logging.getLogger(__name__)
 
@@ -30,12 +32,12 @@ async def create_support_ticket_route(ticket: SupportTicketCreate):
         raise
 
 @router.get("/", response_model=dict)
-async def get_support_tickets_route():
+async def get_support_tickets_route(page: PageParams = Depends()):
     logger.debug("[get_support_tickets_route] Called")
     try:
-        result = await get_support_tickets()
-        logger.info(f"[get_support_tickets_route] Fetched {len(result) if result else 0} tickets")
-        return {"message": "Support tickets fetched successfully", "data": result}
+        result = await get_support_tickets(page)
+        logger.info(f"[get_support_tickets_route] Fetched {len(result.items)} tickets")
+        return json_response({"message": "Support tickets fetched successfully", "data": result.items, "next_cursor": result.next_cursor})
     except Exception as e:
         logger.error(f"[get_support_tickets_route] Failed to fetch tickets: {e}")
         raise
@@ -74,15 +76,16 @@ async def delete_support_ticket_route(ticket_id: str):
         raise
 
 @router.get("/status/{status}", response_model=dict)
-async def get_tickets_by_status_route(status: str):
+async def get_tickets_by_status_route(status: str, page: PageParams = Depends()):
     logger.debug(f"[get_tickets_by_status_route] Called with status={status}")
     try:
-        result = await get_tickets_by_status(status)
-        logger.info(f"[get_tickets_by_status_route] Fetched {len(result) if result else 0} tickets with status={status}")
-        return {
+        result = await get_tickets_by_status(status, page)
+        logger.info(f"[get_tickets_by_status_route] Fetched {len(result.items)} tickets with status={status}")
+        return json_response({
             "message": f"Support tickets with status '{status}' fetched successfully",
-            "data": result
-        }
+            "data": result.items,
+            "next_cursor": result.next_cursor
+        })
     except Exception as e:
         logger.error(f"[get_tickets_by_status_route] Failed to fetch tickets with status {status}: {e}")
         raise
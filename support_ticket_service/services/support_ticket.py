@@ -1,15 +1,17 @@
-def serialize_ticket(ticket):
-    ticket["id"] = str(ticket["_id"])
-    ticket.pop("_id", None)
-    from ..schemas.support_ticket import SupportTicketOut
-    return SupportTicketOut(**ticket)
-
 from bson import ObjectId
 from fastapi import HTTPException
 from datetime import datetime
 from ..models.support_ticket import get_support_ticket_collection
 from ..schemas.support_ticket import SupportTicketCreate, SupportTicketUpdate, SupportTicketOut
-from ..services.mail_sender import mail_sender_service
+from dependencies.mail_service import send_mail as mail_sender_service
+from dependencies.pagination import PageParams, paginate
+from dependencies.serialization import serialize_many, serialize_one
+
+def serialize_ticket(ticket):
+    return serialize_one(ticket, SupportTicketOut)
+
+def serialize_tickets(tickets):
+    return serialize_many(tickets, SupportTicketOut)
 
 async def create_support_ticket(ticket: SupportTicketCreate):
     tickets = get_support_ticket_collection()
@@ -27,11 +29,10 @@ async def create_support_ticket(ticket: SupportTicketCreate):
     ticket_dict["_id"] = str(result.inserted_id)
     return SupportTicketOut(**ticket_dict)
 
-async def get_support_tickets():
+async def get_support_tickets(page: PageParams):
     tickets = get_support_ticket_collection()
-    result = []
-    async for ticket in tickets.find({}):
-        result.append(serialize_ticket(ticket))
+    result = await paginate(tickets, {}, page, sort_key="created_at")
+    result.items = serialize_tickets(result.items)
     return result
 
 async def get_support_ticket_by_id(ticket_id: str):
@@ -61,9 +62,8 @@ async def delete_support_ticket(ticket_id: str):
         raise HTTPException(status_code=404, detail="Support ticket not found")
     return {"message": "Support ticket deleted successfully"}
 
-async def get_tickets_by_status(status: str):
+async def get_tickets_by_status(status: str, page: PageParams):
     tickets = get_support_ticket_collection()
-    result = []
-    async for ticket in tickets.find({"status": status}):
-        result.append(serialize_ticket(ticket))
+    result = await paginate(tickets, {"status": status}, page, sort_key="created_at")
+    result.items = serialize_tickets(result.items)
     return result
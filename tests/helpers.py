@@ -0,0 +1,27 @@
+"""Request and response builders shared by the gateway tests."""
+import json
+
+from fastapi import Response
+from starlette.requests import Request
+
+
+def json_response(payload: dict, status_code: int = 200, headers=()) -> Response:
+    response = Response(content=json.dumps(payload).encode(), status_code=status_code)
+    response.raw_headers = [(b"content-type", b"application/json"), *headers]
+    return response
+
+
+def make_request(method: str, path: str, headers: dict = None) -> Request:
+    scope = {
+        "type": "http",
+        "method": method,
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": b"",
+        "headers": [(name.lower().encode(), value.encode()) for name, value in (headers or {}).items()],
+    }
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    return Request(scope, receive)
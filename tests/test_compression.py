@@ -0,0 +1,145 @@
+import asyncio
+import gzip
+import json
+
+import pytest
+from starlette.background import BackgroundTask
+from starlette.responses import StreamingResponse
+
+from gateway_core.compression import Compressor, parse_accept_encoding
+from helpers import json_response
+
+
+@pytest.fixture
+def compressor():
+    compressor = Compressor()
+    compressor.enabled = True
+    compressor.min_size = 100
+    return compressor
+
+
+def large_payload() -> dict:
+    return {"items": [{"name": f"document {index}", "isCompared": False} for index in range(50)]}
+
+
+def headers_of(response) -> dict:
+    return {name.decode(): value.decode() for name, value in response.raw_headers}
+
+
+def streamed(chunks, headers=(), background=None):
+    async def body():
+        for chunk in chunks:
+            yield chunk
+
+    response = StreamingResponse(body(), background=background)
+    response.raw_headers = [(b"content-type", b"application/json"), *headers]
+    return response
+
+
+async def read_body(response) -> bytes:
+    return b"".join([chunk async for chunk in response.body_iterator])
+
+
+def test_parse_accept_encoding_q_values():
+    assert parse_accept_encoding("gzip;q=0.5, br, zstd;q=bad") == {"gzip": 0.5, "br": 1.0, "zstd": 0.0}
+
+
+@pytest.mark.parametrize("header, expected", [
+    (None, None),
+    ("", None),
+    ("gzip", "gzip"),
+    ("deflate, gzip;q=0.8", "gzip"),
+    ("*", "gzip"),
+    ("gzip;q=0", None),
+    ("identity", None),
+    ("*;q=0.5, gzip;q=0", None),
+])
+def test_negotiate(compressor, header, expected):
+    # Only gzip, so the result does not depend on the optional codecs installed
+    compressor.codecs = {"gzip": compressor.codecs["gzip"]}
+    assert compressor.negotiate(header) == expected
+
+
+def test_negotiate_prefers_the_highest_q_value(compressor):
+    compressor.codecs = {"zstd": compressor.codecs["gzip"], "gzip": compressor.codecs["gzip"]}
+    assert compressor.negotiate("zstd;q=0.5, gzip") == "gzip"
+    # Ties go to the server's preference order
+    assert compressor.negotiate("gzip, zstd") == "zstd"
+
+
+def test_disabled_compressor_never_negotiates(compressor):
+    compressor.enabled = False
+    assert compressor.negotiate("gzip") is None
+
+
+def test_should_compress_size_threshold_and_type(compressor):
+    json_headers = [(b"content-type", b"application/json")]
+    assert not compressor.should_compress(200, json_headers, 99)
+    assert compressor.should_compress(200, json_headers, 100)
+    # Streamed body of unknown length
+    assert compressor.should_compress(200, json_headers, None)
+    assert not compressor.should_compress(200, [(b"content-type", b"image/png")], 10_000)
+    assert not compressor.should_compress(304, json_headers, 10_000)
+    assert not compressor.should_compress(200, [*json_headers, (b"content-encoding", b"gzip")], 10_000)
+
+
+def test_buffered_response_is_compressed(compressor):
+    response = json_response(large_payload(), headers=[(b"etag", b'"abc"')])
+    encoded = asyncio.run(compressor.compress_response("/r", response, "gzip"))
+    headers = headers_of(encoded)
+    assert headers["content-encoding"] == "gzip"
+    assert headers["vary"] == "Accept-Encoding"
+    assert headers["etag"] == 'W/"abc"'
+    assert int(headers["content-length"]) == len(encoded.body) < len(response.body)
+    assert json.loads(gzip.decompress(encoded.body)) == large_payload()
+    assert compressor.stats()["routes"]["/r"]["responses"] == 1
+
+
+def test_small_response_is_sent_as_is(compressor):
+    response = json_response({"ok": True})
+    assert asyncio.run(compressor.compress_response("/r", response, "gzip")) is response
+    assert "vary" not in headers_of(response)
+
+
+def test_response_without_accepted_encoding_varies(compressor):
+    response = json_response(large_payload())
+    sent = asyncio.run(compressor.compress_response("/r", response, None))
+    assert "content-encoding" not in headers_of(sent)
+    assert headers_of(sent)["vary"] == "Accept-Encoding"
+
+
+def test_streamed_response_is_compressed_incrementally(compressor):
+    closed = []
+
+    async def close():
+        closed.append(True)
+
+    body = json.dumps(large_payload()).encode()
+    chunks = [body[index:index + 64] for index in range(0, len(body), 64)]
+    response = streamed(chunks, headers=[(b"content-length", str(len(body)).encode())], background=BackgroundTask(close))
+    encoded = compressor.compress_stream("/r", response, "gzip")
+
+    headers = headers_of(encoded)
+    assert headers["content-encoding"] == "gzip"
+    assert headers["vary"] == "Accept-Encoding"
+    assert "content-length" not in headers
+    # The upstream is still closed after the body is sent
+    assert encoded.background is response.background
+    compressed = asyncio.run(read_body(encoded))
+    assert gzip.decompress(compressed) == body
+    stats = compressor.stats()["routes"]["/r"]
+    assert stats["bytes_in"] == len(body)
+    assert stats["bytes_out"] == len(compressed)
+
+
+def test_streamed_response_below_declared_threshold_is_untouched(compressor):
+    response = streamed([b"{}"], headers=[(b"content-length", b"2")])
+    assert compressor.compress_stream("/r", response, "gzip") is response
+
+
+def test_streamed_response_without_accepted_encoding_varies(compressor):
+    response = streamed([b"{}"])
+    sent = compressor.compress_stream("/r", response, "br;q=0, gzip;q=0")
+    assert sent is response
+    assert headers_of(sent)["vary"] == "Accept-Encoding"
+    assert asyncio.run(read_body(sent)) == b"{}"
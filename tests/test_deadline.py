@@ -0,0 +1,117 @@
+import asyncio
+import os
+import time
+import warnings
+
+import pytest
+
+# The user service imports the blob module when the Azure SDK is installed
+os.environ.setdefault(
+    "AZURE_STORAGE_CONNECTION_STRING",
+    "DefaultEndpointsProtocol=https;AccountName=test;AccountKey=dGVzdA==;EndpointSuffix=core.windows.net",
+)
+
+from fastapi.testclient import TestClient  # noqa: E402
+from pymongo.errors import ExecutionTimeout  # noqa: E402
+
+from dependencies import deadline  # noqa: E402
+from dependencies.deadline import DeadlineCollection, DeadlineExceeded, bounded  # noqa: E402
+from otp_service.main import app as otp_app  # noqa: E402
+from otp_service.routers import otp as otp_router  # noqa: E402
+from user_service.main import app  # noqa: E402
+
+
+@pytest.mark.parametrize("path, body", [
+    ("/user/api/verify-otp", {"email": "a@example.com", "otp": "123456"}),
+    # A single Body() parameter is sent as the bare value
+    ("/user/api/resend-otp", "a@example.com"),
+])
+def test_exhausted_deadline_is_a_504_not_a_500(path, body):
+    client = TestClient(app)
+    response = client.post(path, json=body, headers={"X-Request-Deadline": str(time.time() - 1)})
+    assert response.status_code == 504
+    assert response.json() == {"detail": "Request deadline exceeded"}
+
+
+@pytest.mark.parametrize("path, body", [
+    ("/api/otp/verify-otp", {"email": "a@example.com", "otp": "123456"}),
+    ("/api/otp/resend-otp", {"email": "a@example.com"}),
+])
+def test_otp_service_answers_an_exhausted_deadline_with_504(path, body):
+    # The first Mongo call gives up before reaching the database
+    client = TestClient(otp_app)
+    response = client.post(path, json=body, headers={"X-Request-Deadline": str(time.time() - 1)})
+    assert response.status_code == 504
+    assert response.json() == {"detail": "Request deadline exceeded"}
+
+
+def test_otp_service_answers_a_mongo_execution_timeout_with_504(monkeypatch):
+    async def slow_resend(email):
+        raise ExecutionTimeout("operation exceeded time limit")
+
+    monkeypatch.setattr(otp_router, "resend_otp", slow_resend)
+    response = TestClient(otp_app).post("/api/otp/resend-otp", json={"email": "a@example.com"})
+    assert response.status_code == 504
+
+
+class RecordingCollection:
+    """Stands in for a Motor collection; a call is enough to start the write."""
+
+    def __init__(self):
+        self.writes = []
+
+    def insert_one(self, document):
+        self.writes.append(document)
+
+        async def write():
+            return document
+
+        return write()
+
+
+def run_past_deadline(scenario):
+    async def expired():
+        deadline._deadline.set(time.monotonic() - 1)
+        return await scenario()
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("error", RuntimeWarning)
+        return asyncio.run(expired())
+
+
+def test_expired_deadline_stops_a_write_before_it_is_issued():
+    collection = RecordingCollection()
+
+    async def scenario():
+        with pytest.raises(DeadlineExceeded):
+            await DeadlineCollection(collection).insert_one({"a": 1})
+
+    run_past_deadline(scenario)
+    assert collection.writes == []
+
+
+def test_bounded_closes_an_awaitable_it_never_starts():
+    started = []
+
+    async def work():
+        started.append(True)
+
+    async def scenario():
+        pending = work()
+        with pytest.raises(DeadlineExceeded):
+            await bounded(pending)
+        # Closed, so it can neither run later nor warn about never being awaited
+        assert pending.cr_frame is None
+
+    run_past_deadline(scenario)
+    assert started == []
+
+
+def test_write_within_the_deadline_is_awaited():
+    collection = RecordingCollection()
+
+    async def scenario():
+        deadline._deadline.set(time.monotonic() + 10)
+        return await DeadlineCollection(collection).insert_one({"a": 1})
+
+    assert asyncio.run(scenario()) == {"a": 1}
@@ -0,0 +1,84 @@
+import asyncio
+
+import pytest
+
+from dependencies.cache import CacheBackend, EntityCache, LocalCacheBackend
+
+
+def new_cache(ttl: float = 60, max_entries: int = 100) -> EntityCache:
+    return EntityCache("project", ttl, backend=LocalCacheBackend(max_entries=max_entries))
+
+
+def test_backend_interface_is_abstract():
+    with pytest.raises(TypeError):
+        CacheBackend()
+
+
+def test_concurrent_misses_share_one_load():
+    cache = new_cache()
+    loads = []
+
+    async def loader():
+        loads.append(1)
+        await asyncio.sleep(0.01)
+        return {"_id": "1"}
+
+    async def scenario():
+        results = await asyncio.gather(*(cache.get_or_load("1", loader) for _ in range(20)))
+        return results, await cache.get_or_load("1", loader)
+
+    results, cached = asyncio.run(scenario())
+    assert len(loads) == 1
+    assert all(result == {"_id": "1"} for result in results) and cached == {"_id": "1"}
+    assert cache.stats()["coalesced"] == 19 and cache.stats()["hits"] == 1
+
+
+def test_load_overtaken_by_invalidate_is_not_stored():
+    cache = new_cache()
+    release = asyncio.Event()
+
+    async def stale_loader():
+        await release.wait()
+        return {"v": 0}
+
+    async def fresh_loader():
+        return {"v": 1}
+
+    async def scenario():
+        pending = asyncio.ensure_future(cache.get_or_load("1", stale_loader))
+        await asyncio.sleep(0)
+        await cache.invalidate("1")
+        release.set()
+        await pending
+        return await cache.get_or_load("1", fresh_loader)
+
+    assert asyncio.run(scenario()) == {"v": 1}
+
+
+def test_put_writes_through_and_errors_are_not_cached():
+    cache = new_cache()
+
+    async def failing_loader():
+        raise LookupError("not found")
+
+    async def scenario():
+        with pytest.raises(LookupError):
+            await cache.get_or_load("1", failing_loader)
+        await cache.put("1", {"v": 2})
+        return await cache.get_or_load("1", failing_loader)
+
+    assert asyncio.run(scenario()) == {"v": 2}
+
+
+def test_local_backend_expires_and_evicts():
+    backend = LocalCacheBackend(max_entries=2)
+
+    async def scenario():
+        await backend.set("a", 1, ttl=60)
+        await backend.set("gone", 2, ttl=0)
+        await backend.set("b", 3, ttl=60)
+        await backend.set("c", 4, ttl=60)
+        return [await backend.get(key) for key in ("a", "gone", "b", "c")]
+
+    assert asyncio.run(scenario()) == [None, None, 3, 4]
+    assert backend.stats()["evictions"] == 2
@@ -0,0 +1,101 @@
+import asyncio
+import json
+
+import gateway
+from gateway_core.cache import ResponseCache, etag_matches
+from helpers import json_response, make_request
+
+
+def new_cache() -> ResponseCache:
+    return ResponseCache(max_entries=10, max_bytes=10_000, max_entry_bytes=1_000)
+
+
+def test_store_and_hit_with_etag_revalidation():
+    cache = new_cache()
+    key = ResponseCache.key("/project", "project/api/", "", None)
+    entry = cache.store(key, json_response({"v": 1}), ttl=60)
+    assert entry is not None and cache.get(key) is entry
+
+    response = cache.respond(entry, if_none_match=entry.etag)
+    assert response.status_code == 304
+    assert cache.respond(entry, if_none_match='"other"').status_code == 200
+    assert etag_matches("W/" + entry.etag, entry.etag)
+
+
+def test_uncacheable_responses_are_not_stored():
+    cache = new_cache()
+    key = ResponseCache.key("/project", "p", "", None)
+    assert cache.store(key, json_response({}, status_code=500), ttl=60) is None
+    assert cache.store(key, json_response({}, headers=[(b"cache-control", b"no-store")]), ttl=60) is None
+    assert cache.store(key, json_response({}, headers=[(b"set-cookie", b"a=b")]), ttl=60) is None
+    assert cache.store(key, json_response({"big": "x" * 2_000}), ttl=60) is None
+    assert cache.store(key, json_response({}), ttl=0) is None
+
+
+def test_key_varies_by_authorization_only_when_asked():
+    assert ResponseCache.key("/r", "p", "", "Bearer a") != ResponseCache.key("/r", "p", "", "Bearer b")
+    assert ResponseCache.key("/r", "p", "", "Bearer a", vary_auth=False) == ResponseCache.key("/r", "p", "", None)
+
+
+def test_invalidate_route_only_drops_that_route():
+    cache = new_cache()
+    project = ResponseCache.key("/project", "p", "", None)
+    user = ResponseCache.key("/user", "u", "", None)
+    cache.store(project, json_response({}), ttl=60)
+    cache.store(user, json_response({}), ttl=60)
+    assert cache.invalidate_route("/project") == 1
+    assert cache.get(project) is None
+    assert cache.get(user) is not None
+
+
+def test_store_from_before_an_invalidation_is_skipped():
+    cache = new_cache()
+    key = ResponseCache.key("/project", "p", "", None)
+    generation = cache.generation("/project")
+    cache.invalidate_route("/project")
+    assert cache.store(key, json_response({"v": 0}), ttl=60, generation=generation) is None
+    assert cache.get(key) is None
+    assert cache.store(key, json_response({"v": 1}), ttl=60, generation=cache.generation("/project")) is not None
+
+
+def test_lru_eviction_by_entries():
+    cache = ResponseCache(max_entries=2, max_bytes=10_000, max_entry_bytes=1_000)
+    keys = [ResponseCache.key("/r", str(i), "", None) for i in range(3)]
+    for key in keys:
+        cache.store(key, json_response({}), ttl=60)
+    assert cache.get(keys[0]) is None
+    assert cache.get(keys[2]) is not None
+    assert cache.evictions == 1
+
+
+def test_get_racing_a_write_is_not_served_stale(monkeypatch):
+    """A GET whose upstream read started before a POST must not be cached after it."""
+    monkeypatch.setattr(gateway, "response_cache", new_cache())
+    route = gateway.routes.match("/project/api/")
+    assert route.options.cacheable
+    state = {"v": 0}
+    read_started = asyncio.Event()
+    release_read = asyncio.Event()
+
+    async def fake_forward(route, full_path, request, streaming=None):
+        if request.method == "GET":
+            value = state["v"]
+            read_started.set()
+            await release_read.wait()
+            return json_response({"v": value})
+        state["v"] += 1
+        return json_response({"ok": True})
+
+    monkeypatch.setattr(gateway, "forward", fake_forward)
+
+    async def scenario():
+        slow_get = asyncio.ensure_future(gateway.dispatch_route(route, "project/api/", make_request("GET", "/project/api/")))
+        await read_started.wait()
+        await gateway.dispatch_route(route, "project/api/", make_request("POST", "/project/api/"))
+        release_read.set()
+        await slow_get
+        return await gateway.dispatch_route(route, "project/api/", make_request("GET", "/project/api/"))
+
+    response = asyncio.run(scenario())
+    assert json.loads(response.body) == {"v": 1}
+    assert dict(response.raw_headers)[b"x-cache"] == b"MISS"
@@ -0,0 +1,110 @@
+import asyncio
+
+import httpx
+import pytest
+from starlette.responses import StreamingResponse
+
+import gateway
+from gateway_core.balancer import UpstreamPool
+from gateway_core.resilience import UpstreamGuards
+from gateway_core.retry import Retrier
+from gateway_core.routing import Route, RouteOptions
+from gateway_core.upstream import UpstreamClients
+from helpers import json_response, make_request
+
+
+@pytest.fixture
+def upstream_state(monkeypatch):
+    """Fresh per-test upstream counters, guards and retrier, with /otp served by two instances."""
+    clients = UpstreamClients(gateway.routes.routes, lanes=gateway.lanes)
+    monkeypatch.setattr(clients, "get", lambda name, lane=None: object())
+    monkeypatch.setattr(gateway, "upstreams", clients)
+
+    guards = UpstreamGuards()
+    for route in gateway.routes.routes.values():
+        guards.add(route.upstream, lanes=gateway.lanes)
+    monkeypatch.setattr(gateway, "guards", guards)
+
+    retrier = Retrier()
+    retrier.backoff = 0.0
+    retrier.hedge_delay = 0.01
+    retrier.hedge_min_delay = 0.0
+    monkeypatch.setattr(gateway, "retrier", retrier)
+
+    pools = dict(gateway.pools)
+    pools["/otp"] = UpstreamPool("/otp", ["http://otp-a", "http://otp-b"])
+    monkeypatch.setattr(gateway, "pools", pools)
+    return clients, guards, retrier
+
+
+def test_hedge_loser_is_not_counted_as_a_failure(monkeypatch, upstream_state):
+    clients, guards, retrier = upstream_state
+    route = Route("/otp", RouteOptions(retries=0, hedge=True))
+    sent = []
+
+    async def fake_send_buffered(client, method, url, headers, params, content, timeout=None):
+        sent.append(url)
+        if len(sent) == 1:
+            await asyncio.sleep(1.0)
+        return json_response({"url": url})
+
+    monkeypatch.setattr(gateway, "send_buffered", fake_send_buffered)
+    response = asyncio.run(gateway.forward(route, "otp/api/status", make_request("GET", "/otp/api/status"), streaming=False))
+
+    assert response.status_code == 200
+    assert len(sent) == 2
+    assert retrier.stats()["routes"]["/otp"]["hedge_wins"] == 1
+    stats = clients.stats()["/otp"]
+    assert stats["errors"] == 0
+    assert stats["in_flight"] == 0
+    # Only the winning attempt reached the breaker
+    assert guards.get("/otp").breaker.stats()["calls_in_window"] == 1
+    assert all(instance.outstanding == 0 for instance in gateway.pools["/otp"].instances)
+
+
+def test_streamed_get_is_retried_when_no_headers_arrived(monkeypatch, upstream_state):
+    clients, guards, retrier = upstream_state
+    route = gateway.routes.match("otp/api/status")
+    sent = []
+
+    async def fake_send_streaming(client, method, url, headers, params, request, timeout=None, on_complete=None):
+        sent.append(url)
+        if len(sent) == 1:
+            raise httpx.ConnectError("connection refused")
+
+        async def body():
+            yield b'{"ok": true}'
+            on_complete()
+
+        return StreamingResponse(body(), media_type="application/json")
+
+    async def scenario():
+        response = await gateway.forward(route, "otp/api/status", make_request("GET", "/otp/api/status"), streaming=True)
+        chunks = [chunk async for chunk in response.body_iterator]
+        return response, b"".join(chunks)
+
+    monkeypatch.setattr(gateway, "send_streaming", fake_send_streaming)
+    response, body = asyncio.run(scenario())
+
+    assert isinstance(response, StreamingResponse)
+    assert body == b'{"ok": true}'
+    # The retry went to the other instance
+    assert len(set(sent)) == 2
+    assert retrier.stats()["routes"]["/otp"]["retries"] == 1
+    stats = clients.stats()["/otp"]
+    assert stats["errors"] == 1
+    assert stats["in_flight"] == 0
+
+
+def test_streamed_response_headers_are_final(monkeypatch, upstream_state):
+    route = gateway.routes.match("otp/api/status")
+    sent = []
+
+    async def fake_send_streaming(client, method, url, headers, params, request, timeout=None, on_complete=None):
+        sent.append(url)
+        return StreamingResponse(iter([b"unavailable"]), status_code=503)
+
+    monkeypatch.setattr(gateway, "send_streaming", fake_send_streaming)
+    response = asyncio.run(gateway.forward(route, "otp/api/status", make_request("GET", "/otp/api/status"), streaming=True))
+    assert response.status_code == 503
+    assert len(sent) == 1
@@ -0,0 +1,43 @@
+from gateway_core.lanes import AUTH, BULK, INTERACTIVE, Lane, default_lanes
+from gateway_core.resilience import UpstreamGuards
+from gateway_core.upstream import UpstreamSettings
+
+
+def test_interactive_lane_defaults_to_gateway_wide_settings(monkeypatch):
+    monkeypatch.setenv("GATEWAY_MAX_CONNECTIONS", "70")
+    monkeypatch.setenv("GATEWAY_MAX_KEEPALIVE_CONNECTIONS", "7")
+    monkeypatch.setenv("GATEWAY_MAX_IN_FLIGHT", "40")
+    monkeypatch.setenv("GATEWAY_MAX_QUEUE", "4")
+    monkeypatch.setenv("GATEWAY_QUEUE_TIMEOUT", "1.5")
+    lane = Lane(INTERACTIVE)
+    assert (lane.max_connections, lane.max_keepalive_connections) == (70, 7)
+    assert (lane.max_in_flight, lane.max_queue, lane.queue_timeout) == (40, 4, 1.5)
+
+    limits = UpstreamSettings().limits(lane)
+    assert (limits.max_connections, limits.max_keepalive_connections) == (70, 7)
+
+
+def test_lane_settings_override_gateway_wide_settings(monkeypatch):
+    monkeypatch.setenv("GATEWAY_MAX_IN_FLIGHT", "40")
+    monkeypatch.setenv("GATEWAY_LANE_INTERACTIVE_MAX_IN_FLIGHT", "30")
+    assert Lane(INTERACTIVE).max_in_flight == 30
+    # Other lanes keep their own defaults
+    assert Lane(BULK).max_in_flight == 10
+
+
+def test_guards_use_each_lanes_budget(monkeypatch):
+    monkeypatch.setenv("GATEWAY_LANE_INTERACTIVE_MAX_IN_FLIGHT", "30")
+    monkeypatch.setenv("GATEWAY_LANE_INTERACTIVE_MAX_QUEUE", "3")
+    monkeypatch.setenv("GATEWAY_LANE_INTERACTIVE_QUEUE_TIMEOUT", "2")
+    guards = UpstreamGuards()
+    guards.add("/user", lanes=default_lanes())
+    guards.add("/comparison-document", max_in_flight=20, max_queue=10, lanes=default_lanes())
+
+    interactive = guards.get("/user", INTERACTIVE).limiter
+    assert (interactive.max_in_flight, interactive.max_queue, interactive.queue_timeout) == (30, 3, 2.0)
+    assert guards.get("/user", AUTH).limiter.max_in_flight == 20
+    # Route options still override the interactive lane
+    routed = guards.get("/comparison-document", INTERACTIVE).limiter
+    assert (routed.max_in_flight, routed.max_queue) == (20, 10)
+    # Every lane of an upstream shares one breaker
+    assert guards.get("/user", BULK).breaker is guards.get("/user", INTERACTIVE).breaker
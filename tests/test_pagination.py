@@ -0,0 +1,139 @@
+import asyncio
+
+import pytest
+from bson import ObjectId
+from fastapi import HTTPException
+from pymongo import ASCENDING, DESCENDING
+
+from dependencies.pagination import PageParams, after_filter, decode_cursor, encode_cursor, paginate
+
+
+def matches(document: dict, query: dict) -> bool:
+    """The subset of Mongo matching that after_filter produces."""
+    for field, condition in query.items():
+        if field == "$or":
+            if not any(matches(document, part) for part in condition):
+                return False
+            continue
+        if field == "$and":
+            if not all(matches(document, part) for part in condition):
+                return False
+            continue
+        value = document.get(field)
+        if not isinstance(condition, dict):
+            if value != condition:
+                return False
+            continue
+        for op, operand in condition.items():
+            if op == "$ne" and value == operand:
+                return False
+            # Range operators never match a missing or null field
+            if op in ("$lt", "$gt") and (value is None or (value < operand if op == "$gt" else value > operand)
+                                         or value == operand):
+                return False
+    return True
+
+
+def sort_position(sort_key: str, document: dict) -> tuple:
+    # Mongo sorts missing and null below every value
+    value = document.get(sort_key)
+    return (value is not None, value if value is not None else 0, document["_id"])
+
+
+class FakeCursor:
+    def __init__(self, documents):
+        self.documents = documents
+
+    def sort(self, sort):
+        (key, direction), *_ = sort
+        self.documents.sort(key=lambda document: sort_position(key, document), reverse=direction == DESCENDING)
+        return self
+
+    def limit(self, limit):
+        self.documents = self.documents[:limit]
+        return self
+
+    async def to_list(self, length):
+        return self.documents[:length]
+
+
+class FakeCollection:
+    def __init__(self, documents):
+        self.documents = documents
+
+    def find(self, query, projection=None):
+        found = [dict(document) for document in self.documents if matches(document, query)]
+        if projection:
+            kept = {field for field, included in projection.items() if included} | {"_id"}
+            found = [{field: value for field, value in document.items() if field in kept} for document in found]
+        return FakeCursor(found)
+
+
+def documents_with_ties_and_nulls():
+    ids = [ObjectId() for _ in range(8)]
+    ranks = [3, 1, 3, None, 2, None, 3, 1]
+    documents = [{"_id": _id, "rank": rank, "name": f"d{index}"} for index, (_id, rank) in enumerate(zip(ids, ranks))]
+    # One document without the field at all
+    documents.append({"_id": ObjectId(), "name": "missing"})
+    return documents
+
+
+def read_all(documents, sort_key, direction, limit):
+    collection = FakeCollection(documents)
+    seen, after = [], None
+    for _ in range(len(documents) + 1):
+        page = asyncio.run(paginate(collection, {}, PageParams(limit=limit, after=after), sort_key, direction))
+        seen.extend(document["_id"] for document in page.items)
+        after = page.next_cursor
+        if after is None:
+            break
+    return seen
+
+
+@pytest.mark.parametrize("direction", [ASCENDING, DESCENDING])
+@pytest.mark.parametrize("limit", [1, 2, 3])
+def test_pages_cover_every_document_once_in_order(direction, limit):
+    documents = documents_with_ties_and_nulls()
+    expected = [
+        document["_id"]
+        for document in sorted(documents, key=lambda document: sort_position("rank", document), reverse=direction == DESCENDING)
+    ]
+    assert read_all(documents, "rank", direction, limit) == expected
+
+
+def test_id_sort_only_compares_ids():
+    last_id = ObjectId()
+    assert after_filter("_id", DESCENDING, last_id, last_id) == {"_id": {"$lt": last_id}}
+    assert after_filter("_id", ASCENDING, last_id, last_id) == {"_id": {"$gt": last_id}}
+
+
+def test_null_position_descending_only_continues_within_nulls():
+    last_id = ObjectId()
+    assert after_filter("rank", DESCENDING, None, last_id) == {"rank": None, "_id": {"$lt": last_id}}
+
+
+def test_cursor_round_trip():
+    document = {"_id": ObjectId(), "createdAt": None}
+    cursor = encode_cursor("createdAt", document)
+    assert "=" not in cursor
+    assert decode_cursor("createdAt", cursor) == (None, document["_id"])
+
+
+@pytest.mark.parametrize("cursor", ["not-a-cursor", "", "e30"])
+def test_invalid_cursor_is_a_400(cursor):
+    with pytest.raises(HTTPException) as error:
+        decode_cursor("createdAt", cursor)
+    assert error.value.status_code == 400
+
+
+def test_cursor_from_another_listing_is_a_400():
+    cursor = encode_cursor("name", {"_id": ObjectId(), "name": "a"})
+    with pytest.raises(HTTPException):
+        decode_cursor("createdAt", cursor)
+
+
+def test_projection_keeps_and_then_drops_the_sort_key():
+    documents = [{"_id": ObjectId(), "rank": rank, "name": str(rank)} for rank in range(3)]
+    page = asyncio.run(paginate(FakeCollection(documents), {}, PageParams(limit=2, after=None), "rank", projection={"name": 1}))
+    assert all("rank" not in item for item in page.items)
+    assert decode_cursor("rank", page.next_cursor)[0] == 1
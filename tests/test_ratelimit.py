@@ -0,0 +1,84 @@
+import asyncio
+
+import pytest
+
+from gateway_core.ratelimit import LocalRateLimitBackend, RateLimitBackend, RateLimiter, RateLimitRule
+from helpers import make_request
+
+
+def test_backend_interface_is_abstract():
+    with pytest.raises(TypeError):
+        RateLimitBackend()
+
+
+def test_bucket_allows_burst_then_refills():
+    backend = LocalRateLimitBackend(shards=2)
+    rule = RateLimitRule(rate=6, per=60.0, burst=3)  # one token every 10 seconds
+    decisions = [backend.take_now("k", rule, 1.0, now=0.0) for _ in range(4)]
+    assert [decision.allowed for decision in decisions] == [True, True, True, False]
+    assert decisions[2].remaining == 0
+    assert decisions[3].retry_after == pytest.approx(10.0)
+    assert decisions[3].headers()["Retry-After"] == "10"
+
+    assert not backend.take_now("k", rule, 1.0, now=9.0).allowed
+    refilled = backend.take_now("k", rule, 1.0, now=10.5)
+    assert refilled.allowed
+    # Never refills past the burst
+    assert backend.take_now("k", rule, 1.0, now=1000.0).remaining == pytest.approx(2.0)
+
+
+def test_buckets_are_per_key():
+    backend = LocalRateLimitBackend()
+    rule = RateLimitRule(rate=1, per=60.0, burst=1)
+    assert backend.take_now("a", rule, 1.0, now=0.0).allowed
+    assert not backend.take_now("a", rule, 1.0, now=0.0).allowed
+    assert backend.take_now("b", rule, 1.0, now=0.0).allowed
+
+
+def test_idle_buckets_are_evicted_per_shard():
+    backend = LocalRateLimitBackend(shards=1, max_keys=2)
+    rule = RateLimitRule(rate=1, per=60.0, burst=1)
+    for key in ("a", "b", "c"):
+        backend.take_now(key, rule, 1.0, now=0.0)
+    assert backend.stats()["buckets"] == 2
+    # "a" was evicted, so it starts with a full bucket again
+    assert backend.take_now("a", rule, 1.0, now=0.0).allowed
+
+
+def test_limiter_applies_the_most_specific_rule_and_methods():
+    limiter = RateLimiter(
+        {"/otp": {"rate": 1, "per": 60.0, "methods": ["POST"]}, "/user/api/resend-otp": {"rate": 1, "per": 60.0}},
+        identify=lambda authorization: None,
+    )
+    limiter.enabled = True
+
+    async def scenario():
+        get = await limiter.check("otp/api/send", make_request("GET", "/otp/api/send"))
+        first = await limiter.check("otp/api/send", make_request("POST", "/otp/api/send"))
+        second = await limiter.check("otp/api/send", make_request("POST", "/otp/api/send"))
+        other = await limiter.check("user/api/resend-otp", make_request("POST", "/user/api/resend-otp"))
+        unlimited = await limiter.check("project/api/", make_request("POST", "/project/api/"))
+        return get, first, second, other, unlimited
+
+    get, first, second, other, unlimited = asyncio.run(scenario())
+    assert get is None and unlimited is None
+    assert first.allowed and not second.allowed
+    assert other.allowed
+    assert limiter.stats()["limited"] == {"/otp": 1}
+
+
+def test_limiter_keys_by_user_when_identified():
+    limiter = RateLimiter({}, identify=lambda authorization: {"user_id": "u1"} if authorization else None)
+    assert limiter.client_key(make_request("GET", "/", {"Authorization": "Bearer t"})) == "user:u1"
+    assert limiter.client_key(make_request("GET", "/")).startswith("ip:")
+
+
+def test_backend_failure_lets_requests_through():
+    class BrokenBackend(RateLimitBackend):
+        async def take(self, key, rule, cost=1.0):
+            raise ConnectionError("store down")
+
+    limiter = RateLimiter({"/otp": {"rate": 1}}, identify=lambda authorization: None)
+    limiter.enabled = True
+    limiter.backend = BrokenBackend()
+    assert asyncio.run(limiter.check("otp/x", make_request("POST", "/otp/x"))) is None
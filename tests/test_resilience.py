@@ -0,0 +1,184 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from gateway_core import resilience
+from gateway_core.resilience import (
+    CLOSED, HALF_OPEN, OPEN, CircuitBreaker, ConcurrencyLimiter, UpstreamGuard, UpstreamRejected
+)
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(resilience, "time", SimpleNamespace(monotonic=clock))
+    return clock
+
+
+def make_breaker(**overrides):
+    options = dict(window=10, min_calls=4, failure_rate=0.5, slow_call_seconds=1.0, open_seconds=30.0, half_open_calls=2)
+    options.update(overrides)
+    return CircuitBreaker(**options)
+
+
+def test_breaker_opens_at_failure_rate_after_min_calls(clock):
+    breaker = make_breaker()
+    for success in (False, False, True):
+        breaker.record(success, 0.1)
+    # 2 of 3 failed, but fewer than min_calls were seen
+    assert breaker.state == CLOSED
+    breaker.record(True, 0.1)
+    assert breaker.state == OPEN
+    assert breaker.times_opened == 1
+
+    with pytest.raises(UpstreamRejected) as rejected:
+        breaker.before_call()
+    assert rejected.value.retry_after == pytest.approx(30.0)
+    assert breaker.rejected == 1
+
+
+def test_slow_calls_count_as_failures(clock):
+    breaker = make_breaker()
+    for _ in range(4):
+        breaker.record(True, 1.5)
+    assert breaker.state == OPEN
+
+
+def test_half_open_probes_close_the_breaker(clock):
+    breaker = make_breaker()
+    for _ in range(4):
+        breaker.record(False, 0.1)
+    clock.now += 31
+    breaker.before_call()
+    assert breaker.state == HALF_OPEN
+    breaker.before_call()
+    # Only half_open_calls probes are let through
+    with pytest.raises(UpstreamRejected):
+        breaker.before_call()
+
+    breaker.record(True, 0.1)
+    assert breaker.state == HALF_OPEN
+    breaker.record(True, 0.1)
+    assert breaker.state == CLOSED
+    assert breaker.stats()["calls_in_window"] == 0
+
+
+def test_failed_probe_reopens_the_breaker(clock):
+    breaker = make_breaker()
+    for _ in range(4):
+        breaker.record(False, 0.1)
+    clock.now += 31
+    breaker.before_call()
+    breaker.record(False, 0.1)
+    assert breaker.state == OPEN
+    assert breaker.times_opened == 2
+    with pytest.raises(UpstreamRejected):
+        breaker.before_call()
+
+
+def test_lost_probes_do_not_keep_the_breaker_half_open(clock):
+    breaker = make_breaker()
+    for _ in range(4):
+        breaker.record(False, 0.1)
+    clock.now += 31
+    breaker.before_call()
+    breaker.before_call()
+    with pytest.raises(UpstreamRejected):
+        breaker.before_call()
+    # Neither probe ever reported back
+    clock.now += 31
+    breaker.before_call()
+    assert breaker.state == HALF_OPEN
+
+
+def test_abandoned_call_frees_its_probe_slot(clock):
+    breaker = make_breaker(half_open_calls=1)
+    for _ in range(4):
+        breaker.record(False, 0.1)
+    clock.now += 31
+    breaker.before_call()
+    breaker.call_abandoned()
+    breaker.before_call()
+    assert breaker.state == HALF_OPEN
+
+
+def test_limiter_queues_then_sheds():
+    async def scenario():
+        limiter = ConcurrencyLimiter(max_in_flight=1, max_queue=1, queue_timeout=1.0)
+        await limiter.acquire()
+        waiter = asyncio.ensure_future(limiter.acquire())
+        await asyncio.sleep(0)
+        assert limiter.waiting == 1
+        with pytest.raises(UpstreamRejected):
+            await limiter.acquire()
+        assert limiter.shed == 1
+
+        limiter.release()
+        await waiter
+        assert limiter.stats()["in_flight"] == 1
+        assert limiter.stats()["waiting"] == 0
+
+    asyncio.run(scenario())
+
+
+def test_limiter_times_out_waiters():
+    async def scenario():
+        limiter = ConcurrencyLimiter(max_in_flight=1, max_queue=1, queue_timeout=0.01)
+        await limiter.acquire()
+        with pytest.raises(UpstreamRejected) as rejected:
+            await limiter.acquire()
+        assert rejected.value.reason == "Timed out waiting for an upstream slot"
+        assert limiter.timed_out == 1
+        assert limiter.waiting == 0
+
+    asyncio.run(scenario())
+
+
+def test_timed_out_and_cancelled_waiters_leave_every_slot_usable():
+    async def scenario():
+        limiter = ConcurrencyLimiter(max_in_flight=1, max_queue=2, queue_timeout=0.01)
+        await limiter.acquire()
+        with pytest.raises(UpstreamRejected):
+            await limiter.acquire()
+
+        # Woken by the release, but cancelled before it could resume
+        waiter = asyncio.ensure_future(limiter.acquire())
+        await asyncio.sleep(0)
+        limiter.release()
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+
+        assert limiter.in_flight == 0
+        assert limiter.waiting == 0
+        await asyncio.wait_for(limiter.acquire(), timeout=1.0)
+        assert limiter.in_flight == 1
+
+    asyncio.run(scenario())
+
+
+def test_guard_frees_probe_when_limiter_rejects(clock):
+    async def scenario():
+        breaker = make_breaker(half_open_calls=1)
+        for _ in range(4):
+            breaker.record(False, 0.1)
+        clock.now += 31
+        guard = UpstreamGuard(ConcurrencyLimiter(max_in_flight=1, max_queue=0, queue_timeout=1.0), breaker)
+        await guard.limiter.acquire()
+        with pytest.raises(UpstreamRejected):
+            await guard.enter()
+        guard.release()
+        # The shed call did not use up the only probe
+        await guard.enter()
+        assert breaker.state == HALF_OPEN
+
+    asyncio.run(scenario())
@@ -0,0 +1,109 @@
+import asyncio
+import json
+
+from gateway_core.retry import Retrier, RetryBudget
+from helpers import json_response
+
+
+def make_retrier(**overrides):
+    retrier = Retrier()
+    retrier.max_retries = 2
+    retrier.backoff = 0.0
+    retrier.hedge = False
+    retrier.hedge_delay = 0.01
+    retrier.hedge_min_delay = 0.0
+    for name, value in overrides.items():
+        setattr(retrier, name, value)
+    return retrier
+
+
+def scripted(*outcomes, delays=()):
+    """An attempt that answers with the given (status, retryable) pairs in turn."""
+    calls = []
+
+    async def attempt(tried):
+        number = len(calls)
+        calls.append(number)
+        tried.append(number)
+        if number < len(delays):
+            await asyncio.sleep(delays[number])
+        status, retryable = outcomes[min(number, len(outcomes) - 1)]
+        return json_response({"attempt": number}, status_code=status), retryable
+
+    return attempt, calls
+
+
+def test_retries_until_an_attempt_succeeds():
+    retrier = make_retrier()
+    attempt, calls = scripted((503, True), (503, True), (200, False))
+    response = asyncio.run(retrier.run("svc", attempt))
+    assert response.status_code == 200
+    assert len(calls) == 3
+    stats = retrier.stats()["routes"]["svc"]
+    assert stats["retries"] == 2
+    assert stats["attempts"] == 3
+
+
+def test_gives_up_after_max_retries_with_the_last_response():
+    retrier = make_retrier()
+    attempt, calls = scripted((502, True))
+    response = asyncio.run(retrier.run("svc", attempt))
+    assert response.status_code == 502
+    assert len(calls) == 3
+
+
+def test_does_not_retry_final_responses():
+    retrier = make_retrier()
+    attempt, calls = scripted((404, False))
+    assert asyncio.run(retrier.run("svc", attempt)).status_code == 404
+    assert len(calls) == 1
+
+
+def test_budget_limits_retries():
+    retrier = make_retrier()
+    retrier._budgets["svc"] = RetryBudget(ratio=0.0, min_per_second=0.0, max_tokens=1.0)
+    attempt, calls = scripted((503, True))
+    asyncio.run(retrier.run("svc", attempt))
+    # One token buys one retry
+    assert len(calls) == 2
+    assert retrier.stats()["routes"]["svc"]["budget_exhausted"] == 1
+
+    attempt, calls = scripted((503, True))
+    asyncio.run(retrier.run("svc", attempt))
+    assert len(calls) == 1
+
+
+def test_budget_refills_from_traffic():
+    budget = RetryBudget(ratio=0.5, min_per_second=0.0, max_tokens=10.0)
+    budget.tokens = 0.0
+    budget.deposit()
+    assert not budget.withdraw()
+    budget.deposit()
+    assert budget.withdraw()
+
+
+def test_hedge_wins_when_the_first_attempt_is_slow():
+    retrier = make_retrier(hedge=True)
+    attempt, calls = scripted((200, False), delays=(1.0, 0.0))
+    response = asyncio.run(retrier.run("svc", attempt, retries=0))
+    assert json.loads(response.body) == {"attempt": 1}
+    assert len(calls) == 2
+    stats = retrier.stats()["routes"]["svc"]
+    assert stats["hedges"] == 1
+    assert stats["hedge_wins"] == 1
+
+
+def test_no_hedge_when_the_first_attempt_is_fast():
+    retrier = make_retrier(hedge=True, hedge_delay=1.0)
+    attempt, calls = scripted((200, False))
+    asyncio.run(retrier.run("svc", attempt, retries=0))
+    assert len(calls) == 1
+    assert retrier.stats()["routes"]["svc"]["hedges"] == 0
+
+
+def test_no_hedge_without_budget():
+    retrier = make_retrier(hedge=True)
+    retrier._budgets["svc"] = RetryBudget(ratio=0.0, min_per_second=0.0, max_tokens=0.0)
+    attempt, calls = scripted((200, False), delays=(0.05,))
+    assert asyncio.run(retrier.run("svc", attempt, retries=0)).status_code == 200
+    assert len(calls) == 1
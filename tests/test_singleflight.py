@@ -0,0 +1,189 @@
+import asyncio
+
+import pytest
+from fastapi import Response
+from starlette.responses import StreamingResponse
+
+import gateway
+from gateway_core.proxy import buffer_streaming
+from gateway_core.singleflight import Exclusive, SingleFlight
+from helpers import make_request
+
+
+def test_concurrent_calls_share_one_result():
+    flight = SingleFlight()
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return "result"
+
+    async def scenario():
+        return await asyncio.gather(*(flight.do("key", fetch) for _ in range(10)))
+
+    assert asyncio.run(scenario()) == ["result"] * 10
+    assert len(calls) == 1
+    assert flight.stats()["collapsed"] == 9
+    assert flight.stats()["in_flight"] == 0
+
+
+def test_calls_after_completion_run_again():
+    flight = SingleFlight()
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        return len(calls)
+
+    async def scenario():
+        return [await flight.do("key", fetch), await flight.do("key", fetch)]
+
+    assert asyncio.run(scenario()) == [1, 2]
+
+
+def test_errors_reach_every_waiter():
+    flight = SingleFlight()
+
+    async def fetch():
+        await asyncio.sleep(0.01)
+        raise ValueError("upstream failed")
+
+    async def scenario():
+        return await asyncio.gather(*(flight.do("key", fetch) for _ in range(3)), return_exceptions=True)
+
+    results = asyncio.run(scenario())
+    assert all(isinstance(result, ValueError) for result in results)
+
+
+def test_cancelled_leader_does_not_cancel_other_waiters():
+    flight = SingleFlight()
+
+    async def fetch():
+        await asyncio.sleep(0.02)
+        return "result"
+
+    async def scenario():
+        leader = asyncio.ensure_future(flight.do("key", fetch))
+        follower = asyncio.ensure_future(flight.do("key", fetch))
+        await asyncio.sleep(0)
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return await follower
+
+    assert asyncio.run(scenario()) == "result"
+
+
+def streamed(chunks, headers=()):
+    async def body():
+        for chunk in chunks:
+            await asyncio.sleep(0)
+            yield chunk
+
+    response = StreamingResponse(body(), media_type="application/json")
+    response.raw_headers = [(b"content-type", b"application/json"), *headers]
+    return response
+
+
+async def read_body(response) -> bytes:
+    if isinstance(response, StreamingResponse):
+        return b"".join([chunk async for chunk in response.body_iterator])
+    return response.body
+
+
+def concurrent_gets(route, path, count):
+    async def scenario():
+        responses = await asyncio.gather(*(
+            gateway.dispatch_route(route, path.lstrip("/"), make_request("GET", path)) for _ in range(count)
+        ))
+        return responses, [await read_body(response) for response in responses]
+
+    return asyncio.run(scenario())
+
+
+@pytest.mark.parametrize("path", [
+    "/comparison-document/api/document/project/1",  # "streaming": True in ROUTE_OPTIONS
+    "/otp/api/status",  # GATEWAY_STREAMING default
+])
+def test_small_streamed_gets_share_a_buffered_response(monkeypatch, path):
+    route = gateway.routes.match(path.lstrip("/"))
+    assert not route.options.cacheable
+    monkeypatch.setattr(gateway, "STREAMING_ENABLED", True)
+    monkeypatch.setattr(gateway, "inflight_gets", SingleFlight())
+    forwarded = []
+
+    async def fake_forward(route, full_path, request, streaming=None):
+        forwarded.append(streaming)
+        await asyncio.sleep(0.01)
+        return streamed([b'{"items": ', b"[]}"])
+
+    monkeypatch.setattr(gateway, "forward", fake_forward)
+    responses, bodies = concurrent_gets(route, path, 5)
+    assert forwarded == [True]
+    assert bodies == [b'{"items": []}'] * 5
+    assert not any(isinstance(response, StreamingResponse) for response in responses)
+
+
+def test_large_streamed_gets_are_not_shared(monkeypatch):
+    route = gateway.routes.match("comparison-document/api/document/1")
+    monkeypatch.setattr(gateway, "inflight_gets", SingleFlight())
+    monkeypatch.setattr(gateway, "COALESCE_MAX_BYTES", 4)
+    forwarded = []
+
+    async def fake_forward(route, full_path, request, streaming=None):
+        forwarded.append(streaming)
+        await asyncio.sleep(0.01)
+        return streamed([b"abc", b"def", b"ghi"])
+
+    monkeypatch.setattr(gateway, "forward", fake_forward)
+    responses, bodies = concurrent_gets(route, "/comparison-document/api/document/1", 3)
+    # One waiter keeps the leader's stream; the other two fetch their own
+    assert forwarded == [True] * 3
+    assert bodies == [b"abcdefghi"] * 3
+    assert all(isinstance(response, StreamingResponse) for response in responses)
+
+
+def test_declared_length_over_the_limit_is_not_read():
+    response = streamed([b"x" * 10], headers=[(b"content-length", b"10")])
+    assert asyncio.run(buffer_streaming(response, 4)) is response
+
+
+def test_unclaimed_exclusive_result_is_released():
+    released = []
+
+    async def release(value):
+        released.append(value)
+
+    async def scenario():
+        claimed = Exclusive("a", release, claim_timeout=0.01)
+        assert claimed.claim() == "a"
+        assert claimed.claim() is None
+        Exclusive("b", release, claim_timeout=0.01)
+        await asyncio.sleep(0.05)
+
+    asyncio.run(scenario())
+    assert released == ["b"]
+
+
+def test_buffered_gets_are_coalesced(monkeypatch):
+    route = gateway.routes.match("otp/api/status")
+    monkeypatch.setattr(gateway, "STREAMING_ENABLED", False)
+    monkeypatch.setattr(gateway, "inflight_gets", SingleFlight())
+    calls = []
+
+    async def fake_forward(route, full_path, request, streaming=None):
+        calls.append(streaming)
+        await asyncio.sleep(0.01)
+        return Response(b"{}")
+
+    monkeypatch.setattr(gateway, "forward", fake_forward)
+
+    async def scenario():
+        return await asyncio.gather(*(
+            gateway.dispatch_route(route, "otp/api/status", make_request("GET", "/otp/api/status")) for _ in range(5)
+        ))
+
+    responses = asyncio.run(scenario())
+    assert calls == [False]
+    assert all(response.body == b"{}" for response in responses)
@@ -9,9 +9,14 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(
 
 # Now, other imports will work correctly
 from fastapi import FastAPI
+from dependencies.azure_blob_service import blob_lifespan
+from dependencies.deadline import install_deadline
+from dependencies.metrics import router as metrics_router
 from translation_document_service.routers import translation_document
 
-app = FastAPI(title="Translation Document Service")
+app = FastAPI(title="Translation Document Service", lifespan=blob_lifespan)
+install_deadline(app)
+app.include_router(metrics_router)
 app.include_router(translation_document.router)
 
 @app.get("/")
@@ -1,12 +1,16 @@
 
-from microserviceFullStack.dependencies.db import db
+from bson import ObjectId
+from pymongo import ASCENDING, DESCENDING, IndexModel
+from dependencies.db import get_db, register_indexes
+from dependencies.deadline import bounded_collection
 
+# A project's documents are paged newest first by (createdAt, _id)
+register_indexes("translation_documents", [
+    IndexModel([("projectId", ASCENDING), ("createdAt", DESCENDING), ("_id", DESCENDING)], name="projectId_createdAt_id"),
+], queries=[{"projectId": ObjectId()}])
 
 def get_document_collection():
     """
     Returns the MongoDB collection for translation documents.
-    Handles missing DB connection gracefully.
     """
-    if db is None:
-        raise RuntimeError("Database connection is not initialized.")
-    return db["translation_documents"]
+    return bounded_collection(get_db()["translation_documents"])
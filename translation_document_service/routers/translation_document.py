@@ -1,7 +1,6 @@
 import logging
-from typing import List, Optional
-from fastapi import APIRouter, File, Form, HTTPException, UploadFile, status
-from translation_document_service.schemas.translation_document import DocumentOut
+from typing import Optional
+from fastapi import APIRouter, Depends, File, Form, HTTPException, Query, UploadFile, status
 from translation_document_service.services.translation_document import (
     create_document_with_file,
     delete_document,
@@ -9,6 +8,8 @@ from translation_document_service.services.translation_document import (
     get_documents_by_project_id,
     update_document_with_file
 )
+from dependencies.pagination import PageParams
+from dependencies.serialization import json_response
 
 logger = logging.getLogger(__name__)
 
@@ -41,12 +42,16 @@ async def create_document_with_file_route(
         raise
 
 @router.get("/project/{project_id}", response_model=dict)
-async def get_documents_by_project_id_route(project_id: str):
-    logger.debug(f"[get_documents_by_project_id_route] Called with project_id={project_id}")
+async def get_documents_by_project_id_route(
+    project_id: str,
+    page: PageParams = Depends(),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return instead of the full summary"),
+):
+    logger.debug(f"[get_documents_by_project_id_route] Called with project_id={project_id}, fields={fields}")
     try:
-        result = await get_documents_by_project_id(project_id)
-        logger.info(f"[get_documents_by_project_id_route] Found {len(result)} documents for project ID: {project_id}")
-        return {"message": "Documents fetched successfully", "data": result}
+        result = await get_documents_by_project_id(project_id, page, fields)
+        logger.info(f"[get_documents_by_project_id_route] Found {len(result.items)} documents for project ID: {project_id}")
+        return json_response({"message": "Documents fetched successfully", "data": result.items, "next_cursor": result.next_cursor})
     except Exception as e:
         logger.error(f"[get_documents_by_project_id_route] Failed for project_id={project_id}: {e}")
         raise
@@ -31,3 +31,20 @@ class DocumentOut(DocumentBase):
     class Config:
         validate_by_name = True
         from_attributes = True
+
+class DocumentSummary(DocumentBase):
+    """List view: any subset of the document's fields."""
+    id: str = Field(..., alias="_id")
+    name: Optional[str] = None
+    type: Optional[str] = None
+    created_at: Optional[datetime] = Field(None, alias="createdAt")
+    updated_at: Optional[datetime] = Field(None, alias="updatedAt")
+
+    class Config:
+        validate_by_name = True
+        from_attributes = True
+
+# Stored field names a list can return
+DOCUMENT_SUMMARY_FIELDS = [
+    field.alias or name for name, field in DocumentSummary.model_fields.items() if name != "id"
+]
@@ -3,11 +3,21 @@ from datetime import datetime
 from typing import Optional
 import httpx
 from translation_document_service.models.translation_document import get_document_collection
-from translation_document_service.schemas.translation_document import DocumentOut, DocumentUpdate
-from microBackend.dependencies.azure_blob_service import delete_blob_from_url, upload_to_blob_storage
+from translation_document_service.schemas.translation_document import (
+    DOCUMENT_SUMMARY_FIELDS, DocumentOut, DocumentSummary, DocumentUpdate
+)
+from dependencies.azure_blob_service import delete_blob_from_url, upload_to_blob_storage
+from dependencies.deadline import DeadlineExceeded, check_deadline, create_background_task, timeout
+from dependencies.pagination import PageParams, paginate
+from dependencies.projection import list_projection
+from dependencies.serialization import serialize_many
 from bson import ObjectId
+from decouple import config
 from fastapi import HTTPException, UploadFile
 
+# Overall budget for one background translation (API call plus DB update)
+TRANSLATION_TIMEOUT = float(os.getenv("TRANSLATION_TIMEOUT") or config("TRANSLATION_TIMEOUT", default=300))
+
 
 async def create_document(
     name: str,
@@ -62,21 +72,19 @@ async def create_document(
     return DocumentOut(**doc_dict)
 
 
-async def get_documents_by_project_id(project_id: str):
+async def get_documents_by_project_id(project_id: str, page: PageParams, fields: Optional[str] = None):
     """
-    Retrieves all documents associated with a specific project ID.
+    Retrieves one page of the documents associated with a specific project ID,
+    newest first. Only the summary fields are read, or just `fields` when given.
     """
     print(f"[SERVICE] get_documents_by_project_id called with project_id={project_id}")
     documents = get_document_collection()
-    result = []
-
-    cursor = documents.find({"projectId": ObjectId(project_id)})
-    async for doc in cursor:
-        doc["_id"] = str(doc["_id"])
-        doc["projectId"] = str(doc["projectId"])
-        doc["userId"] = str(doc["userId"])
-        result.append(DocumentOut(**doc))
-
+    projection = list_projection(fields, DOCUMENT_SUMMARY_FIELDS)
+    result = await paginate(
+        documents, {"projectId": ObjectId(project_id)}, page, sort_key="createdAt", projection=projection
+    )
+    # Only the selected fields go into the response
+    result.items = serialize_many(result.items, DocumentSummary, exclude_unset=True)
     return result
 
 
@@ -175,13 +183,11 @@ async def create_document_with_file(
     base_name = name.strip().replace(' ', '_')
     blob_name = f"original-documents/{base_name}{ext}"
 
-    file_bytes = await file.read()
-
-    # 2. Upload the original file to Azure Blob Storage
+    # 2. Stream the original file to Azure Blob Storage in blocks
     try:
         blob_url = await upload_to_blob_storage(
             container_name="pdit",
-            file_data=file_bytes, 
+            file_data=file,
             custom_name=blob_name,
             content_type=file.content_type
         )
@@ -208,16 +214,16 @@ async def create_document_with_file(
     result = await documents.insert_one(doc_dict)
     document_id = str(result.inserted_id)
 
-    # 4. Trigger the translation API call as a background task
-    import asyncio
-    asyncio.create_task(call_translation_api(
+    # 4. Trigger the translation API call as a background task, detached from
+    #    this request's deadline but bounded by its own budget
+    create_background_task(call_translation_api(
         document_id=document_id,
         input_file_url=blob_url,
         
         target_language=target_language,
         original_filename_base=base_name,
         original_extension=ext
-    ))
+    ), budget=TRANSLATION_TIMEOUT)
 
     # 5. Immediately return the created document info to the user
     doc_dict["_id"] = document_id
@@ -253,7 +259,7 @@ async def call_translation_api(
     print(f"[BACKGROUND] Calling translation API with payload: {translation_payload}")
     
     try:
-        async with httpx.AsyncClient(timeout=300.0) as client:
+        async with httpx.AsyncClient(timeout=timeout(TRANSLATION_TIMEOUT)) as client:
             response = await client.post(
                 "http://20.55.73.107:6003/translate",
                 json=translation_payload,
@@ -268,6 +274,7 @@ async def call_translation_api(
         translated_file_url = translation_response.get("output_file")
         source_language = translation_response.get("src_lang")
         
+        check_deadline()
         if translated_file_url:
             # --- MODIFIED: Pass the detected source language to the update function ---
             await update_document_with_translation(document_id, translated_file_url, source_language)
@@ -276,7 +283,7 @@ async def call_translation_api(
             print(f"[ERROR] 'output_file' not found in translation response for doc {document_id}: {translation_response}")
 
 
-    except httpx.TimeoutException:
+    except (httpx.TimeoutException, DeadlineExceeded):
         print(f"[ERROR] Translation API call timed out for document {document_id}")
     except httpx.HTTPStatusError as e:
         print(f"[ERROR] Translation API failed with status {e.response.status_code} for doc {document_id}: {e.response.text}")
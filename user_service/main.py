@@ -8,9 +8,18 @@ import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
 from fastapi import FastAPI
+try:
+    # Profile pictures live in Blob Storage when the Azure SDK is installed
+    from dependencies.azure_blob_service import blob_lifespan as lifespan
+except ImportError:
+    from dependencies.db import lifespan
+from dependencies.deadline import install_deadline
+from dependencies.metrics import router as metrics_router
 from user_service.routers import user
 
-app = FastAPI(title="User Service")
+app = FastAPI(title="User Service", lifespan=lifespan)
+install_deadline(app)
+app.include_router(metrics_router)
 app.include_router(user.router)
 
 @app.get("/")
@@ -1,4 +1,10 @@
-from dependencies.db import db
+from pymongo import ASCENDING, IndexModel
+from dependencies.db import get_db, register_indexes
+from dependencies.deadline import bounded_collection
+
+register_indexes("users", [
+    IndexModel([("email", ASCENDING)], unique=True, name="email_unique"),
+], queries=[{"email": "user@example.com"}])
 
 def get_user_collection():
-    return db["users"]
+    return bounded_collection(get_db()["users"])
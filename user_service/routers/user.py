@@ -4,6 +4,7 @@ import httpx
 import logging
 import os
 from typing import Optional
+from dependencies.deadline import DeadlineExceeded, outgoing_headers, timeout
 from fastapi import (APIRouter, Body, Depends, File, Form, HTTPException, Path, UploadFile, status)
 from user_service.schemas.user import UserCreate, UserLogin, UserUpdate
 from user_service.services.user import change_password, create_user, delete_user, email_verification_for_forgot_password, get_user_by_id    , reset_password, update_user, admin_login
@@ -12,6 +13,9 @@ from user_service.services.user import change_password, create_user, delete_user
 
 logger = logging.getLogger(__name__)
 
+# Upper bound for calls to the OTP service; the request deadline may shorten it
+OTP_SERVICE_TIMEOUT = 30.0
+
 router = APIRouter(
     prefix="/user/api",
     tags=["User"]
@@ -25,8 +29,8 @@ async def verify_otp_route(email: str = Body(...), otp: str = Body(...)):
     logger.debug(f"[verify_otp_route] Called with email={email}, otp={otp}")
     otp_service_url = os.getenv("OTP_SERVICE_URL", "http://localhost:8005/api/otp/verify-otp")
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.post(otp_service_url, json={"email": email, "otp": otp})
+        async with httpx.AsyncClient(timeout=timeout(OTP_SERVICE_TIMEOUT)) as client:
+            response = await client.post(otp_service_url, json={"email": email, "otp": otp}, headers=outgoing_headers())
             response.raise_for_status()
             data = response.json()
         logger.info(f"[verify_otp_route] OTP verification successful for email={email}")
@@ -35,6 +39,9 @@ async def verify_otp_route(email: str = Body(...), otp: str = Body(...)):
     except httpx.HTTPStatusError as e:
         logger.warning(f"[verify_otp_route] OTP verification failed for email={email}: {e.response.text}")
         raise HTTPException(status_code=e.response.status_code, detail=f"OTP verification failed: {e.response.text}")
+    except DeadlineExceeded:
+        # Answered with 504 by the deadline handler
+        raise
     except Exception as e:
         logger.error(f"[verify_otp_route] Unexpected error for email={email}: {e}")
         raise HTTPException(status_code=500, detail="Failed to verify OTP.")
@@ -44,8 +51,8 @@ async def resend_otp_route(email: str = Body(...)):
     logger.debug(f"[resend_otp_route] Called with email={email}")
     otp_service_url = os.getenv("OTP_SERVICE_URL", "http://localhost:8005/api/otp/resend-otp")
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.post(otp_service_url, json={"email": email})
+        async with httpx.AsyncClient(timeout=timeout(OTP_SERVICE_TIMEOUT)) as client:
+            response = await client.post(otp_service_url, json={"email": email}, headers=outgoing_headers())
             response.raise_for_status()
             data = response.json()
         logger.info(f"[resend_otp_route] OTP resent successfully for email={email}")
@@ -54,6 +61,9 @@ async def resend_otp_route(email: str = Body(...)):
     except httpx.HTTPStatusError as e:
         logger.warning(f"[resend_otp_route] Resend OTP failed for email={email}: {e.response.text}")
         raise HTTPException(status_code=e.response.status_code, detail=f"Resend OTP failed: {e.response.text}")
+    except DeadlineExceeded:
+        # Answered with 504 by the deadline handler
+        raise
     except Exception as e:
         logger.error(f"[resend_otp_route] Unexpected error for email={email}: {e}")
         raise HTTPException(status_code=500, detail="Failed to resend OTP.")
@@ -70,8 +80,8 @@ async def signup_email_route(user: UserCreate):
     otp_payload = user.model_dump(by_alias=True)
     print(otp_payload)
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.post(otp_service_url, json=otp_payload)
+        async with httpx.AsyncClient(timeout=timeout(OTP_SERVICE_TIMEOUT)) as client:
+            response = await client.post(otp_service_url, json=otp_payload, headers=outgoing_headers())
             response.raise_for_status()
             data = response.json()
         logger.info(f"[signup_email_route] OTP sent successfully to {user.email}")
@@ -83,6 +93,9 @@ async def signup_email_route(user: UserCreate):
             raise HTTPException(status_code=409, detail="Email already registered. Please login or use forgot password.")
         logger.error(f"[signup_email_route] Error for {user.email}: {e.response.text}")
         raise HTTPException(status_code=500, detail=f"OTP service error: {e.response.text} {e} {e.response}")
+    except DeadlineExceeded:
+        # Answered with 504 by the deadline handler
+        raise
     except Exception as e:
         logger.error(f"[signup_email_route] Unexpected error for {user.email}: {e}")
         raise HTTPException(status_code=500, detail="Failed to send OTP for signup.")
@@ -31,6 +31,9 @@ import os
 from typing import Optional
 from decouple import config
 import httpx
+from dependencies.cache import entity_cache
+from dependencies.deadline import DeadlineExceeded, outgoing_headers, timeout
+from dependencies.serialization import serialize_one
 try:
     from user_service.models.otp import get_verification_collection
 except ImportError:
@@ -44,10 +47,14 @@ except ImportError:
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+# Profiles are read on almost every page; updates write through, deletes invalidate
+user_cache = entity_cache("user")
+
 # --- DELETE USER SERVICE ---
 async def delete_user(id: str):
     users = get_user_collection()
     result = await users.delete_one({"_id": ObjectId(id)})
+    await user_cache.invalidate(id)
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="User not found")
     return {"message": "User deleted successfully"}
@@ -71,13 +78,15 @@ async def create_user(user: UserCreate):
     return UserOut(**user_dict)
 
 async def get_user_by_id(id: str):
+    return await user_cache.get_or_load(id, lambda: load_user(id))
+
+async def load_user(id: str):
     users = get_user_collection()
     user = await users.find_one({"_id": ObjectId(id)})
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
-    user["_id"] = str(user["_id"])
     user.setdefault("picture", "https://res.cloudinary.com/dizbakfcc/image/upload/v1751972291/profilePlaceholder_lcrcd0.png")
-    return UserOut(**user)
+    return serialize_one(user, UserOut)
 
 async def update_user(id: str, user: UserUpdate, file: Optional[UploadFile] = None):
     users = get_user_collection()
@@ -114,6 +123,8 @@ async def update_user(id: str, user: UserUpdate, file: Optional[UploadFile] = No
                 custom_blob_name
             )
             update_data["picture"] = blob_url
+        except DeadlineExceeded:
+            raise
         except Exception as e:
             raise HTTPException(status_code=500, detail="Image upload failed")
 
@@ -124,9 +135,12 @@ async def update_user(id: str, user: UserUpdate, file: Optional[UploadFile] = No
         return_document=True
     )
     if not updated:
+        await user_cache.invalidate(id)
         raise HTTPException(status_code=404, detail="User not found")
-    updated["_id"] = str(updated["_id"])
-    return UserOut(**updated)
+    updated.setdefault("picture", "https://res.cloudinary.com/dizbakfcc/image/upload/v1751972291/profilePlaceholder_lcrcd0.png")
+    result = serialize_one(updated, UserOut)
+    await user_cache.put(id, result)
+    return result
 
 
 async def admin_login(email: str, password: str):
@@ -144,13 +158,15 @@ async def email_verification_for_forgot_password(email: str):
     # Call OTP microservice to send verification email
     otp_service_url = os.getenv("OTP_SERVICE_URL", "http://localhost:8005/api/otp/send")
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.post(otp_service_url, json={"email": email})
+        async with httpx.AsyncClient(timeout=timeout(30.0)) as client:
+            response = await client.post(otp_service_url, json={"email": email}, headers=outgoing_headers())
             response.raise_for_status()
             data = response.json()
         return {"message": data.get("message", "Verification email sent")}
     except httpx.HTTPStatusError as e:
         raise HTTPException(status_code=e.response.status_code, detail=f"OTP service error: {e.response.text}")
+    except DeadlineExceeded:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to send verification email: {e}")
 
@@ -160,6 +176,7 @@ async def reset_password(user_id: str, new_password: str):
         raise HTTPException(status_code=404, detail="User not found")
     hashed = pwd_context.hash(new_password)
     await users.update_one({"_id": ObjectId(user_id)}, {"$set": {"password": hashed, "updated_at": datetime.utcnow()}})
+    await user_cache.invalidate(user_id)
     return {"message": "Password reset successful"}
 
 async def change_password(user_id: str, current_password: str, new_password: str):
@@ -174,4 +191,5 @@ async def change_password(user_id: str, current_password: str, new_password: str
         {"_id": ObjectId(user_id)},
         {"$set": {"password": hashed_new_password, "updatedAt": datetime.utcnow()}}
     )
+    await user_cache.invalidate(user_id)
     return {"message": "Password changed successfully"}